@@ -4,7 +4,21 @@ JsonGeek - High-performance JSON parser using WebAssembly SIMD
 
 __version__ = "0.1.0"
 
-from .core.parser import JSONParser, loads, dumps
 from .core.exceptions import JSONParseError
+from .core.lazy import LazyDocument
+from .core.parser import JSONParser, dumpb, dumps, loads, query
+from .core.runtime import warmup
+from .core.writer import NDJSONWriter, dump
 
-__all__ = ["JSONParser", "loads", "dumps", "JSONParseError"]
+__all__ = [
+    "JSONParser",
+    "loads",
+    "dump",
+    "dumps",
+    "dumpb",
+    "NDJSONWriter",
+    "query",
+    "warmup",
+    "LazyDocument",
+    "JSONParseError",
+]
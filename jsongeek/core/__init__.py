@@ -2,7 +2,21 @@
 Core functionality for JsonGeek
 """
 
-from .parser import JSONParser, loads, dumps
 from .exceptions import JSONParseError
+from .lazy import LazyDocument
+from .parser import JSONParser, dumpb, dumps, loads, query
+from .runtime import warmup
+from .writer import NDJSONWriter, dump
 
-__all__ = ["JSONParser", "loads", "dumps", "JSONParseError"]
+__all__ = [
+    "JSONParser",
+    "loads",
+    "dump",
+    "dumps",
+    "dumpb",
+    "NDJSONWriter",
+    "query",
+    "warmup",
+    "LazyDocument",
+    "JSONParseError",
+]
@@ -0,0 +1,813 @@
+"""
+Pluggable parser backends with size-based routing and host calibration
+"""
+
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..utils.simd_detection import has_simd_support
+from .exceptions import JSONParseError
+from .intern import InternTable, pairs_hook
+from .limits import ParseLimits
+from .metrics import Instrumentation
+from .runtime import (
+    ARENA_IDLE_TIMEOUT,
+    ARENA_INITIAL_SIZE,
+    default_cache_dir,
+    get_registry,
+)
+from .tape import (
+    ERROR_MESSAGES,
+    TAPE_FULL,
+    TAPE_RECORD_SIZE,
+    Tape,
+    build_tape,
+    tape_dtype,
+)
+from .utf8 import check_utf8
+
+# (upper size bound in bytes or None for "any size", backend name)
+Threshold = Tuple[Optional[int], str]
+
+CALIBRATION_FORMAT_VERSION = 1
+CALIBRATION_SIZES = (64, 256, 1024, 4096, 16384, 65536, 262144)
+
+# Bytes per document in the parse_batch output, see wasm/assembly/batch.ts
+BATCH_RECORD_SIZE = 12
+
+# Until calibrate() has measured a crossover on this host, everything goes
+# to the stdlib backend: no other backend is known to beat it by default
+DEFAULT_THRESHOLDS: List[Threshold] = [(None, "json")]
+
+
+class ParserBackend:
+    """
+    Base class for parser backends
+
+    A backend object is created per :class:`JSONParser` on first use and
+    closed together with it, so it may hold per-parser resources.
+    """
+
+    name = "base"
+    # Whether parse() enforces the configured ParseLimits itself; otherwise
+    # JSONParser checks them with a scan before calling the backend
+    enforces_limits = False
+    # Codec error handler for strings: "surrogateescape" once a parser turns
+    # UTF-8 validation off
+    _utf8_errors = "strict"
+    # Whether parse_tape() is native; the pure-Python tape builder is much
+    # slower than converting with json.loads
+    native_tape = False
+    # Whether parse() takes whole documents; backends that only pay off when
+    # the tape itself is consumed opt out and leave parse() unimplemented
+    full_parse = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether the backend can run on this host"""
+        return True
+
+    def parse(self, buf: Union[bytes, memoryview]) -> Any:
+        """
+        Parse raw JSON bytes
+
+        Args:
+            buf: UTF-8 encoded JSON
+
+        Returns:
+            Parsed Python object
+
+        Raises:
+            NotImplementedError: If the backend sets ``full_parse = False``
+        """
+        raise NotImplementedError
+
+    def parse_tape(self, buf: Union[bytes, memoryview]) -> Tape:
+        """
+        Build the structural tape of raw JSON bytes
+
+        Backends without a native tape builder use the pure-Python one. The
+        tape only decodes the strings that are converted, so the whole
+        buffer is validated up front unless validation is off.
+
+        Args:
+            buf: UTF-8 encoded JSON
+
+        Returns:
+            Tape over ``buf``
+
+        Raises:
+            JSONParseError: If the document is malformed
+        """
+        if self._utf8_errors == "strict":
+            check_utf8(buf)
+        tape = build_tape(buf)
+        tape.errors = self._utf8_errors
+        return tape
+
+    def parse_batch(self, bufs: Sequence[Union[bytes, memoryview]]) -> List[Any]:
+        """
+        Parse many documents, one call per document
+
+        Backends that can amortize per-call overhead override this.
+
+        Args:
+            bufs: UTF-8 encoded JSON documents
+
+        Returns:
+            One entry per document: the parsed object or a JSONParseError
+        """
+        results = []
+        for buf in bufs:
+            try:
+                results.append(self.parse(buf))
+            except JSONParseError as e:
+                results.append(e)
+            except Exception as e:
+                results.append(JSONParseError(str(e)))
+        return results
+
+    def configure(self, options: Dict[str, Any]) -> None:
+        """
+        Apply parser options before first use
+
+        Args:
+            options: Options passed by :class:`JSONParser`; unknown keys are ignored
+        """
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend-specific statistics"""
+        return {}
+
+    def close(self) -> None:
+        """Release resources held by the backend"""
+
+
+def _intern_tables(
+    options: Dict[str, Any],
+) -> Tuple[Optional[InternTable], Optional[InternTable]]:
+    """
+    Get the key and string tables a backend should convert through
+
+    json.loads already shares equal keys within one document, so the key
+    table is only worth a hook for cross-document interning or alongside
+    value deduplication.
+    """
+    keys = options.get("key_table")
+    strings = options.get("string_table")
+    if strings is None and options.get("intern_scope") != "parser":
+        keys = None
+    return keys, strings
+
+
+class _NonStandardConstant(Exception):
+    """Raised by the stdlib hook on NaN, Infinity or -Infinity"""
+
+
+def _reject_constant(name: str) -> Any:
+    raise _NonStandardConstant(name)
+
+
+class StdlibBackend(ParserBackend):
+    """
+    Backend built on the standard library ``json`` module
+
+    Avoids the wasm boundary crossing, which dominates for tiny messages.
+    NaN, Infinity and -Infinity are rejected like the tape and wasm
+    backends do, so results do not depend on the document size.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        # Built once: json.loads would construct a decoder on every call
+        # that passes hooks
+        self._decode = json.JSONDecoder(parse_constant=_reject_constant).decode
+        self._instrumentation: Optional[Instrumentation] = None
+
+    def configure(self, options: Dict[str, Any]) -> None:
+        self._instrumentation = options.get("instrumentation")
+        self._utf8_errors = (
+            "strict" if options.get("validate_utf8", True) else "surrogateescape"
+        )
+        self._decode = json.JSONDecoder(
+            object_pairs_hook=pairs_hook(*_intern_tables(options)),
+            parse_constant=_reject_constant,
+        ).decode
+
+    def parse(self, buf: Union[bytes, memoryview]) -> Any:
+        instrumentation = self._instrumentation
+        if instrumentation is not None and instrumentation.active:
+            start = time.perf_counter_ns()
+            try:
+                return self._loads(buf)
+            finally:
+                instrumentation.add("convert", time.perf_counter_ns() - start)
+        return self._loads(buf)
+
+    def _loads(self, buf: Union[bytes, memoryview]) -> Any:
+        try:
+            return self._decode(str(buf, "utf-8", self._utf8_errors))
+        except UnicodeDecodeError as e:
+            raise JSONParseError(
+                f"Invalid UTF-8 encoding: {e.reason}", e.start
+            ) from None
+        except json.JSONDecodeError as e:
+            raise JSONParseError(e.msg, e.pos) from None
+        except _NonStandardConstant as e:
+            # json.loads does not report where the constant is; the tape
+            # scanner stops on it with the same error as the other backends
+            build_tape(buf)
+            raise JSONParseError(f"{ERROR_MESSAGES[2]}: {e}") from None
+
+
+class WasmBackend(ParserBackend):
+    """
+    Backend running the scalar WebAssembly parser from the shared instance pool
+
+    The wasm tape is what lazy documents, path extraction, columns and
+    records consume. The backend has no whole-document :meth:`parse`: the
+    host can only turn a tape into Python objects with the C decoder of
+    ``json.loads`` or, far slower, entry by entry, so a full parse through
+    wasm would scan every document twice. Parsers send full parses to the
+    stdlib backend instead, even when forced onto this one, and only
+    :meth:`parse_batch` converts documents, after validating a whole batch
+    and checking its limits in one call.
+    """
+
+    name = "wasm-scalar"
+    simd = False
+    enforces_limits = True
+    native_tape = True
+    full_parse = False
+
+    def __init__(self):
+        registry = get_registry()
+        self._pool = registry.get_pool(registry.module_name(self.simd))
+        self._instance = self._pool.acquire()
+        self._arena = self._pool.arena(self._instance)
+        self._limits = ParseLimits()
+        self._validate_utf8 = True
+        # Pooled instances keep the settings of their previous user
+        self._apply_settings()
+        self._key_table: Optional[InternTable] = None
+        self._string_table: Optional[InternTable] = None
+        self._instrumentation: Optional[Instrumentation] = None
+
+    def configure(self, options: Dict[str, Any]) -> None:
+        self._arena.initial_size = options.get("arena_size", ARENA_INITIAL_SIZE)
+        self._arena.idle_timeout = options.get("arena_idle_timeout", ARENA_IDLE_TIMEOUT)
+        self._key_table, self._string_table = _intern_tables(options)
+        self._instrumentation = options.get("instrumentation")
+        limits = options.get("limits")
+        if limits is not None:
+            self._limits = limits
+        self._validate_utf8 = options.get("validate_utf8", True)
+        self._utf8_errors = "strict" if self._validate_utf8 else "surrogateescape"
+        self._apply_settings()
+
+    def _apply_settings(self) -> None:
+        """Configure the limits and UTF-8 validation the wasm tape builder checks"""
+
+        def bound(value: Optional[int]) -> int:
+            return -1 if value is None else min(value, 0x7FFFFFFF)
+
+        limits = self._limits
+        exports = self._instance.exports
+        exports.set_limits(
+            bound(limits.max_depth),
+            bound(limits.max_string_length),
+            bound(limits.max_number_length),
+            bound(limits.max_elements),
+        )
+        exports.set_utf8_validation(int(self._validate_utf8))
+
+    def _renew_if_idle(self) -> None:
+        """Swap in a fresh instance once the arena's grown block has sat idle"""
+        if self._arena.expired:
+            self._instance = self._pool.renew(self._instance)
+            self._arena = self._pool.arena(self._instance)
+            self._apply_settings()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        if cls.simd and not has_simd_support():
+            return False
+        try:
+            import wasmer  # noqa: F401
+        except ImportError:
+            return False
+        registry = get_registry()
+        return os.path.exists(
+            os.path.join(registry.wasm_dir, registry.module_name(cls.simd))
+        )
+
+    def parse_tape(self, buf: Union[bytes, memoryview]) -> Tape:
+        """
+        Build the structural tape in wasm
+
+        The input and the tape share one arena reservation; the tape capacity
+        starts at one entry per four input bytes and doubles until it fits.
+        The returned entries are a view into linear memory, valid until the
+        next call on this backend.
+        """
+        import numpy as np
+
+        self._renew_if_idle()
+        exports = self._instance.exports
+        length = len(buf)
+        tape_offset = (length + 15) & ~15
+        capacity = length // 4 + 16
+        while True:
+            ptr = self._arena.reserve(tape_offset + capacity * TAPE_RECORD_SIZE)
+            self._arena.view(length)[:] = np.frombuffer(buf, dtype=np.uint8)
+            count = exports.build_tape(ptr, length, ptr + tape_offset, capacity)
+            if count >= 0:
+                return Tape(
+                    buf,
+                    self._arena.view(count, tape_offset, tape_dtype()),
+                    self._utf8_errors,
+                )
+            code = exports.tape_error_code()
+            if code != TAPE_FULL:
+                raise JSONParseError(
+                    ERROR_MESSAGES.get(code, f"Error code {code}"),
+                    exports.tape_error_position(),
+                )
+            capacity *= 2
+
+    def parse_batch(self, bufs: Sequence[Union[bytes, memoryview]]) -> List[Any]:
+        """
+        Parse many documents with a single crossing into wasm
+
+        Documents are packed back to back into the arena, followed by a u32
+        offsets array, the per-document output records and one tape shared
+        by all documents. Malformed documents get their own error without
+        affecting the rest, and if the call traps the whole batch falls back
+        to one tape per document.
+        """
+        import numpy as np
+
+        count = len(bufs)
+        if count == 0:
+            return []
+        self._renew_if_idle()
+        offsets = np.zeros(count + 1, dtype=np.uint32)
+        np.cumsum([len(buf) for buf in bufs], out=offsets[1:])
+        total = int(offsets[-1])
+        data_size = (total + 3) & ~3
+        out_offset = data_size + offsets.nbytes
+        tape_offset = (out_offset + count * BATCH_RECORD_SIZE + 15) & ~15
+        capacity = total // 4 + 16 * count
+        arena = self._arena
+        instrumentation = self._instrumentation
+        while True:
+            ptr = arena.reserve(tape_offset + capacity * TAPE_RECORD_SIZE)
+            data = arena.view(data_size)
+            for buf, start, end in zip(bufs, offsets.tolist(), offsets[1:].tolist()):
+                data[start:end] = np.frombuffer(buf, dtype=np.uint8)
+            arena.view(count + 1, data_size, np.uint32)[:] = offsets
+            del data
+            start = time.perf_counter_ns()
+            try:
+                failures = self._instance.exports.parse_batch(
+                    ptr,
+                    ptr + data_size,
+                    count,
+                    ptr + out_offset,
+                    ptr + tape_offset,
+                    capacity,
+                )
+            except Exception:
+                return [self._parse_one(buf) for buf in bufs]
+            if instrumentation is not None and instrumentation.active:
+                instrumentation.add("wasm", time.perf_counter_ns() - start)
+            if failures >= 0:
+                break
+            capacity *= 2
+
+        # Fresh views: the call may have grown the memory
+        records = arena.view(count * 3, out_offset, np.int32).reshape(count, 3).tolist()
+        entries = arena.view(capacity, tape_offset, tape_dtype())
+        start = time.perf_counter_ns()
+        results: List[Any] = []
+        for buf, (code, position, root) in zip(bufs, records):
+            if code == 0:
+                results.append(
+                    Tape(buf, entries, self._utf8_errors).to_python(
+                        root, self._key_table, self._string_table
+                    )
+                )
+            else:
+                results.append(
+                    JSONParseError(
+                        ERROR_MESSAGES.get(code, f"Error code {code}"), position
+                    )
+                )
+        if instrumentation is not None and instrumentation.active:
+            instrumentation.add("convert", time.perf_counter_ns() - start)
+        return results
+
+    def _parse_one(self, buf: Union[bytes, memoryview]) -> Any:
+        """Parse one document of a batch, returning its error instead of raising"""
+        try:
+            return self.parse_tape(buf).to_python(
+                0, self._key_table, self._string_table
+            )
+        except JSONParseError as e:
+            return e
+        except Exception as e:
+            return JSONParseError(str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"arena": self._arena.get_stats()}
+
+    def close(self) -> None:
+        instance, self._instance = self._instance, None
+        if instance is not None:
+            self._pool.release(instance)
+
+
+class SimdWasmBackend(WasmBackend):
+    """
+    Backend running the SIMD WebAssembly parser from the shared instance pool
+    """
+
+    name = "wasm-simd"
+    simd = True
+
+
+_backends: Dict[str, Callable[[], ParserBackend]] = {}
+_availability: Dict[str, bool] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def register_backend(
+    name: str, factory: Callable[[], ParserBackend], replace: bool = False
+) -> None:
+    """
+    Register a parser backend
+
+    This is the hook for third-party engines: ``factory`` is called with no
+    arguments whenever a parser first needs the backend. If the factory has an
+    ``is_available()`` method it is consulted before routing any input to it.
+
+    Args:
+        name: Name used in thresholds and ``JSONParser(backend=...)``
+        factory: Backend class or zero-argument callable returning a backend
+        replace: Allow replacing an already registered backend
+
+    Raises:
+        ValueError: If the name is taken and ``replace`` is False
+    """
+    with _lock:
+        if name in _backends and not replace:
+            raise ValueError(f"Backend already registered: {name}")
+        _backends[name] = factory
+        _availability.pop(name, None)
+
+
+def unregister_backend(name: str) -> None:
+    """Remove a previously registered backend"""
+    with _lock:
+        _backends.pop(name, None)
+        _availability.pop(name, None)
+
+
+def create_backend(name: str) -> ParserBackend:
+    """
+    Instantiate a registered backend
+
+    Args:
+        name: Registered backend name
+
+    Returns:
+        New backend object
+
+    Raises:
+        ValueError: If no backend is registered under ``name``
+    """
+    try:
+        factory = _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown parser backend: {name}") from None
+    return factory()
+
+
+def available_backends() -> List[str]:
+    """Get the names of registered backends that can run on this host"""
+    names = []
+    for name, factory in list(_backends.items()):
+        available = _availability.get(name)
+        if available is None:
+            check = getattr(factory, "is_available", None)
+            try:
+                available = bool(check()) if check is not None else True
+            except Exception:
+                available = False
+            _availability[name] = available
+        if available:
+            names.append(name)
+    return names
+
+
+def full_parse_backends(names: Sequence[str]) -> List[str]:
+    """
+    Get the backends that take whole-document parses
+
+    Args:
+        names: Registered backend names
+
+    Returns:
+        The names whose backend does not opt out with ``full_parse = False``
+    """
+    return [name for name in names if getattr(_backends.get(name), "full_parse", True)]
+
+
+def native_tape_backends(names: Sequence[str]) -> List[str]:
+    """
+    Get the backends that build the structural tape natively
+
+    Args:
+        names: Registered backend names
+
+    Returns:
+        The names whose backend has ``native_tape = True``, in order
+    """
+    return [
+        name for name in names if getattr(_backends.get(name), "native_tape", False)
+    ]
+
+
+def record_backend_call(name: str, size: int, calls: int = 1) -> None:
+    """Count ``calls`` parses totalling ``size`` bytes routed to backend ``name``"""
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = {"calls": 0, "bytes": 0}
+        stats["calls"] += calls
+        stats["bytes"] += size
+
+
+def get_backend_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get process-wide per-backend counters
+
+    Returns:
+        Mapping of backend name to number of parses and bytes parsed
+    """
+    with _lock:
+        return {name: stats.copy() for name, stats in _stats.items()}
+
+
+def reset_backend_stats() -> None:
+    """Reset process-wide per-backend counters"""
+    with _lock:
+        _stats.clear()
+
+
+class BackendSelector:
+    """
+    Routes inputs to backends by size
+
+    Thresholds are checked in order; the first entry whose bound covers the
+    input size and whose backend is allowed wins. An entry with a ``None``
+    bound matches any size, which makes later entries act as fallbacks.
+    """
+
+    def __init__(self, thresholds: Optional[Sequence[Threshold]] = None):
+        self.thresholds: List[Threshold] = list(
+            DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        )
+
+    def select(self, size: int, allowed: Sequence[str]) -> str:
+        """
+        Pick a backend for an input
+
+        Args:
+            size: Input size in bytes
+            allowed: Names of backends the caller may use
+
+        Returns:
+            Backend name
+
+        Raises:
+            ValueError: If no threshold routes the input to an allowed backend
+        """
+        for bound, name in self.thresholds:
+            if (bound is None or size <= bound) and name in allowed:
+                return name
+        if "json" in allowed:
+            return "json"
+        raise ValueError(f"No parser backend available for {size} byte input")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the selector for persistence"""
+        return {
+            "version": CALIBRATION_FORMAT_VERSION,
+            "host": _host_key(),
+            "thresholds": [list(entry) for entry in self.thresholds],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BackendSelector":
+        """Create a selector from :meth:`to_dict` output"""
+        return cls([(bound, name) for bound, name in data["thresholds"]])
+
+
+def _host_key() -> Dict[str, str]:
+    """Describe the host so calibration from another machine is not reused"""
+    from .. import __version__
+
+    return {
+        "machine": platform.machine(),
+        "python": platform.python_implementation() + platform.python_version(),
+        "jsongeek": __version__,
+    }
+
+
+def calibration_path() -> str:
+    """Get the default location of the persisted calibration"""
+    return os.path.join(default_cache_dir(), "calibration.json")
+
+
+def load_calibration(path: Optional[str] = None) -> Optional[BackendSelector]:
+    """
+    Load persisted crossover points
+
+    Args:
+        path: Calibration file, defaults to :func:`calibration_path`
+
+    Returns:
+        Selector, or None if the file is missing, invalid or from another host
+    """
+    try:
+        with open(path or calibration_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CALIBRATION_FORMAT_VERSION:
+            return None
+        if data.get("host") != _host_key():
+            return None
+        return BackendSelector.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_calibration(selector: BackendSelector, path: Optional[str] = None) -> None:
+    """
+    Persist crossover points
+
+    Args:
+        selector: Selector to save
+        path: Calibration file, defaults to :func:`calibration_path`
+    """
+    path = path or calibration_path()
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(selector.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def sample_document(size: int) -> bytes:
+    """
+    Build a representative JSON document of roughly ``size`` bytes
+
+    Args:
+        size: Target size in bytes
+
+    Returns:
+        UTF-8 encoded JSON array of records
+    """
+    records = []
+    length = 2
+    i = 0
+    while length < size:
+        record = {
+            "id": i,
+            "name": f"item-{i}",
+            "value": i * 0.5,
+            "active": i % 2 == 0,
+            "tags": ["alpha", "beta"],
+            "parent": None,
+        }
+        length += len(json.dumps(record)) + 2
+        records.append(record)
+        i += 1
+    return json.dumps(records).encode("utf-8")
+
+
+def calibrate(
+    backends: Optional[Sequence[str]] = None,
+    sizes: Sequence[int] = CALIBRATION_SIZES,
+    repeat: int = 5,
+    path: Optional[str] = None,
+    persist: bool = True,
+) -> BackendSelector:
+    """
+    Measure backend crossover points on this host
+
+    Every backend parses a sample document of each size; backends whose result
+    differs from the standard library are disqualified for that size. The
+    fastest backend per size wins, and crossovers are placed at the geometric
+    mean of neighbouring sample sizes.
+
+    Only backends that take whole-document parses are measured, so the
+    thresholds choose between the stdlib backend and registered third-party
+    engines and never route to wasm: the wasm backends only build tapes.
+
+    Args:
+        backends: Backends to measure, defaults to the available ones; those
+            without full parses (see :func:`full_parse_backends`) are skipped
+        sizes: Sample document sizes in bytes
+        repeat: Timed runs per backend and size; the best run counts
+        path: Where to persist the result, defaults to :func:`calibration_path`
+        persist: Whether to write the result to disk
+
+    Returns:
+        Selector built from the measurements, also installed as the default
+    """
+    names = full_parse_backends(
+        list(backends) if backends is not None else available_backends()
+    )
+    instances = {}
+    try:
+        for name in names:
+            try:
+                instances[name] = create_backend(name)
+            except Exception:
+                continue
+
+        winners: List[Tuple[int, str]] = []
+        for size in sorted(sizes):
+            doc = sample_document(size)
+            expected = json.loads(doc)
+            timings = {}
+            for name, backend in instances.items():
+                try:
+                    if backend.parse(doc) != expected:
+                        continue
+                    best = float("inf")
+                    for _ in range(max(1, repeat)):
+                        start_time = time.perf_counter()
+                        backend.parse(doc)
+                        best = min(best, time.perf_counter() - start_time)
+                    timings[name] = best
+                except Exception:
+                    continue
+            if timings:
+                winners.append((size, min(timings, key=timings.get)))
+    finally:
+        for backend in instances.values():
+            backend.close()
+
+    thresholds: List[Threshold] = []
+    for index, (size, name) in enumerate(winners):
+        if index + 1 < len(winners):
+            next_size, next_name = winners[index + 1]
+            if next_name == name:
+                continue
+            thresholds.append((int((size * next_size) ** 0.5), name))
+        else:
+            thresholds.append((None, name))
+    # Fall back to the stock routing for backends that become unavailable
+    thresholds.extend(entry for entry in DEFAULT_THRESHOLDS if entry[0] is None)
+
+    selector = BackendSelector(thresholds)
+    if persist:
+        save_calibration(selector, path)
+    set_selector(selector)
+    return selector
+
+
+_selector: Optional[BackendSelector] = None
+
+
+def get_selector() -> BackendSelector:
+    """Get the process-wide selector, loading persisted calibration on first use"""
+    global _selector
+    if _selector is None:
+        _selector = load_calibration() or BackendSelector()
+    return _selector
+
+
+def set_selector(selector: Optional[BackendSelector]) -> None:
+    """Install a process-wide selector; None reloads it on next use"""
+    global _selector
+    _selector = selector
+
+
+register_backend(SimdWasmBackend.name, SimdWasmBackend)
+register_backend(WasmBackend.name, WasmBackend)
+register_backend(StdlibBackend.name, StdlibBackend)
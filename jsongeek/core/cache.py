@@ -0,0 +1,152 @@
+"""
+Content-addressed cache of parse results
+"""
+
+import hashlib
+import marshal
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Total size of the process-wide cache used by ``JSONParser(cache=True)``
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+CacheKey = bytes
+
+
+class ParseCache:
+    """
+    Parse results keyed by a hash of the input bytes
+
+    Values are stored in ``marshal`` form: every hit unpacks a fresh copy,
+    so callers may mutate what they get back without corrupting the cache,
+    and the stored size is exact. Entries are evicted least recently used
+    first once the stored bytes exceed ``max_bytes``. Safe to share between
+    threads and parsers.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            max_bytes: Upper bound on the bytes held by cached values
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def key(
+        data: Union[str, bytes, bytearray, memoryview], variant: bytes = b""
+    ) -> CacheKey:
+        """
+        Hash parser input
+
+        Args:
+            data: JSON text or bytes-like object
+            variant: Parser options that change the result for equal input
+
+        Returns:
+            128-bit BLAKE2b digest of the input, prefixed with ``variant``
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return variant + hashlib.blake2b(data, digest_size=16).digest()
+
+    def lookup(self, key: CacheKey) -> Tuple[bool, Any]:
+        """
+        Get a fresh copy of a cached result
+
+        Args:
+            key: Key from :meth:`key`
+
+        Returns:
+            ``(True, value)`` on a hit, ``(False, None)`` otherwise
+        """
+        with self._lock:
+            packed = self._entries.get(key)
+            if packed is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return True, marshal.loads(packed)
+
+    def store(self, key: CacheKey, value: Any) -> bool:
+        """
+        Cache a parse result
+
+        Args:
+            key: Key from :meth:`key`
+            value: Parsed JSON value
+
+        Returns:
+            False if the value is not cacheable (not plain JSON data, or
+            larger than the whole cache)
+        """
+        try:
+            packed = marshal.dumps(value)
+        except ValueError:
+            return False
+        size = len(packed)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = packed
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry; statistics are kept"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            ``hits``, ``misses``, ``hit_rate``, ``evictions``, the number of
+            ``entries`` and the ``bytes`` they hold, and ``max_bytes``
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_default_cache: Optional[ParseCache] = None
+_lock = threading.Lock()
+
+
+def get_default_cache() -> ParseCache:
+    """Get the process-wide cache shared by parsers created with ``cache=True``"""
+    global _default_cache
+    if _default_cache is None:
+        with _lock:
+            if _default_cache is None:
+                _default_cache = ParseCache()
+    return _default_cache
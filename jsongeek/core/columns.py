@@ -0,0 +1,382 @@
+"""
+Columnar extraction of record arrays into NumPy arrays
+"""
+
+import json
+from itertools import chain, repeat
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from .exceptions import JSONParseError
+from .tape import (
+    ARRAY,
+    ESCAPED,
+    FALSE,
+    FLOAT,
+    INTEGER,
+    KEY,
+    NULL,
+    OBJECT,
+    STRING,
+    TRUE,
+    Tape,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Clears the ESCAPED flag from entry types
+_KIND_MASK = ESCAPED - 1
+# Keys gathered per np.unique call while discovering field names
+_DISCOVERY_CHUNK = 1 << 20
+# A fixed-width copy of byte ranges may take this many times their total
+# length, plus a few bytes per range, before they are sliced one by one
+_DENSE_OVERHEAD = 4
+_DENSE_SLACK = 16
+
+
+def _gather(
+    source: "np.ndarray", starts: "np.ndarray", ends: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Copy byte ranges of the source into a bytes array
+
+    Ranges of similar length are copied into a fixed-width array in one
+    vectorized pass. When one long range would make that array cost many
+    times the bytes of the values themselves, the ranges are sliced one by
+    one instead.
+
+    Args:
+        source: Source buffer as uint8
+        starts: Range starts
+        ends: Range ends
+
+    Returns:
+        ``S<width>`` array with one item per range, or an object array of
+        ``bytes`` when the range lengths are skewed
+    """
+    import numpy as np
+
+    lengths = ends - starts
+    count = len(lengths)
+    width = max(int(lengths.max()) if count else 0, 1)
+    if width * count > _DENSE_OVERHEAD * int(lengths.sum()) + _DENSE_SLACK * count:
+        data = source.data
+        column = np.empty(count, dtype=object)
+        column[:] = [
+            bytes(data[start:end]) for start, end in zip(starts.tolist(), ends.tolist())
+        ]
+        return column
+    columns = np.arange(width)
+    valid = columns < lengths[:, None]
+    offsets = np.where(valid, starts[:, None] + columns, 0)
+    matrix = np.where(valid, source[offsets], 0).astype(np.uint8)
+    return matrix.view(f"S{width}").ravel()
+
+
+def _decode_strings(
+    source: "np.ndarray", tape: Tape, indices: "np.ndarray", escaped: "np.ndarray"
+) -> "np.ndarray":
+    """Decode string entries into a unicode array, or objects for skewed lengths"""
+    import numpy as np
+
+    entries = tape.entries
+    raw = _gather(source, entries["start"][indices] + 1, entries["end"][indices] - 1)
+    if raw.dtype == object:
+        decoded = np.empty(len(raw), dtype=object)
+        decoded[:] = [value.decode("utf-8") for value in raw.tolist()]
+    else:
+        decoded = np.char.decode(raw, "utf-8")
+    if escaped.any():
+        fixed = [tape.decode(int(index)) for index in indices[escaped]]
+        if decoded.dtype != object:
+            width = max(
+                decoded.dtype.itemsize // 4, max(len(text) for text in fixed), 1
+            )
+            decoded = decoded.astype(f"U{width}")
+        decoded[escaped] = fixed
+    return decoded
+
+
+def _record_layout(tape: Tape) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Locate the records and their keys without walking the tape in Python
+
+    Returns:
+        Record entry indices and, for every record-level key, its entry
+        index and the position of its record
+    """
+    import numpy as np
+
+    entries = tape.entries
+    if len(entries) == 0 or int(entries["type"][0]) & _KIND_MASK != ARRAY:
+        raise JSONParseError("Expected an array of objects", 0)
+    types = entries["type"] & _KIND_MASK
+    # Depth of each entry: +1 inside every container's (index, jump) span
+    containers = np.flatnonzero((types == ARRAY) | (types == OBJECT))
+    delta = np.zeros(len(entries) + 1, dtype=np.int64)
+    np.add.at(delta, containers + 1, 1)
+    np.add.at(delta, entries["jump"][containers].astype(np.int64), -1)
+    depth = np.cumsum(delta[:-1])
+
+    records = np.flatnonzero(depth == 1)
+    not_objects = records[types[records] != OBJECT]
+    if len(not_objects):
+        raise JSONParseError(
+            "Expected an array of objects", int(entries["start"][not_objects[0]])
+        )
+    keys = np.flatnonzero((depth == 2) & (types == KEY))
+    owners = np.searchsorted(records, keys, side="right") - 1
+    return records, keys, owners
+
+
+def _discover_fields(source: "np.ndarray", tape: Tape, keys: "np.ndarray") -> List[str]:
+    """Get the distinct record keys in order of first appearance"""
+    import numpy as np
+
+    entries = tape.entries
+    escaped = (entries["type"][keys] & ESCAPED) != 0
+    plain = keys[~escaped]
+    seen: Dict[bytes, int] = {}
+    for begin in range(0, len(plain), _DISCOVERY_CHUNK):
+        chunk = plain[begin : begin + _DISCOVERY_CHUNK]
+        raw = _gather(source, entries["start"][chunk] + 1, entries["end"][chunk] - 1)
+        unique, first = np.unique(raw, return_index=True)
+        for name, position in zip(unique.tolist(), (chunk[first]).tolist()):
+            seen.setdefault(name, position)
+    fields = {name.decode("utf-8"): position for name, position in seen.items()}
+    for index in keys[escaped].tolist():
+        fields.setdefault(tape.decode(index), index)
+    return sorted(fields, key=fields.get)
+
+
+def _match_keys(
+    source: "np.ndarray", tape: Tape, keys: "np.ndarray", field: str
+) -> "np.ndarray":
+    """Get a mask of the keys equal to ``field``"""
+    import numpy as np
+
+    entries = tape.entries
+    quoted = json.dumps(field, ensure_ascii=False).encode("utf-8")
+    starts = entries["start"][keys].astype(np.int64)
+    lengths = entries["end"][keys].astype(np.int64) - starts
+    escaped = (entries["type"][keys] & ESCAPED) != 0
+    matched = np.zeros(len(keys), dtype=bool)
+    candidates = np.flatnonzero((lengths == len(quoted)) & ~escaped)
+    if len(candidates):
+        pattern = np.frombuffer(quoted, dtype=np.uint8)
+        window = source[starts[candidates][:, None] + np.arange(len(quoted))]
+        matched[candidates[(window == pattern).all(axis=1)]] = True
+    for position in np.flatnonzero(escaped).tolist():
+        matched[position] = tape.decode(int(keys[position])) == field
+    return matched
+
+
+def _infer_dtype(types: "np.ndarray") -> Any:
+    """Pick a column dtype from the entry types of its non-null values"""
+    import numpy as np
+
+    present = set(np.unique(types).tolist())
+    if not present:
+        return np.float64
+    if present <= {INTEGER}:
+        return np.int64
+    if present <= {INTEGER, FLOAT}:
+        return np.float64
+    if present <= {TRUE, FALSE}:
+        return np.bool_
+    return object
+
+
+def _convert(
+    source: "np.ndarray",
+    tape: Tape,
+    indices: "np.ndarray",
+    raw_types: "np.ndarray",
+    dtype: Any,
+) -> "np.ndarray":
+    """Convert value entries to an array of ``dtype``"""
+    import numpy as np
+
+    dtype = np.dtype(dtype)
+    types = raw_types & _KIND_MASK
+    entries = tape.entries
+    if dtype.kind == "b" and np.isin(types, (TRUE, FALSE)).all():
+        return types == TRUE
+    if dtype.kind in "iuf" and np.isin(types, (INTEGER, FLOAT)).all():
+        raw = _gather(source, entries["start"][indices], entries["end"][indices])
+        try:
+            if dtype.kind != "f" and (types == FLOAT).any():
+                return raw.astype(np.float64).astype(dtype)
+            return raw.astype(dtype)
+        except (OverflowError, ValueError):
+            # Integers beyond the dtype's range: report them below
+            pass
+    if dtype.kind in "USO" and (types == STRING).all():
+        decoded = _decode_strings(source, tape, indices, (raw_types & ESCAPED) != 0)
+        return decoded.astype(dtype)
+    values = [tape.to_python(index) for index in indices.tolist()]
+    if dtype.kind == "O":
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    try:
+        return np.array(values, dtype=dtype)
+    except (OverflowError, TypeError, ValueError) as e:
+        raise JSONParseError(f"Cannot convert values to {dtype}: {e}") from None
+
+
+def extract_columns(
+    tape: Tape,
+    fields: Optional[Sequence[str]] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+) -> Dict[str, "np.ma.MaskedArray"]:
+    """
+    Turn a tape of an array of objects into one masked array per field
+
+    Args:
+        tape: Tape of a document whose root is an array of objects
+        fields: Fields to extract, defaults to every key in order of first
+            appearance
+        dtypes: Column dtypes by field; other columns are inferred: int64,
+            float64, bool, or object for strings, mixed values and
+            integers outside the int64 range
+
+    Returns:
+        Mapping of field name to a masked array with one item per record;
+        items are masked where the record lacks the field or holds null
+
+    Raises:
+        JSONParseError: If the root is not an array of objects
+    """
+    import numpy as np
+
+    dtypes = dtypes or {}
+    source = np.frombuffer(tape.buf, dtype=np.uint8)
+    records, keys, owners = _record_layout(tape)
+    if fields is None:
+        fields = _discover_fields(source, tape, keys)
+
+    count = len(records)
+    columns: Dict[str, np.ma.MaskedArray] = {}
+    for field in fields:
+        matched = _match_keys(source, tape, keys, field)
+        # Later duplicate keys within a record win, as with json.loads
+        rows = owners[matched]
+        values = keys[matched] + 1
+        raw_types = tape.entries["type"][values]
+        present = (raw_types & _KIND_MASK) != NULL
+        rows, values, raw_types = rows[present], values[present], raw_types[present]
+
+        requested = dtypes.get(field)
+        dtype = np.dtype(requested or _infer_dtype(raw_types & _KIND_MASK))
+        converted = None
+        if len(values):
+            try:
+                converted = _convert(source, tape, values, raw_types, dtype)
+            except JSONParseError:
+                if requested is not None:
+                    raise
+                # Inferred int64 but some integer is out of its range: keep
+                # the exact Python ints, as json.loads would
+                dtype = np.dtype(object)
+                converted = _convert(source, tape, values, raw_types, dtype)
+        data = np.zeros(count, dtype=dtype)
+        if dtype.kind == "O":
+            data[:] = None
+        mask = np.ones(count, dtype=bool)
+        if converted is not None:
+            data[rows] = converted
+            mask[rows] = False
+        columns[field] = np.ma.MaskedArray(data, mask=mask)
+    return columns
+
+
+def _infer_object_dtype(values: List[Any]) -> Any:
+    """Pick a column dtype from already converted non-null values"""
+    import numpy as np
+
+    present = set(map(type, values))
+    if not present:
+        return np.float64
+    if present <= {int}:
+        return np.int64
+    if present <= {int, float}:
+        return np.float64
+    if present <= {bool}:
+        return np.bool_
+    return object
+
+
+def _object_column(values: List[Any]) -> "np.ndarray":
+    """Wrap values in an object array without NumPy looking inside them"""
+    import numpy as np
+
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def convert_columns(
+    records: Any,
+    fields: Optional[Sequence[str]] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+) -> Dict[str, "np.ma.MaskedArray"]:
+    """
+    Turn already converted objects into one masked array per field
+
+    Produces the same columns as :func:`extract_columns` from the result
+    of ``json.loads``, for backends without a native tape.
+
+    Args:
+        records: Parsed document; must be a list of dicts
+        fields: Fields to extract, defaults to every key in order of first
+            appearance
+        dtypes: Column dtypes by field, inferred as in :func:`extract_columns`
+
+    Returns:
+        Mapping of field name to a masked array with one item per record
+
+    Raises:
+        JSONParseError: If the document is not an array of objects, or a
+            value does not fit its column's dtype
+    """
+    import numpy as np
+
+    if type(records) is not list or not set(map(type, records)) <= {dict}:
+        raise JSONParseError("Expected an array of objects")
+    dtypes = dtypes or {}
+    if fields is None:
+        fields = list(dict.fromkeys(chain.from_iterable(records)))
+
+    count = len(records)
+    columns: Dict[str, np.ma.MaskedArray] = {}
+    for field in fields:
+        values = _object_column(list(map(dict.get, records, repeat(field))))
+        # Missing fields and nulls alike are masked
+        mask = np.equal(values, None).astype(bool)
+        present = values[~mask].tolist()
+
+        requested = dtypes.get(field)
+        dtype = np.dtype(requested or _infer_object_dtype(present))
+        if dtype.kind == "O":
+            converted = _object_column(present)
+        else:
+            try:
+                converted = np.array(present, dtype=dtype)
+            except (OverflowError, TypeError, ValueError) as e:
+                if requested is not None:
+                    raise JSONParseError(
+                        f"Cannot convert values to {dtype}: {e}"
+                    ) from None
+                # Integers beyond the int64 range stay exact Python ints
+                dtype = np.dtype(object)
+                converted = _object_column(present)
+        if not mask.any():
+            data = converted
+        else:
+            data = np.zeros(count, dtype=dtype)
+            if dtype.kind == "O":
+                data[:] = None
+            data[~mask] = converted
+        columns[field] = np.ma.MaskedArray(data, mask=mask)
+    return columns
@@ -0,0 +1,108 @@
+"""
+Bounded string intern tables for object keys and short repeated values
+"""
+
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+INTERN_MAX_SIZE = 65536
+
+
+class InternTable:
+    """
+    Maps equal strings to one shared instance
+
+    Parsing an array of records creates the same key strings once per
+    record; routing them through a table keeps one copy of each. The table
+    is bounded: once ``max_size`` distinct strings are held, new strings are
+    returned unchanged while existing entries keep being reused.
+    """
+
+    def __init__(
+        self, max_size: int = INTERN_MAX_SIZE, max_length: Optional[int] = None
+    ):
+        """
+        Args:
+            max_size: Maximum number of distinct strings held
+            max_length: Strings longer than this are never interned
+        """
+        self.max_size = max_size
+        self.max_length = max_length
+        self._strings: Dict[str, str] = {}
+        self._hits = 0
+        self._misses = 0
+        self._saved_bytes = 0
+
+    def intern(self, value: str) -> str:
+        """
+        Get the shared instance equal to ``value``
+
+        Args:
+            value: Freshly decoded string
+
+        Returns:
+            The previously seen equal string, or ``value`` itself
+        """
+        if self.max_length is not None and len(value) > self.max_length:
+            return value
+        shared = self._strings.get(value)
+        if shared is not None:
+            self._hits += 1
+            self._saved_bytes += sys.getsizeof(value)
+            return shared
+        self._misses += 1
+        if len(self._strings) < self.max_size:
+            self._strings[value] = value
+        return value
+
+    def clear(self) -> None:
+        """Drop the held strings; statistics are kept"""
+        self._strings.clear()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get interning statistics
+
+        Returns:
+            Lookups that reused a string (``hits``), lookups that did not
+            (``misses``), bytes of duplicate strings released
+            (``saved_bytes``) and the number of strings held (``size``)
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "saved_bytes": self._saved_bytes,
+            "size": len(self._strings),
+        }
+
+
+def pairs_hook(
+    keys: Optional[InternTable], strings: Optional[InternTable]
+) -> Optional[Callable[[List[Tuple[str, Any]]], Dict[str, Any]]]:
+    """
+    Build a ``json.loads`` object_pairs_hook that routes through intern tables
+
+    Args:
+        keys: Table shared by equal object keys
+        strings: Table deduplicating string values of object members
+
+    Returns:
+        The hook, or None when both tables are None
+    """
+    if keys is None and strings is None:
+        return None
+    intern_key = keys.intern if keys is not None else str
+    if strings is None:
+        return lambda pairs: {intern_key(key): value for key, value in pairs}
+    intern_string = strings.intern
+
+    def hook(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        return {
+            intern_key(key): intern_string(value) if type(value) is str else value
+            for key, value in pairs
+        }
+
+    return hook
@@ -0,0 +1,175 @@
+"""
+Lazy documents that decode values from the source buffer on first access
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .tape import ARRAY, OBJECT, Tape
+
+
+def _lazy_value(tape: Tape, index: int) -> Any:
+    """Wrap a container entry, or decode a scalar entry"""
+    kind = tape.kind(index)
+    if kind == OBJECT:
+        return LazyObject(tape, index)
+    if kind == ARRAY:
+        return LazyArray(tape, index)
+    return tape.decode(index)
+
+
+class LazyObject(Mapping):
+    """
+    Read-only mapping over a JSON object in the source buffer
+
+    Keys are decoded once, on the first lookup; member values are decoded
+    on first access and cached.
+    """
+
+    __slots__ = ("_tape", "_index", "_members", "_cache")
+
+    def __init__(self, tape: Tape, index: int):
+        self._tape = tape
+        self._index = index
+        self._members: Optional[Dict[str, int]] = None
+        self._cache: Dict[int, Any] = {}
+
+    def _member_indices(self) -> Dict[str, int]:
+        """Map each key to the tape index of its value"""
+        if self._members is None:
+            tape = self._tape
+            # Later duplicates win, as with json.loads
+            self._members = {
+                tape.decode(key): key + 1 for key in tape.children(self._index)
+            }
+        return self._members
+
+    def _value_at(self, index: int) -> Any:
+        try:
+            return self._cache[index]
+        except KeyError:
+            value = self._cache[index] = _lazy_value(self._tape, index)
+            return value
+
+    def __getitem__(self, key: str) -> Any:
+        return self._value_at(self._member_indices()[key])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._member_indices()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._member_indices())
+
+    def __len__(self) -> int:
+        return len(self._member_indices())
+
+    def __repr__(self) -> str:
+        return f"<LazyObject with {len(self)} keys>"
+
+    def materialize(self) -> Dict[str, Any]:
+        """Build the plain Python dict for this object"""
+        return self._tape.to_python(self._index)
+
+
+class LazyArray(Sequence):
+    """
+    Read-only sequence over a JSON array in the source buffer
+
+    Elements are located on first access and decoded individually, then
+    cached.
+    """
+
+    __slots__ = ("_tape", "_index", "_elements", "_cache")
+
+    def __init__(self, tape: Tape, index: int):
+        self._tape = tape
+        self._index = index
+        self._elements: Optional[List[int]] = None
+        self._cache: Dict[int, Any] = {}
+
+    def _element_indices(self) -> List[int]:
+        if self._elements is None:
+            self._elements = list(self._tape.children(self._index))
+        return self._elements
+
+    def _value_at(self, index: int) -> Any:
+        try:
+            return self._cache[index]
+        except KeyError:
+            value = self._cache[index] = _lazy_value(self._tape, index)
+            return value
+
+    def __getitem__(self, position: Union[int, slice]) -> Any:
+        elements = self._element_indices()
+        if isinstance(position, slice):
+            return [self._value_at(index) for index in elements[position]]
+        return self._value_at(elements[position])
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in self._element_indices():
+            yield self._value_at(index)
+
+    def __len__(self) -> int:
+        return len(self._element_indices())
+
+    def __repr__(self) -> str:
+        return f"<LazyArray with {len(self)} items>"
+
+    def materialize(self) -> List[Any]:
+        """Build the plain Python list for this array"""
+        return self._tape.to_python(self._index)
+
+
+class LazyDocument:
+    """
+    Parsed document whose values are decoded only when accessed
+
+    The document keeps a reference to the input buffer instead of copying
+    it, so bytes-like inputs must not be modified while it is in use.
+    Objects and arrays are exposed as :class:`LazyObject` and
+    :class:`LazyArray`, which support ``[]``, ``get``, ``len`` and
+    iteration like their plain counterparts.
+
+    A document built without a tape wraps an already parsed ``value``; its
+    containers are then plain dicts and lists.
+    """
+
+    __slots__ = ("tape", "_root", "_loaded")
+
+    def __init__(self, tape: Optional[Tape], value: Any = None):
+        self.tape = tape
+        self._root: Any = value
+        self._loaded = tape is None
+
+    @property
+    def root(self) -> Any:
+        """Top-level value: a LazyObject, a LazyArray or a decoded scalar"""
+        if not self._loaded:
+            self._root = _lazy_value(self.tape, 0)
+            self._loaded = True
+        return self._root
+
+    def __getitem__(self, key: Union[str, int, slice]) -> Any:
+        return self.root[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get an object member, or ``default`` if the key is missing"""
+        return self.root.get(key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.root
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.root)
+
+    def __len__(self) -> int:
+        return len(self.root)
+
+    def __repr__(self) -> str:
+        return f"<LazyDocument {self.root!r}>"
+
+    def materialize(self) -> Any:
+        """Build the full plain Python result"""
+        if self.tape is None:
+            return self._root
+        return self.tape.to_python()
@@ -0,0 +1,256 @@
+"""
+Resource limits checked before a document is converted to Python objects
+"""
+
+from typing import NamedTuple, Optional, Union
+
+from .exceptions import JSONParseError
+from .tape import ERROR_MESSAGES, MAX_DEPTH
+
+
+class ParseLimits(NamedTuple):
+    """
+    Limits a document must stay within; ``None`` means unlimited
+
+    Attributes:
+        max_depth: Maximum container nesting depth
+        max_size: Maximum document size in bytes, after decompression
+        max_string_length: Maximum bytes between the quotes of a string or key
+        max_number_length: Maximum characters of a number
+        max_elements: Maximum values and object keys in a document
+    """
+
+    max_depth: int = MAX_DEPTH
+    max_size: Optional[int] = None
+    max_string_length: Optional[int] = None
+    max_number_length: Optional[int] = None
+    max_elements: Optional[int] = None
+
+
+# Bytes that may continue a number once it has started
+_NUMBER_BYTES = b"0123456789+-.eE"
+# Reduces a document to its quotes and brackets, both kinds written as []
+_BRACKETS = bytes.maketrans(b"{}", b"[]")
+_NOT_STRUCTURAL = bytes(set(range(256)) - set(b'"[]{}'))
+
+
+def size_error(limits: ParseLimits) -> JSONParseError:
+    """Build the error raised for documents above ``limits.max_size``"""
+    return JSONParseError(
+        f"Document larger than {limits.max_size} bytes", limits.max_size
+    )
+
+
+def check_limits(buf: Union[bytes, memoryview], limits: ParseLimits) -> None:
+    """
+    Check a document against the structural limits without parsing it
+
+    This is the scanning front-end for backends that do not enforce limits
+    while building a tape. Cheap upper bounds from ``bytes.count`` settle
+    most documents without looking at their structure; otherwise one
+    vectorized pass over the bytes finds the first violation. Malformed
+    documents are left for the parser to reject.
+
+    Args:
+        buf: UTF-8 encoded JSON
+        limits: Limits to enforce; ``max_size`` is checked by the caller
+
+    Raises:
+        JSONParseError: At the first value crossing a limit
+    """
+    length = len(buf)
+    data = _bytes_of(buf)
+    if data is not None:
+        count = data.count
+    else:
+        import numpy as np
+
+        array = np.frombuffer(buf, dtype=np.uint8)
+
+        def count(char: bytes) -> int:
+            return int(np.count_nonzero(array == char[0]))
+
+    opens = None
+    depth_ok = limits.max_depth is None
+    if not depth_ok:
+        # One pass reduces the document to its quotes and brackets; opening
+        # brackets are counted on that much shorter skeleton
+        source = data if data is not None else bytes(buf)
+        skeleton = source.translate(_BRACKETS, _NOT_STRUCTURAL)
+        opens = skeleton.count(b"[")
+        depth_ok = opens <= limits.max_depth
+        if not depth_ok:
+            if b"\\" in source:
+                skeleton = _skeleton(source)
+            depth_ok = _depth_within(skeleton, limits.max_depth)
+    strings_ok = (
+        limits.max_string_length is None or length - 2 <= limits.max_string_length
+    )
+    numbers_ok = limits.max_number_length is None or length <= limits.max_number_length
+    elements_ok = limits.max_elements is None
+    if not elements_ok:
+        # Every value but the root follows one of [ { , : so this bounds the count
+        if opens is None:
+            opens = count(b"[") + count(b"{")
+        elements_ok = 1 + opens + count(b",") + count(b":") <= limits.max_elements
+    if depth_ok and strings_ok and numbers_ok and elements_ok:
+        return
+    _scan(buf, limits, depth_ok, strings_ok, numbers_ok, elements_ok)
+
+
+def _bytes_of(buf: Union[bytes, memoryview]) -> Optional[Union[bytes, bytearray]]:
+    """Get the bytes object a buffer is or fully covers, None for other views"""
+    if not isinstance(buf, memoryview):
+        return buf
+    if type(buf.obj) in (bytes, bytearray) and len(buf.obj) == len(buf):
+        return buf.obj
+    return None
+
+
+def _skeleton(data: bytes) -> bytes:
+    """
+    Reduce a document to its quotes and brackets, both kinds written as []
+
+    Escape pairs are dropped first so every remaining quote delimits a
+    string.
+    """
+    data = data.replace(b"\\\\", b"").replace(b'\\"', b"")
+    return data.translate(_BRACKETS, _NOT_STRUCTURAL)
+
+
+def _depth_within(brackets: bytes, max_depth: int) -> bool:
+    """
+    Check cheaply that containers nest at most ``max_depth`` deep
+
+    Takes the :func:`_skeleton` of the document. String contents are cut
+    out, and each round of removing innermost ``[]`` pairs then peels one
+    nesting level. All passes run in C over bytes, so this costs a
+    fraction of the NumPy scan. Malformed bracket sequences return False
+    and are left to the scan and the parser.
+    """
+    if b'"' in brackets:
+        if 2 * brackets.count(b'""') == brackets.count(b'"'):
+            # Quotes pair up as adjacent "" from the left, so no string
+            # holds a bracket and the quotes can simply go
+            brackets = brackets.translate(None, b'"')
+        else:
+            # Adjacent quotes enclose nothing structural, whichever strings
+            # they belong to, so most strings vanish with one replace
+            brackets = brackets.replace(b'""', b"")
+            if b'"' in brackets:
+                # Outside strings are the even pieces between quotes
+                brackets = b"".join(brackets.split(b'"')[0::2])
+    for _ in range(max_depth):
+        if not brackets:
+            return True
+        peeled = brackets.replace(b"[]", b"")
+        if len(peeled) == len(brackets):
+            return False
+        brackets = peeled
+    return not brackets
+
+
+def _scan(
+    buf: Union[bytes, memoryview],
+    limits: ParseLimits,
+    depth_ok: bool,
+    strings_ok: bool,
+    numbers_ok: bool,
+    elements_ok: bool,
+) -> None:
+    """
+    Find the first limit violation with NumPy
+
+    Only elementwise comparisons touch every byte; quotes, brackets and
+    token starts are then handled as sparse position arrays, and a token is
+    outside every string when an even number of quotes precedes it.
+    """
+    import numpy as np
+
+    if depth_ok and strings_ok and numbers_ok and elements_ok:
+        return
+    data = np.frombuffer(buf, dtype=np.uint8)
+    quotes = np.flatnonzero(data == 0x22)
+    if len(quotes) and (data[quotes[quotes > 0] - 1] == 0x5C).any():
+        quotes = quotes[~_escaped(data, quotes)]
+
+    def outside(positions: "np.ndarray") -> "np.ndarray":
+        return positions[(np.searchsorted(quotes, positions) & 1) == 0]
+
+    opening = quotes[0::2]
+    violations = []
+
+    if not strings_ok:
+        closing = quotes[1::2]
+        over = np.flatnonzero(
+            closing - opening[: len(closing)] - 1 > limits.max_string_length
+        )
+        if len(over):
+            violations.append((int(opening[over[0]]), 10))
+
+    containers = None
+    if not (depth_ok and elements_ok):
+        brackets = outside(
+            np.flatnonzero(
+                (data == 0x5B) | (data == 0x7B) | (data == 0x5D) | (data == 0x7D)
+            )
+        )
+        # [ and { are 0x5B and 0x7B, ] and } two more, clearing bit 1
+        is_open = (data[brackets] & 0x02) != 0
+        containers = brackets[is_open]
+        if not depth_ok:
+            depth = np.cumsum(np.where(is_open, 1, -1))
+            over = np.flatnonzero(depth > limits.max_depth)
+            if len(over):
+                violations.append((int(brackets[over[0]]), 8))
+
+    if not (numbers_ok and elements_ok):
+        digit = (data >= 0x30) & (data <= 0x39)
+        continues = (
+            digit
+            | (data == 0x2B)
+            | (data == 0x2D)
+            | (data == 0x2E)
+            | ((data | 0x20) == 0x65)
+        )
+        # Numbers start with a digit or minus that does not continue a token
+        first = digit | (data == 0x2D)
+        first[1:] &= ~continues[:-1]
+        number_starts = outside(np.flatnonzero(first))
+        if not numbers_ok and len(number_starts):
+            ends = np.flatnonzero(continues & ~np.append(continues[1:], False)) + 1
+            stops = ends[np.searchsorted(ends, number_starts, side="right")]
+            over = np.flatnonzero(stops - number_starts > limits.max_number_length)
+            if len(over):
+                violations.append((int(number_starts[over[0]]), 11))
+        if not elements_ok:
+            literals = outside(
+                np.flatnonzero((data == 0x74) | (data == 0x66) | (data == 0x6E))
+            )
+            starts = np.concatenate((opening, number_starts, containers, literals))
+            if len(starts) > limits.max_elements:
+                starts.sort()
+                violations.append((int(starts[limits.max_elements]), 12))
+
+    if violations:
+        position, code = min(violations)
+        raise JSONParseError(ERROR_MESSAGES[code], position)
+
+
+def _escaped(data: "np.ndarray", quotes: "np.ndarray") -> "np.ndarray":
+    """Mark quotes preceded by an odd run of backslashes"""
+    import numpy as np
+
+    backslashes = np.flatnonzero(data == 0x5C)
+    # Start of the backslash run each backslash belongs to
+    run_first = np.diff(backslashes, prepend=-2) != 1
+    run_start = backslashes[
+        np.maximum.accumulate(np.where(run_first, np.arange(len(backslashes)), 0))
+    ]
+    before = np.searchsorted(backslashes, quotes - 1)
+    found = before < len(backslashes)
+    found[found] = backslashes[before[found]] == quotes[found] - 1
+    escaped = np.zeros(len(quotes), dtype=bool)
+    run_length = quotes[found] - run_start[before[found]]
+    escaped[found] = (run_length & 1) == 1
+    return escaped
@@ -0,0 +1,212 @@
+"""
+Low-overhead parse instrumentation: phase timers, counters and latency histograms
+"""
+
+import threading
+import tracemalloc
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+# Phases timed for each sampled parse. "wasm" is the call into the wasm tape
+# builder, "convert" the construction of Python objects (for the json backend
+# that is the whole json.loads call)
+PHASES = ("encode", "decompress", "wasm", "convert", "total")
+
+# Upper bounds of the latency buckets, 1 µs to about 1 s in steps of 4; one
+# more bucket counts anything slower
+LATENCY_BUCKETS_NS = tuple(1000 * 4**i for i in range(11))
+
+
+class MetricsCollector:
+    """
+    Cumulative counters and fixed-bucket latency histograms per phase
+
+    Safe to update from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        # phase -> [count, total_ns, max_ns, bucket counts]
+        self._phases: Dict[str, List[Any]] = {}
+
+    def record(self, timings: Dict[str, int], counters: Dict[str, int]) -> None:
+        """
+        Add the timings and counters of one parse
+
+        Args:
+            timings: Nanoseconds spent per phase
+            counters: Increments of cumulative counters
+        """
+        with self._lock:
+            for phase, elapsed in timings.items():
+                stats = self._phases.get(phase)
+                if stats is None:
+                    stats = self._phases[phase] = [
+                        0,
+                        0,
+                        0,
+                        [0] * (len(LATENCY_BUCKETS_NS) + 1),
+                    ]
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+                stats[3][bisect_left(LATENCY_BUCKETS_NS, elapsed)] += 1
+            for name, value in counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a copy of the collected metrics
+
+        Returns:
+            ``counters`` by name, and per phase the number of samples
+            (``count``), ``total_ns``, ``max_ns``, ``mean_ns`` and
+            ``buckets``: sample counts per bound of ``buckets_ns``, the last
+            one counting samples above every bound
+        """
+        with self._lock:
+            phases = {
+                phase: {
+                    "count": count,
+                    "total_ns": total,
+                    "max_ns": maximum,
+                    "mean_ns": total // count if count else 0,
+                    "buckets": list(buckets),
+                }
+                for phase, (count, total, maximum, buckets) in self._phases.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "phases": phases,
+                "buckets_ns": list(LATENCY_BUCKETS_NS),
+            }
+
+    def reset(self) -> None:
+        """Clear all counters and histograms"""
+        with self._lock:
+            self._counters.clear()
+            self._phases.clear()
+
+
+_process_metrics = MetricsCollector()
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Get the metrics of every instrumented parser in this process"""
+    return _process_metrics.snapshot()
+
+
+def reset_metrics() -> None:
+    """Reset the process-wide metrics"""
+    _process_metrics.reset()
+
+
+class Instrumentation:
+    """
+    Per-parser phase timing with sampling
+
+    A parse is timed only when :meth:`begin` selects it; parsers check
+    ``enabled`` before anything else, so a disabled instance costs one
+    attribute lookup per parse. Backends add phase timings with :meth:`add`
+    while ``active`` is set. Every timed parse is recorded both in this
+    instance's collector and in the process-wide one.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 1.0,
+        trace_allocations: bool = False,
+    ):
+        """
+        Args:
+            enabled: Time parses at all
+            sample_rate: Fraction of parses timed, between 0 and 1
+            trace_allocations: Also account bytes allocated during timed
+                parses with ``tracemalloc``; this slows them down considerably
+
+        Raises:
+            ValueError: If ``sample_rate`` is outside [0, 1]
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.enabled = enabled and sample_rate > 0
+        self.sample_rate = sample_rate
+        self.trace_allocations = trace_allocations
+        self.active = False
+        self.collector = MetricsCollector()
+        self._credit = 0.0
+        self._timings: Dict[str, int] = {}
+        self._started_tracing = False
+        self._memory_start = 0
+
+    def begin(self, force: bool = False) -> bool:
+        """
+        Decide whether to time the next parse and start timing it
+
+        Sampling is deterministic: with a rate of 0.25 every fourth parse is
+        timed.
+
+        Args:
+            force: Time this parse regardless of the sampling rate
+
+        Returns:
+            True if the parse is timed; :meth:`end` must follow
+        """
+        if not force:
+            self._credit += self.sample_rate
+            if self._credit < 1.0:
+                return False
+            self._credit -= 1.0
+        self.active = True
+        self._timings = {}
+        if self.trace_allocations:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            reset_peak = getattr(tracemalloc, "reset_peak", None)
+            if reset_peak is not None:
+                reset_peak()
+            self._memory_start = tracemalloc.get_traced_memory()[0]
+        return True
+
+    def add(self, phase: str, elapsed_ns: int) -> None:
+        """Add time spent in a phase of the current parse"""
+        self._timings[phase] = self._timings.get(phase, 0) + elapsed_ns
+
+    def end(self, size: int, error: bool = False) -> Dict[str, int]:
+        """
+        Finish timing the current parse and record it
+
+        Args:
+            size: Input size in bytes
+            error: Whether the parse failed
+
+        Returns:
+            Nanoseconds per phase, plus ``allocated_bytes`` (the peak of
+            traced memory above the starting point) when allocations are traced
+        """
+        self.active = False
+        timings = self._timings
+        counters = {"parses": 1, "bytes": size, "errors": int(error)}
+        result = dict(timings)
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+            allocated = max(peak, current) - self._memory_start
+            counters["allocated_bytes"] = allocated
+            result["allocated_bytes"] = allocated
+        self.collector.record(timings, counters)
+        _process_metrics.record(timings, counters)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the metrics collected by this instance"""
+        return self.collector.snapshot()
+
+    def reset(self) -> None:
+        """Reset the metrics collected by this instance"""
+        self.collector.reset()
@@ -0,0 +1,242 @@
+"""
+Multi-core batch parsing on a pool of warm worker processes
+"""
+
+import os
+import queue
+from collections import deque
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .exceptions import JSONParseError
+
+# Parser owned by each worker process, created once by the pool initializer
+_worker_parser = None
+
+
+def _init_worker(parser_kwargs: Dict[str, Any]) -> None:
+    """Create the worker's parser so every batch runs on a warm instance"""
+    global _worker_parser
+    from .parser import JSONParser
+
+    _worker_parser = JSONParser(**parser_kwargs)
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to a block owned by the parent process"""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block with the resource tracker,
+        # which is shared with the parent (see ParallelParser.__init__), so
+        # the parent's unlink() still balances the registration
+        return SharedMemory(name=name)
+
+
+def _parse_batch(
+    shm_name: str, offsets: List[int]
+) -> Tuple[List[Any], List[Tuple[int, str]]]:
+    """
+    Parse every document packed into a shared memory block
+
+    Args:
+        shm_name: Name of the block holding the concatenated documents
+        offsets: Document boundaries, ``len(docs) + 1`` entries
+
+    Returns:
+        Parsed results (None for failures) and ``(position, message)`` errors
+    """
+    shm = _attach(shm_name)
+    try:
+        results: List[Any] = []
+        errors: List[Tuple[int, str]] = []
+        for i in range(len(offsets) - 1):
+            view = shm.buf[offsets[i] : offsets[i + 1]]
+            try:
+                results.append(_worker_parser.parse(view))
+            except JSONParseError as e:
+                results.append(None)
+                errors.append((i, str(e)))
+            finally:
+                view.release()
+        return results, errors
+    finally:
+        shm.close()
+
+
+class _Batch:
+    """A batch of documents packed into shared memory and sent to a worker"""
+
+    def __init__(self, start: int, docs: List[Any]):
+        from .parser import _as_view
+
+        self.start = start
+        self.count = len(docs)
+        views = [_as_view(doc) for doc in docs]
+        self.offsets = [0]
+        for view in views:
+            self.offsets.append(self.offsets[-1] + view.nbytes)
+        self.shm = SharedMemory(create=True, size=max(1, self.offsets[-1]))
+        for view, begin, end in zip(views, self.offsets, self.offsets[1:]):
+            self.shm.buf[begin:end] = view
+            view.release()
+        self.result = None
+
+    def unpack(self, outcome: Tuple[List[Any], List[Tuple[int, str]]]) -> List[Any]:
+        """Get the batch results, raising the first per-document error"""
+        results, errors = outcome
+        if errors:
+            position, message = errors[0]
+            raise JSONParseError(f"Document {self.start + position}: {message}")
+        return results
+
+    def release(self) -> None:
+        """Free the shared memory block"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ParallelParser:
+    """
+    Parses many documents across a pool of worker processes
+
+    Each worker keeps its own warm :class:`JSONParser` for the lifetime of the
+    pool. Documents travel to the workers in batches packed into shared
+    memory, so only parsed results are pickled. At most ``2 * workers``
+    batches are in flight, which bounds memory for unbounded input iterators.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+        parser_kwargs: Optional[Dict[str, Any]] = None,
+        mp_context: Optional[str] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        # Workers must share the parent's resource tracker; a tracker of their
+        # own would unlink blocks the parent still owns when a worker exits
+        resource_tracker.ensure_running()
+        self._pool = get_context(mp_context).Pool(
+            self.workers, initializer=_init_worker, initargs=(parser_kwargs or {},)
+        )
+
+    def _batches(self, docs: Iterable[Any], batch_size: int) -> Iterator[_Batch]:
+        """Group documents into packed batches"""
+        pending: List[Any] = []
+        start = 0
+        for doc in docs:
+            pending.append(doc)
+            if len(pending) >= batch_size:
+                yield _Batch(start, pending)
+                start += len(pending)
+                pending = []
+        if pending:
+            yield _Batch(start, pending)
+
+    def map(
+        self,
+        docs: Iterable[Any],
+        ordered: bool = True,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Parse documents in parallel
+
+        Args:
+            docs: JSON texts or bytes-like objects; any iterable
+            ordered: Yield results in input order. With False, batches are
+                yielded as soon as they finish and each item is an
+                ``(index, result)`` tuple
+            batch_size: Documents per batch, defaults to the pool setting
+
+        Yields:
+            Parsed results, or ``(index, result)`` tuples when unordered
+
+        Raises:
+            JSONParseError: If any document fails to parse
+        """
+        batches = self._batches(docs, batch_size or self.batch_size)
+        if ordered:
+            return self._map_ordered(batches)
+        return self._map_unordered(batches)
+
+    def _map_ordered(self, batches: Iterator[_Batch]) -> Iterator[Any]:
+        pending: Deque[_Batch] = deque()
+        try:
+            for batch in batches:
+                batch.result = self._pool.apply_async(
+                    _parse_batch, (batch.shm.name, batch.offsets)
+                )
+                pending.append(batch)
+                if len(pending) >= 2 * self.workers:
+                    yield from self._finish(pending.popleft())
+            while pending:
+                yield from self._finish(pending.popleft())
+        finally:
+            self._drain(pending)
+
+    def _map_unordered(self, batches: Iterator[_Batch]) -> Iterator[Tuple[int, Any]]:
+        done: "queue.Queue[Tuple[_Batch, Any, Optional[BaseException]]]" = queue.Queue()
+        inflight: Dict[int, _Batch] = {}
+        try:
+            for batch in batches:
+                self._pool.apply_async(
+                    _parse_batch,
+                    (batch.shm.name, batch.offsets),
+                    callback=lambda r, b=batch: done.put((b, r, None)),
+                    error_callback=lambda e, b=batch: done.put((b, None, e)),
+                )
+                inflight[batch.start] = batch
+                if len(inflight) >= 2 * self.workers:
+                    yield from self._finish_unordered(done.get(), inflight)
+            while inflight:
+                yield from self._finish_unordered(done.get(), inflight)
+        finally:
+            while inflight:
+                batch = done.get()[0]
+                inflight.pop(batch.start).release()
+
+    def _finish(self, batch: _Batch) -> List[Any]:
+        try:
+            return batch.unpack(batch.result.get())
+        finally:
+            batch.release()
+
+    def _finish_unordered(
+        self,
+        item: Tuple[_Batch, Any, Optional[BaseException]],
+        inflight: Dict[int, _Batch],
+    ) -> List[Tuple[int, Any]]:
+        batch, outcome, error = item
+        del inflight[batch.start]
+        try:
+            if error is not None:
+                raise error
+            return list(enumerate(batch.unpack(outcome), batch.start))
+        finally:
+            batch.release()
+
+    def _drain(self, pending: Deque[_Batch]) -> None:
+        """Wait for abandoned batches so their shared memory can be freed"""
+        while pending:
+            batch = pending.popleft()
+            try:
+                batch.result.wait()
+            finally:
+                batch.release()
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> "ParallelParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
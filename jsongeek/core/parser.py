@@ -1,173 +1,1100 @@
 """
 Core JSON parser implementation with SIMD optimization and smart compression
 """
-from typing import Any, Dict, Optional, Union, List
-import time
-import numpy as np
-from wasmer import Store, Module, Instance
+
+import json
+import mmap
 import os
+import threading
+import time
+import warnings
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
-from .exceptions import JSONParseError
+from ..utils.compression import FRAME_MAGIC, FrameError, SmartCompressor, frame_length
 from ..utils.simd_detection import has_simd_support
-from ..utils.compression import SmartCompressor
+from .backends import (
+    ParserBackend,
+    available_backends,
+    create_backend,
+    full_parse_backends,
+    get_selector,
+    native_tape_backends,
+    record_backend_call,
+)
+from .cache import ParseCache, get_default_cache
+from .columns import convert_columns, extract_columns
+from .exceptions import JSONParseError
+from .intern import INTERN_MAX_SIZE, InternTable
+from .lazy import LazyDocument
+from .limits import ParseLimits, check_limits, size_error
+from .metrics import Instrumentation
+from .query import PathLike, compile_path, evaluate, evaluate_objects, extract_from_tape
+from .records import (
+    build_records,
+    convert_records,
+    infer_fields,
+    infer_object_fields,
+    schema_fields,
+)
+from .runtime import ARENA_IDLE_TIMEOUT, ARENA_INITIAL_SIZE
+from .serializer import get_serializer
+from .tape import Tape
+from .validator import JsonValidator
+
+# Anything parse() accepts: text, or any object exposing a contiguous byte buffer
+JSONInput = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+# First bytes of frames and zlib streams, the only inputs that are decompressed
+_COMPRESSED_LEAD = frozenset((FRAME_MAGIC[0], 0x78))
+# Parsers kept by loads() per thread, one per distinct set of options
+LOADS_POOL_SIZE = 8
+_loads_pool = threading.local()
+
+
+def _as_view(data: JSONInput) -> memoryview:
+    """
+    Get a flat byte view over parser input without copying bytes-like objects
+
+    Args:
+        data: JSON text or bytes-like object
+
+    Returns:
+        One-dimensional unsigned byte view
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    view = memoryview(data)
+    if view.ndim != 1 or view.format != "B":
+        view = view.cast("B")
+    return view
+
 
 class JSONParser:
     """
     High-performance JSON parser with SIMD optimization and smart compression
+
+    With ``backend="auto"`` every input is routed to a registered backend
+    (stdlib ``json`` or a third-party engine) using the size crossover points
+    from :func:`jsongeek.core.backends.calibrate`; without a calibration
+    every input goes to the stdlib backend. Pass a backend name to force a
+    single backend. The wasm backends never take whole-document parses:
+    they serve :meth:`parse_tape`, :meth:`parse_lazy`, :meth:`extract`,
+    :meth:`parse_columns` and :meth:`parse_records` whenever available, and
+    :meth:`parse_batch` when forced, while :meth:`parse` goes to the stdlib
+    backend.
+
+    Equal object keys share one string instance through an intern table that
+    lives for one parse call (``intern_scope="parse"``) or for the parser's
+    lifetime, bounded by ``intern_max_size`` (``intern_scope="parser"``).
+    ``dedup_strings=N`` does the same for string values of at most N
+    characters, which pays off for enum-like fields.
+
+    With ``instrument=True`` a ``sample_rate`` fraction of parses is timed
+    per phase (encoding, decompression, wasm call, object conversion) into
+    counters and latency histograms, see :meth:`metrics_snapshot`;
+    ``trace_allocations`` adds tracemalloc-based allocation accounting.
+
+    With ``validate_utf8`` (the default) malformed UTF-8 fails the parse
+    with its byte position; wasm backends check it in the same pass that
+    builds the tape, skipping ASCII runs in bulk. ``validate_utf8=False`` is
+    for trusted input: nothing is checked, and malformed bytes come through
+    as lone surrogates (``surrogateescape``) instead of raising.
+
+    ``max_depth``, ``max_size``, ``max_string_length``,
+    ``max_number_length`` and ``max_elements`` bound the documents accepted
+    (see :class:`~jsongeek.core.limits.ParseLimits`). They are checked during
+    the structural scan, before any Python object is built, and a document
+    crossing one fails with the byte position of the offending value.
+
+    ``cache=True`` (or a :class:`~jsongeek.core.cache.ParseCache`) makes
+    :meth:`parse` look results up by a hash of the input first; ``True``
+    shares one process-wide cache between parsers and :func:`loads` calls.
     """
+
     def __init__(
         self,
         use_simd: bool = True,
         validate_utf8: bool = True,
         max_depth: int = 32,
-        enable_compression: bool = True
+        enable_compression: bool = True,
+        backend: str = "auto",
+        arena_size: int = ARENA_INITIAL_SIZE,
+        arena_idle_timeout: float = ARENA_IDLE_TIMEOUT,
+        intern_keys: bool = True,
+        intern_scope: str = "parse",
+        intern_max_size: int = INTERN_MAX_SIZE,
+        dedup_strings: int = 0,
+        instrument: bool = False,
+        sample_rate: float = 1.0,
+        trace_allocations: bool = False,
+        cache: Union[bool, ParseCache, None] = None,
+        max_size: Optional[int] = None,
+        max_string_length: Optional[int] = None,
+        max_number_length: Optional[int] = None,
+        max_elements: Optional[int] = None,
     ):
         self.use_simd = use_simd and has_simd_support()
         self.validate_utf8 = validate_utf8
         self.max_depth = max_depth
         self.enable_compression = enable_compression
-        self._instance = self._initialize_wasm()
+        self.backend = backend
+        if intern_scope not in ("parse", "parser"):
+            raise ValueError(
+                f"intern_scope must be 'parse' or 'parser', not {intern_scope!r}"
+            )
+        self._backend_options = {
+            "arena_size": arena_size,
+            "arena_idle_timeout": arena_idle_timeout,
+            "intern_keys": intern_keys,
+            "intern_scope": intern_scope,
+            "intern_max_size": intern_max_size,
+            "dedup_strings": dedup_strings,
+            "max_size": max_size,
+            "max_string_length": max_string_length,
+            "max_number_length": max_number_length,
+            "max_elements": max_elements,
+        }
+        self._limits = ParseLimits(
+            max_depth, max_size, max_string_length, max_number_length, max_elements
+        )
+        # Part of every result cache key: the shared cache must not hand a
+        # document accepted under loose limits to a stricter parser
+        self._limits_key = repr(tuple(self._limits)).encode("ascii")
+        # Whether any limit besides max_size needs the structural scan
+        self._scan_limits = self._limits._replace(max_size=None) != ParseLimits(
+            max_depth=None
+        )
+        # Shared by every backend of this parser; emptied before each parse
+        # unless intern_scope is "parser"
+        self._key_table = InternTable(intern_max_size) if intern_keys else None
+        self._string_table = (
+            InternTable(intern_max_size, max_length=dedup_strings)
+            if dedup_strings > 0
+            else None
+        )
+        self._scoped_tables = [
+            table
+            for table in (self._key_table, self._string_table)
+            if table is not None and intern_scope == "parse"
+        ]
+        self._instrumentation = Instrumentation(
+            instrument, sample_rate, trace_allocations
+        )
+        self._last_timings: Dict[str, int] = {}
+        if cache is True:
+            cache = get_default_cache()
+        self._cache: Optional[ParseCache] = (
+            cache if isinstance(cache, ParseCache) else None
+        )
+        self._backends: Dict[str, ParserBackend] = {}
+        usable = self._resolve_backends(backend)
+        # A parser forced onto a tape-only backend parses whole documents
+        # with the stdlib backend
+        self._allowed_backends = full_parse_backends(usable) or ["json"]
+        # Tape consumers (lazy documents, extraction, columns, records) use
+        # a native tape whenever one is allowed, whatever the calibration
+        self._tape_backends = native_tape_backends(usable)
         self._compressor = SmartCompressor() if enable_compression else None
         self._performance_metrics = {}
+        self._last_backend: Optional[str] = None
+        self._parallel = None
 
-    def _initialize_wasm(self) -> Instance:
-        """Initialize the WebAssembly module with SIMD support"""
-        store = Store()
-        module_path = os.path.join(
-            os.path.dirname(__file__),
-            "wasm",
-            "simd.wasm" if self.use_simd else "fallback.wasm"
-        )
-        
-        with open(module_path, "rb") as f:
-            module = Module(store, f.read())
-            return Instance(module)
+    def _resolve_backends(self, backend: str) -> List[str]:
+        """
+        Get the backends this parser may use
 
-    def parse_with_metrics(self, json_str: str) -> Dict[str, Any]:
+        Args:
+            backend: ``"auto"`` or the name of a registered backend
+
+        Returns:
+            Usable backend names, before full parses and tape consumers
+            each pick the ones they route to
+
+        Raises:
+            ValueError: If the requested backend is unknown or unavailable
+        """
+        available = available_backends()
+        if backend != "auto":
+            if backend not in available:
+                raise ValueError(f"Parser backend not available: {backend}")
+            return [backend]
+        if not self.use_simd:
+            available = [name for name in available if name != "wasm-simd"]
+        return available
+
+    def _get_backend(self, name: str) -> ParserBackend:
+        """Get this parser's backend object, creating it on first use"""
+        backend = self._backends.get(name)
+        if backend is None:
+            backend = create_backend(name)
+            configure = getattr(backend, "configure", None)
+            if configure is not None:
+                configure(
+                    {
+                        **self._backend_options,
+                        "key_table": self._key_table,
+                        "string_table": self._string_table,
+                        "instrumentation": self._instrumentation,
+                        "limits": self._limits,
+                        "validate_utf8": self.validate_utf8,
+                    }
+                )
+            self._backends[name] = backend
+        return backend
+
+    def close(self) -> None:
+        """Close backends, returning borrowed WebAssembly instances to the pool"""
+        backends, self._backends = self._backends, {}
+        for backend in backends.values():
+            backend.close()
+        parallel, self._parallel = self._parallel, None
+        if parallel is not None:
+            parallel.close()
+
+    def __enter__(self) -> "JSONParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if getattr(self, "_backends", None) or getattr(self, "_parallel", None):
+            self.close()
+
+    def parse_with_metrics(self, json_str: JSONInput) -> Dict[str, Any]:
         """
         Parse JSON with performance metrics
-        
+
+        The parse is always timed, whatever the sampling rate, and is
+        recorded in the parser's and the process-wide metrics.
+        ``memory_used`` is only measured when the parser was created with
+        ``trace_allocations=True`` and is 0 otherwise. The interning
+        counters are None when no intern table took part in the parse, as
+        with the stdlib backend and per-document key interning.
+
         Args:
-            json_str: JSON string to parse
-            
+            json_str: JSON text or bytes-like object to parse
+
         Returns:
             Dictionary containing parsed data and performance metrics
         """
-        start_time = time.time()
-        start_memory = self.get_memory_usage()
-        
-        result = self.parse(json_str)
-        
-        end_time = time.time()
-        end_memory = self.get_memory_usage()
-        
+        start_intern = self._intern_stats()
+
+        self._instrumentation.begin(force=True)
+        result = self._parse_timed(json_str)
+        timings = dict(self._last_timings)
+        allocated = timings.pop("allocated_bytes", 0)
+
+        end_intern = self._intern_stats()
+
         metrics = {
-            "parse_time": end_time - start_time,
-            "memory_used": end_memory - start_memory,
+            "parse_time": timings["total"] / 1e9,
+            "memory_used": allocated / 1024 / 1024,
+            # Nanoseconds per phase
+            "phases": timings,
+            "backend": self._last_backend,
             "simd_enabled": self.use_simd,
-            "compression_enabled": self.enable_compression
+            "compression_enabled": self.enable_compression,
+            # Duplicate strings replaced by a shared instance during this
+            # parse; None when no intern table was consulted
+            "interned_keys": None,
+            "deduplicated_strings": None,
+            "intern_saved_bytes": None,
         }
-        
+        for name, metric in (
+            ("keys", "interned_keys"),
+            ("strings", "deduplicated_strings"),
+        ):
+            if name not in end_intern:
+                continue
+            before, after = start_intern[name], end_intern[name]
+            if after["hits"] + after["misses"] == before["hits"] + before["misses"]:
+                continue
+            metrics[metric] = after["hits"] - before["hits"]
+            metrics["intern_saved_bytes"] = (
+                (metrics["intern_saved_bytes"] or 0)
+                + after["saved_bytes"]
+                - before["saved_bytes"]
+            )
+
         if self.enable_compression:
             metrics["compression_ratio"] = self._compressor.get_ratio()
-            
+
         self._performance_metrics = metrics
         return {"data": result, "metrics": metrics}
 
-    def parse(self, json_str: str) -> Any:
+    def parse(self, data: JSONInput) -> Any:
         """
-        Parse a JSON string into Python objects with SIMD optimization
-        
+        Parse JSON into Python objects with SIMD optimization
+
+        Each input is routed to a backend by size (see ``backend``). ``bytes``,
+        ``bytearray``, ``memoryview`` and ``mmap`` inputs are not copied
+        before they reach the backend. ``str`` input is UTF-8 encoded first.
+
         Args:
-            json_str: JSON string to parse
-            
+            data: JSON text or bytes-like object to parse
+
         Returns:
             Parsed Python object
-            
+
         Raises:
             JSONParseError: If parsing fails
         """
+        cache = self._cache
+        if cache is None:
+            return self._parse_input(data)
+        # Compressed input only parses when decompression is enabled,
+        # malformed UTF-8 only without validation, and large or deep
+        # documents only within the parser's limits
+        key = cache.key(
+            data,
+            (b"z" if self.enable_compression else b"")
+            + (b"" if self.validate_utf8 else b"u")
+            + self._limits_key,
+        )
+        found, result = cache.lookup(key)
+        if not found:
+            result = self._parse_input(data)
+            cache.store(key, result)
+        return result
+
+    def _parse_input(self, data: JSONInput) -> Any:
+        """Parse like :meth:`parse`, bypassing the result cache"""
+        instrumentation = self._instrumentation
+        if instrumentation.enabled and instrumentation.begin():
+            return self._parse_timed(data)
+        view = None
+        try:
+            view = _as_view(data)
+            return self._parse_buffer(self._decompress(view))
+        except JSONParseError:
+            raise
+        except Exception as e:
+            raise JSONParseError(str(e))
+        finally:
+            # Release promptly so callers can close an mmap right after parsing
+            if view is not None:
+                view.release()
+
+    def _parse_timed(self, data: JSONInput) -> Any:
+        """Parse like :meth:`parse` while timing each phase; begin() must precede"""
+        instrumentation = self._instrumentation
+        start = time.perf_counter_ns()
+        view = None
+        size = 0
+        failed = True
         try:
+            view = _as_view(data)
+            encoded = time.perf_counter_ns()
+            if isinstance(data, str):
+                instrumentation.add("encode", encoded - start)
+            size = len(view)
+            buf = self._decompress(view)
             if self.enable_compression:
-                json_str = self._compressor.decompress(json_str)
-                
-            # Convert string to numpy array for SIMD processing
-            if self.use_simd:
-                data = np.frombuffer(json_str.encode(), dtype=np.uint8)
-                result = self._instance.exports.parse_simd(data.tobytes())
-            else:
-                result = self._instance.exports.parse(json_str)
-                
+                instrumentation.add("decompress", time.perf_counter_ns() - encoded)
+            result = self._parse_buffer(buf)
+            failed = False
             return result
+        except JSONParseError:
+            raise
         except Exception as e:
             raise JSONParseError(str(e))
+        finally:
+            if view is not None:
+                view.release()
+            instrumentation.add("total", time.perf_counter_ns() - start)
+            self._last_timings = instrumentation.end(size, failed)
+
+    def parse_file(self, path: str) -> Any:
+        """
+        Parse a JSON file by memory-mapping it instead of reading it into a string
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            Parsed Python object
+
+        Raises:
+            JSONParseError: If parsing fails
+        """
+        with open(path, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return self.parse(b"")
+            with mapped:
+                return self.parse(mapped)
+
+    def parse_tape(self, data: JSONInput) -> Tape:
+        """
+        Build the structural tape of a document without converting it
+
+        The tape references the input buffer, so bytes-like inputs must stay
+        alive and unmodified while it is used. A tape built by a wasm backend
+        also lives in that backend's memory and is only valid until this
+        parser's next call; use :meth:`Tape.copy` to keep it longer.
+
+        Args:
+            data: JSON text or bytes-like object to index
+
+        Returns:
+            Tape over the (decompressed) input
+
+        Raises:
+            JSONParseError: If the document is malformed
+        """
+        try:
+            buf = self._decompress(_as_view(data))
+            return self._build_tape(buf, self._select_tape_backend(len(buf)))
+        except JSONParseError:
+            raise
+        except Exception as e:
+            raise JSONParseError(str(e))
+
+    def parse_lazy(self, data: JSONInput) -> LazyDocument:
+        """
+        Parse JSON into a document that decodes values only when accessed
+
+        When a backend with a native tape (wasm) is available and allowed,
+        only the structural tape is built up front; strings, numbers and
+        nested containers are decoded from the input buffer on first access.
+        This does not depend on :func:`~jsongeek.core.backends.calibrate`,
+        and is much cheaper than :meth:`parse` when only a few fields of a
+        large document are read. The document keeps a reference to the
+        input, so bytes-like inputs must stay unmodified while it is used,
+        and an uncompressed ``mmap`` input must stay open until the document
+        is released.
+
+        Without such a backend, as with ``backend="json"`` or when wasmer
+        is not installed, the input is parsed eagerly with ``json.loads``:
+        a tape built in Python costs more than converting the whole
+        document. The returned document then holds plain dicts and lists,
+        and the input is released as with :meth:`parse`.
+
+        Args:
+            data: JSON text or bytes-like object to parse
+
+        Returns:
+            Lazy view of the document
+
+        Raises:
+            JSONParseError: If the document is malformed
+        """
+        tape, document = self._tape_or_document(data)
+        if tape is None:
+            return LazyDocument(None, document)
+        if not tape.entries.flags.owndata:
+            # Tapes built in wasm memory are overwritten by the next call
+            tape = tape.copy()
+        return LazyDocument(tape)
+
+    def _tape_or_document(self, data: JSONInput) -> Tuple[Optional[Tape], Any]:
+        """
+        Build the native tape of an input, or parse it eagerly without one
+
+        Without a native tape backend, a tape is built in Python, far slower
+        than converting the whole document with ``json.loads``. The eager
+        parse releases its view of the input before returning, like
+        :meth:`parse`, so an mmap can be closed right after; a tape decodes
+        values from the input and keeps the view.
+
+        Returns:
+            The tape and None, or None and the parsed document
+        """
+        view = None
+        tape = None
+        buf: Union[bytes, memoryview, None] = None
+        try:
+            try:
+                view = _as_view(data)
+                buf = self._decompress(view)
+            except JSONParseError:
+                raise
+            except Exception as e:
+                raise JSONParseError(str(e))
+            if not self._tape_backends:
+                return None, self._parse_decompressed(buf)
+            tape = self._build_tape(buf, self._select_tape_backend(len(buf)))
+            return tape, None
+        finally:
+            if view is not None and (tape is None or buf is not view):
+                view.release()
+
+    def _select_tape_backend(self, size: int) -> str:
+        """Pick the backend building the tape of an input of ``size`` bytes"""
+        if not self._tape_backends:
+            return self._select_backend(size)
+        name = self._tape_backends[0]
+        self._last_backend = name
+        return name
+
+    def _build_tape(self, buf: Union[bytes, memoryview], name: str) -> Tape:
+        """Build the tape of an already decompressed buffer with backend ``name``"""
+        try:
+            size = len(buf)
+            record_backend_call(name, size)
+            backend = self._get_backend(name)
+            if self._scan_limits and not backend.enforces_limits:
+                check_limits(buf, self._limits)
+            return backend.parse_tape(buf)
+        except JSONParseError:
+            raise
+        except Exception as e:
+            raise JSONParseError(str(e))
+
+    def _parse_decompressed(self, buf: Union[bytes, memoryview]) -> Any:
+        """Parse an already decompressed buffer like :meth:`parse`, without the cache"""
+        try:
+            return self._parse_buffer(buf)
+        except JSONParseError:
+            raise
+        except Exception as e:
+            raise JSONParseError(str(e))
+
+    def extract(
+        self, data: JSONInput, paths: List[PathLike]
+    ) -> Dict[PathLike, List[Any]]:
+        """
+        Extract values by JSON Pointer or JSONPath
+
+        With a native tape (wasm backends, see :meth:`parse_lazy`) all paths
+        are answered from a single structural scan of the input: subtrees no
+        path can match are skipped without being decoded, and only the matched
+        values are converted to Python objects. Other backends parse the document with
+        ``json.loads``, which is faster than a tape built in Python, and
+        select the values from the result; values matched by several paths
+        are then shared.
+
+        Args:
+            data: JSON text or bytes-like object
+            paths: RFC 6901 pointers (``/data/items/*/id``), JSONPath
+                expressions (``$.data.items[*].id``) or compiled paths from
+                :func:`jsongeek.core.query.compile_path`
+
+        Returns:
+            Mapping of each given path to the list of values it matched
+
+        Raises:
+            JSONParseError: If the document is malformed
+            ValueError: If a path expression is malformed
+        """
+        tape, document = self._tape_or_document(data)
+        if tape is not None:
+            return extract_from_tape(tape, paths)
+        return {
+            path: evaluate_objects(
+                document, compile_path(path) if isinstance(path, str) else path
+            )
+            for path in paths
+        }
+
+    def parse_columns(
+        self,
+        data: JSONInput,
+        fields: Optional[List[str]] = None,
+        dtypes: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Parse an array of records straight into NumPy columns
+
+        With a native tape (wasm backends) columns are filled from the
+        structural tape with vectorized NumPy operations and no per-record
+        dict is ever created. Other backends parse the document with
+        ``json.loads``, far faster than a tape built in Python, and fill
+        each column from the parsed records in one NumPy conversion.
+
+        Args:
+            data: JSON text or bytes-like object holding an array of objects
+            fields: Fields to extract, defaults to every key in order of
+                first appearance
+            dtypes: NumPy dtypes by field. Unlisted columns are inferred:
+                int64, float64 or bool for uniform values, object otherwise.
+                Pass a ``"U<n>"`` dtype for fixed-width string columns
+
+        Returns:
+            Mapping of field name to a ``numpy.ma.MaskedArray`` with one item
+            per record, masked where the record lacks the field or holds null
+
+        Raises:
+            JSONParseError: If the input is malformed or not an array of
+                objects, or a value does not fit its column's dtype
+        """
+        tape, document = self._tape_or_document(data)
+        if tape is not None:
+            return extract_columns(tape, fields, dtypes)
+        return convert_columns(document, fields, dtypes)
+
+    def parse_records(
+        self,
+        data: JSONInput,
+        schema: Optional[Union[JsonValidator, Dict[str, Any]]] = None,
+        path: PathLike = "",
+        name: str = "Record",
+    ) -> List[Any]:
+        """
+        Parse an array of objects into compact ``__slots__`` records
+
+        Records take a fraction of a dict's memory and support attribute
+        access, item access, ``get`` and ``to_dict()``. With a native tape
+        (wasm backends) they are built straight from it without a dict per
+        object. Other backends would spend far longer building a tape in
+        Python than ``json.loads`` spends on the whole document, so they
+        parse to dicts and convert the matched elements; the dicts are
+        released when this returns. Building the records takes about twice
+        as long as the parse itself, so this trades throughput for the
+        memory the records save. Elements that do not fit the
+        shape (keys outside the schema, missing required fields,
+        non-objects) are returned as plain values.
+
+        Args:
+            data: JSON text or bytes-like object
+            schema: Object schema, or array schema with object ``items``,
+                as a dict or :class:`JsonValidator`. Inferred from the keys
+                of the records when omitted
+            path: JSON Pointer or JSONPath of the record array, defaults to
+                the root; elements of all matched arrays are concatenated
+            name: Name of the generated record class
+
+        Returns:
+            Records in document order
+
+        Raises:
+            JSONParseError: If the document is malformed
+            ValueError: If the schema does not describe objects with properties,
+                or requires fields that are not among them
+        """
+        compiled = compile_path(path) if isinstance(path, str) else path
+        tape, document = self._tape_or_document(data)
+        if tape is not None:
+            arrays = evaluate(tape, [compiled])[0]
+            if schema is None:
+                fields, required = infer_fields(tape, arrays), ()
+            else:
+                fields, required = schema_fields(schema)
+            return build_records(tape, arrays, fields, required, name)
+
+        arrays = [
+            array
+            for array in evaluate_objects(document, compiled)
+            if type(array) is list
+        ]
+        if schema is None:
+            fields, required = infer_object_fields(chain.from_iterable(arrays)), ()
+        else:
+            fields, required = schema_fields(schema)
+        return convert_records(chain.from_iterable(arrays), fields, required, name)
+
+    def _parse_buffer(self, buf: Union[bytes, memoryview]) -> Any:
+        """
+        Route a byte buffer to a backend chosen by its size and parse it
+
+        Args:
+            buf: Raw JSON bytes
+
+        Returns:
+            Parsed Python object
+        """
+        size = len(buf)
+        name = self._select_backend(size)
+        record_backend_call(name, size)
+        backend = self._get_backend(name)
+        if self._scan_limits and not backend.enforces_limits:
+            check_limits(buf, self._limits)
+        self._start_intern_scope()
+        return backend.parse(buf)
+
+    def _decompress(self, view: memoryview) -> Union[bytes, memoryview]:
+        """
+        Decompress input if enabled, enforcing ``max_size`` on the result
+
+        Framed input is recognised from its first byte, and its header gives
+        the decoded size, so oversized frames are rejected before decoding.
+
+        Raises:
+            JSONParseError: If the (decompressed) document is too large or
+                the compressed data is corrupt
+        """
+        max_size = self._limits.max_size
+        if max_size is not None and len(view) > max_size:
+            raise size_error(self._limits)
+        if not self.enable_compression or not view or view[0] not in _COMPRESSED_LEAD:
+            return view
+        length = frame_length(view)
+        if length is not None and max_size is not None and length > max_size:
+            raise size_error(self._limits)
+        try:
+            buf = self._compressor.decompress_bytes(view, max_size)
+        except FrameError as e:
+            raise JSONParseError(f"Invalid compressed data: {e}", 0)
+        if max_size is not None and len(buf) > max_size:
+            raise size_error(self._limits)
+        return buf
+
+    def _start_intern_scope(self) -> None:
+        """Empty per-parse intern tables so they only live as long as one call"""
+        for table in self._scoped_tables:
+            table.clear()
+
+    def _intern_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the statistics of the enabled intern tables"""
+        stats = {}
+        if self._key_table is not None:
+            stats["keys"] = self._key_table.get_stats()
+        if self._string_table is not None:
+            stats["strings"] = self._string_table.get_stats()
+        return stats
+
+    def _select_backend(self, size: int) -> str:
+        """Pick the backend for an input of ``size`` bytes"""
+        if len(self._allowed_backends) == 1:
+            name = self._allowed_backends[0]
+        else:
+            name = get_selector().select(size, self._allowed_backends)
+        self._last_backend = name
+        return name
+
+    def _select_batch_backend(self, size: int) -> str:
+        """Pick the backend for a batch of ``size`` bytes; a forced one always wins"""
+        if self.backend != "auto":
+            self._last_backend = self.backend
+            return self.backend
+        return self._select_backend(size)
+
+    def parse_batch(self, docs: List[JSONInput]) -> List[Any]:
+        """
+        Parse many small documents with a single call into the backend
+
+        For small payloads the per-call boundary crossing dominates; a
+        parser forced onto a wasm backend packs the whole batch into one
+        buffer and validates it in one call. Otherwise the backend is
+        chosen by the total batch size. A malformed document does not fail
+        the batch: its entry holds the error instead.
+
+        Args:
+            docs: JSON texts or bytes-like objects
+
+        Returns:
+            One entry per document: the parsed object or the JSONParseError
+            describing why it could not be parsed
+        """
+        instrumentation = self._instrumentation
+        timed = instrumentation.enabled and instrumentation.begin()
+        start = time.perf_counter_ns() if timed else 0
+        views: List[memoryview] = []
+        size = 0
+        failed = True
+        try:
+            for doc in docs:
+                views.append(_as_view(doc))
+            bufs: List[Union[bytes, memoryview]] = []
+            errors: Dict[int, JSONParseError] = {}
+            for i, view in enumerate(views):
+                try:
+                    bufs.append(self._decompress(view))
+                except JSONParseError as e:
+                    errors[i] = e
+                    bufs.append(b"")
+                except Exception as e:
+                    errors[i] = JSONParseError(f"Invalid compressed data: {e}")
+                    bufs.append(b"")
+            if timed:
+                instrumentation.add("decompress", time.perf_counter_ns() - start)
+            size = sum(len(buf) for buf in bufs)
+            name = self._select_batch_backend(size)
+            record_backend_call(name, size, calls=len(bufs))
+            backend = self._get_backend(name)
+            if self._scan_limits and not backend.enforces_limits:
+                for i, buf in enumerate(bufs):
+                    if i not in errors:
+                        try:
+                            check_limits(buf, self._limits)
+                        except JSONParseError as e:
+                            errors[i] = e
+                            bufs[i] = b""
+            self._start_intern_scope()
+            results = backend.parse_batch(bufs)
+            for i, error in errors.items():
+                results[i] = error
+            failed = False
+            return results
+        finally:
+            for view in views:
+                view.release()
+            if timed:
+                instrumentation.add("total", time.perf_counter_ns() - start)
+                instrumentation.end(size, failed)
 
     def get_memory_usage(self) -> float:
         """Get current memory usage in MB"""
         import psutil
+
         process = psutil.Process(os.getpid())
         return process.memory_info().rss / 1024 / 1024
 
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Get the cumulative metrics of this parser's timed parses
+
+        Process-wide totals over all parsers are available from
+        :func:`jsongeek.core.metrics.get_metrics`.
+
+        Returns:
+            ``counters`` (``parses``, ``bytes``, ``errors`` and, when
+            allocations are traced, ``allocated_bytes``) and per-phase
+            latency histograms, see
+            :meth:`jsongeek.core.metrics.MetricsCollector.snapshot`
+        """
+        return self._instrumentation.snapshot()
+
+    def reset_metrics(self) -> None:
+        """Reset the cumulative metrics of this parser"""
+        self._instrumentation.reset()
+
     def get_performance_metrics(self) -> Dict[str, Any]:
-        """Get the latest performance metrics"""
-        return self._performance_metrics
+        """
+        Get the latest performance metrics
+
+        Besides the metrics of the last :meth:`parse_with_metrics` call, the
+        ``arena`` entry reports the high-water mark, growth count, allocated
+        size and shrink count of each wasm backend's linear-memory arena,
+        where a shrink replaces the instance holding a block that sat idle
+        for ``arena_idle_timeout`` seconds, ``interning``
+        the cumulative statistics of the key and string intern tables, and
+        ``cache`` the statistics of the result cache, if any.
+        """
+        metrics = dict(self._performance_metrics)
+        if self._cache is not None:
+            metrics["cache"] = self._cache.get_stats()
+        interning = self._intern_stats()
+        if interning:
+            metrics["interning"] = interning
+        for name, backend in self._backends.items():
+            get_stats = getattr(backend, "get_stats", None)
+            arena = get_stats().get("arena") if get_stats is not None else None
+            if arena is not None:
+                metrics.setdefault("arena", {})[name] = arena
+        return metrics
 
-    def process_parallel(self, chunks: List[Dict[str, Any]]) -> List[Any]:
+    def parse_many(
+        self,
+        docs: Iterable[JSONInput],
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+        ordered: bool = True,
+    ) -> Iterator[Any]:
         """
-        Process multiple JSON chunks in parallel using SIMD
-        
+        Parse many documents on a pool of worker processes
+
+        The pool is created on first use and kept until :meth:`close`; each
+        worker holds its own warm parser configured like this one. Documents
+        are sent in batches through shared memory.
+
+        Args:
+            docs: JSON texts or bytes-like objects; any iterable
+            workers: Number of worker processes, defaults to the CPU count
+            batch_size: Documents sent to a worker at a time
+            ordered: Yield results in input order. With False, results are
+                yielded as batches finish, as ``(index, result)`` tuples
+
+        Returns:
+            Iterator over parsed results
+
+        Raises:
+            JSONParseError: If any document fails to parse
+        """
+        from .parallel import ParallelParser
+
+        if self._parallel is None or (workers and workers != self._parallel.workers):
+            if self._parallel is not None:
+                self._parallel.close()
+            self._parallel = ParallelParser(
+                workers=workers,
+                batch_size=batch_size,
+                parser_kwargs={
+                    "use_simd": self.use_simd,
+                    "validate_utf8": self.validate_utf8,
+                    "max_depth": self.max_depth,
+                    "enable_compression": self.enable_compression,
+                    "backend": self.backend,
+                    **self._backend_options,
+                },
+            )
+        return self._parallel.map(docs, ordered=ordered, batch_size=batch_size)
+
+    def process_parallel(
+        self, chunks: List[Dict[str, Any]], workers: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Process multiple JSON chunks in parallel
+
+        Chunks are serialized as JSON and parsed with :meth:`parse_many`.
+
         Args:
             chunks: List of JSON objects to process
-            
+            workers: Number of worker processes, defaults to the CPU count
+
         Returns:
             List of processed results
         """
-        if not self.use_simd:
-            raise ValueError("Parallel processing requires SIMD support")
-            
-        results = []
-        # Convert chunks to numpy array for parallel processing
-        data = np.array([str(chunk).encode() for chunk in chunks], dtype=object)
-        
-        # Process in parallel using SIMD
-        for chunk in data:
-            result = self._instance.exports.parse_simd(chunk.tobytes())
-            results.append(result)
-            
-        return results
-
-def loads(s: Union[str, bytes], **kwargs) -> Any:
+        return list(
+            self.parse_many((json.dumps(chunk) for chunk in chunks), workers=workers)
+        )
+
+
+def loads(s: JSONInput, **kwargs) -> Any:
     """
-    Parse a JSON string with SIMD optimization
-    
-    This is a convenience function that wraps JSONParser
-    
+    Parse JSON text or bytes with SIMD optimization
+
+    This is a convenience function that wraps JSONParser. Each thread keeps
+    up to ``LOADS_POOL_SIZE`` parsers, one per distinct set of options, so
+    repeated calls skip parser and backend setup; with
+    ``intern_scope="parser"`` the intern tables therefore live as long as
+    the thread. Wasm backends borrow an already compiled and instantiated
+    module from the shared pool. Bytes-like input is passed through without
+    being decoded to ``str``. With ``cache=True`` repeated inputs are served
+    from the process-wide result cache.
+
     Args:
-        s: JSON string to parse
+        s: JSON text or bytes-like object to parse
         **kwargs: Additional arguments to pass to JSONParser
-        
+
     Returns:
         Parsed Python object
     """
+    try:
+        key = tuple(sorted(kwargs.items()))
+        parse = _loads_pool.parsers[key]
+    except TypeError:
+        # Unhashable options: use a parser for this call only
+        with JSONParser(**kwargs) as parser:
+            return parser.parse(s)
+    except (AttributeError, KeyError):
+        parse = _pooled_parse(key, kwargs)
+    return parse(s)
+
+
+def _pooled_parse(
+    key: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> Callable[[JSONInput], Any]:
+    """Create the parser loads() keeps for ``kwargs`` on this thread
+
+    The oldest parser is evicted once the pool holds LOADS_POOL_SIZE of them.
+    """
+    parsers = getattr(_loads_pool, "parsers", None)
+    if parsers is None:
+        parsers = _loads_pool.parsers = {}
     parser = JSONParser(**kwargs)
-    return parser.parse(s if isinstance(s, str) else s.decode('utf-8'))
+    if len(parsers) >= LOADS_POOL_SIZE:
+        oldest = next(iter(parsers))
+        parsers.pop(oldest).__self__.close()
+    parse = parsers[key] = parser.parse
+    return parse
+
 
-def dumps(obj: Any, enable_compression: bool = True) -> str:
+def query(data: JSONInput, path: PathLike, **kwargs) -> List[Any]:
     """
-    Serialize object to JSON string with optional compression
-    
+    Get the values matching a JSON Pointer or JSONPath expression
+
+    Compiled expressions are cached, so repeated queries with the same path
+    only scan the document. See :meth:`JSONParser.extract`.
+
+    Args:
+        data: JSON text or bytes-like object
+        path: Pointer, JSONPath expression or compiled path
+        **kwargs: Additional arguments to pass to JSONParser
+
+    Returns:
+        Matching values in document order
+    """
+    with JSONParser(**kwargs) as parser:
+        return parser.extract(data, [path])[path]
+
+
+@overload
+def dumps(
+    obj: Any,
+    enable_compression: Optional[Literal[False]] = None,
+    sort_keys: bool = False,
+) -> str: ...
+
+
+@overload
+def dumps(
+    obj: Any, enable_compression: Literal[True], sort_keys: bool = False
+) -> bytes: ...
+
+
+@overload
+def dumps(
+    obj: Any, enable_compression: Optional[bool] = None, sort_keys: bool = False
+) -> Union[str, bytes]: ...
+
+
+def dumps(
+    obj: Any, enable_compression: Optional[bool] = None, sort_keys: bool = False
+) -> Union[str, bytes]:
+    """
+    Serialize object to JSON text
+
+    Uses the shared :class:`~jsongeek.core.serializer.Serializer`, which
+    also encodes NumPy arrays and scalars, records and lazy documents. Use
+    :func:`dumpb` for UTF-8 bytes with optional compression.
+
     Args:
         obj: Python object to serialize
-        enable_compression: Whether to enable smart compression
-        
+        enable_compression: Deprecated, use :func:`dumpb` instead; when
+            True, the result of ``dumpb(obj)`` is returned
+        sort_keys: Emit object keys in sorted order
+
+    Returns:
+        JSON string, or bytes with ``enable_compression=True``
+    """
+    if enable_compression is not None:
+        warnings.warn(
+            "dumps(enable_compression=...) is deprecated and will be removed in the "
+            "next release; use dumpb() for compressed output",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if enable_compression:
+            return dumpb(obj, sort_keys=sort_keys)
+    return get_serializer(sort_keys).encode(obj)
+
+
+def dumpb(obj: Any, enable_compression: bool = True, sort_keys: bool = False) -> bytes:
+    """
+    Serialize object to UTF-8 encoded JSON with optional compression
+
+    The output is compressed into a frame only when
+    :meth:`SmartCompressor.should_compress` expects it to pay off, so small
+    payloads stay plain. :func:`loads` accepts both forms.
+
+    Args:
+        obj: Python object to serialize
+        enable_compression: Whether to compress payloads that benefit
+        sort_keys: Emit object keys in sorted order
+
     Returns:
-        JSON string
+        JSON bytes, framed and compressed if that pays off
     """
-    import json
-    result = json.dumps(obj)
-    
+    data = get_serializer(sort_keys).encode_bytes(obj)
     if enable_compression:
         compressor = SmartCompressor()
-        result = compressor.compress(result)
-        
-    return result
+        if compressor.should_compress(data):
+            return compressor.compress(data)
+    return data
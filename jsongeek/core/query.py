@@ -0,0 +1,359 @@
+"""
+JSON Pointer and JSONPath evaluation over the structural tape
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .tape import ARRAY, OBJECT, Tape
+
+_NAME = re.compile(r"[^.\[\]]+")
+_WILDCARD = re.compile(r"\[\s*\*\s*\]")
+_INDEX = re.compile(r"\[\s*(-?\d+)\s*\]")
+_SLICE = re.compile(r"\[\s*(-?\d*)\s*:\s*(-?\d*)\s*(?::\s*(-?\d*)\s*)?\]")
+_QUOTED = re.compile(r"""\[\s*('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\s*\]""")
+_ARRAY_INDEX = re.compile(r"(?:0|[1-9][0-9]*)\Z")
+
+
+class Step(NamedTuple):
+    """
+    One selector of a compiled path
+
+    ``kind`` is ``"key"``, ``"index"``, ``"slice"`` or ``"wildcard"``. A
+    ``"key"`` step from a JSON Pointer also carries ``index`` so that it
+    matches the array element with that position. ``recursive`` steps
+    match at any depth below the current value.
+    """
+
+    kind: str
+    key: Optional[str] = None
+    index: Optional[int] = None
+    slice: Optional[slice] = None
+    recursive: bool = False
+
+
+class CompiledPath:
+    """
+    Parsed JSON Pointer or JSONPath expression
+
+    Use :func:`compile_path`, which caches compiled expressions.
+    """
+
+    __slots__ = ("expression", "steps")
+
+    def __init__(self, expression: str, steps: Tuple[Step, ...]):
+        self.expression = expression
+        self.steps = steps
+
+    def __repr__(self) -> str:
+        return f"CompiledPath({self.expression!r})"
+
+
+def _parse_pointer(expression: str) -> Tuple[Step, ...]:
+    """Parse an RFC 6901 pointer; a ``*`` token matches every child"""
+    if expression and not expression.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: {expression!r}")
+    steps = []
+    for token in expression.split("/")[1:]:
+        if token == "*":
+            steps.append(Step("wildcard"))
+            continue
+        token = token.replace("~1", "/").replace("~0", "~")
+        index = int(token) if _ARRAY_INDEX.match(token) else None
+        steps.append(Step("key", key=token, index=index))
+    return tuple(steps)
+
+
+def _parse_bracket(expression: str, pos: int, recursive: bool) -> Tuple[Step, int]:
+    """Parse a ``[...]`` selector at ``pos``, returning the step and the end offset"""
+    m = _WILDCARD.match(expression, pos)
+    if m:
+        return Step("wildcard", recursive=recursive), m.end()
+    m = _INDEX.match(expression, pos)
+    if m:
+        return Step("index", index=int(m.group(1)), recursive=recursive), m.end()
+    m = _SLICE.match(expression, pos)
+    if m:
+        start, stop, step = (int(g) if g else None for g in m.groups())
+        if step == 0:
+            raise ValueError(f"Slice step cannot be zero: {expression!r}")
+        if step is not None and step < 0:
+            # Matches come back in document order, which would silently
+            # ignore the reversal a negative step asks for
+            raise ValueError(f"Negative slice steps are not supported: {expression!r}")
+        return (
+            Step("slice", slice=slice(start, stop, step), recursive=recursive),
+            m.end(),
+        )
+    m = _QUOTED.match(expression, pos)
+    if m:
+        quoted = m.group(1)
+        if quoted[0] == "'":
+            quoted = '"' + quoted[1:-1].replace("\\'", "'").replace('"', '\\"') + '"'
+        return Step("key", key=json.loads(quoted), recursive=recursive), m.end()
+    raise ValueError(f"Invalid JSONPath expression at offset {pos}: {expression!r}")
+
+
+def _parse_jsonpath(expression: str) -> Tuple[Step, ...]:
+    """Parse the supported JSONPath subset: child, wildcard, index, slice and ``..``"""
+    steps = []
+    pos = 1
+    while pos < len(expression):
+        if expression.startswith("..", pos):
+            recursive = True
+            pos += 2
+        elif expression.startswith(".", pos):
+            recursive = False
+            pos += 1
+        elif expression.startswith("[", pos):
+            step, pos = _parse_bracket(expression, pos, False)
+            steps.append(step)
+            continue
+        else:
+            raise ValueError(
+                f"Invalid JSONPath expression at offset {pos}: {expression!r}"
+            )
+
+        if expression.startswith("*", pos):
+            steps.append(Step("wildcard", recursive=recursive))
+            pos += 1
+        elif recursive and expression.startswith("[", pos):
+            step, pos = _parse_bracket(expression, pos, True)
+            steps.append(step)
+        else:
+            m = _NAME.match(expression, pos)
+            if m is None:
+                raise ValueError(
+                    f"Invalid JSONPath expression at offset {pos}: {expression!r}"
+                )
+            steps.append(Step("key", key=m.group(), recursive=recursive))
+            pos = m.end()
+    return tuple(steps)
+
+
+@lru_cache(maxsize=256)
+def compile_path(expression: str) -> CompiledPath:
+    """
+    Compile a JSON Pointer or JSONPath expression
+
+    Expressions starting with ``$`` are JSONPath; anything else is an RFC
+    6901 pointer, where a ``*`` token additionally matches every child.
+    Results are cached, so repeated queries skip parsing the expression.
+
+    Args:
+        expression: Path such as ``/data/items/*/id`` or ``$..items[0:2].id``
+
+    Returns:
+        Compiled path
+
+    Raises:
+        ValueError: If the expression is malformed or uses a negative
+            slice step
+    """
+    if expression.startswith("$"):
+        return CompiledPath(expression, _parse_jsonpath(expression))
+    return CompiledPath(expression, _parse_pointer(expression))
+
+
+PathLike = Union[str, CompiledPath]
+
+
+def _array_selection(step: Step, length: int) -> Union[range, Tuple[int, ...]]:
+    """Get the element positions an array step selects"""
+    if step.kind == "wildcard":
+        return range(length)
+    if step.kind == "slice":
+        return range(*step.slice.indices(length))
+    index = step.index
+    if index is None:
+        return ()
+    if index < 0 and step.kind == "index":
+        index += length
+    return (index,) if 0 <= index < length else ()
+
+
+def evaluate(tape: Tape, paths: Sequence[CompiledPath]) -> List[List[int]]:
+    """
+    Find the tape entries matched by several paths in one traversal
+
+    Only containers that some path can still match below are visited;
+    every other subtree is skipped with a single jump. The tape fields are
+    read once as plain lists rather than entry by entry.
+
+    Args:
+        tape: Tape of the document
+        paths: Compiled paths
+
+    Returns:
+        For each path, the indices of the matching entries in document order
+    """
+    matches: List[List[int]] = [[] for _ in paths]
+    if not len(tape):
+        return matches
+    steps = [path.steps for path in paths]
+    types, starts, ends, jumps = tape.fields(0)
+    decode = tape.decode_token
+    # (entry index, active (path number, step number) states), depth first
+    stack: List[Tuple[int, List[Tuple[int, int]]]] = [
+        (0, [(number, 0) for number in range(len(paths))])
+    ]
+    while stack:
+        index, states = stack.pop()
+        active = []
+        for number, position in states:
+            if position == len(steps[number]):
+                matches[number].append(index)
+            else:
+                active.append((number, position))
+        kind = types[index]
+        if not active or (kind != ARRAY and kind != OBJECT):
+            continue
+
+        end = jumps[index]
+        children: List[Tuple[int, List[Tuple[int, int]]]] = []
+        if kind == ARRAY:
+            elements = []
+            child = index + 1
+            while child < end:
+                elements.append(child)
+                child = jumps[child]
+            selections = [
+                _array_selection(steps[number][position], len(elements))
+                for number, position in active
+            ]
+            for offset, child in enumerate(elements):
+                carried = []
+                for (number, position), selected in zip(active, selections):
+                    if steps[number][position].recursive:
+                        carried.append((number, position))
+                    if offset in selected:
+                        carried.append((number, position + 1))
+                if carried:
+                    children.append((child, carried))
+        else:
+            key_index = index + 1
+            while key_index < end:
+                key = None
+                carried = []
+                for number, position in active:
+                    step = steps[number][position]
+                    if step.recursive:
+                        carried.append((number, position))
+                    if step.kind == "wildcard":
+                        carried.append((number, position + 1))
+                    elif step.kind == "key":
+                        if key is None:
+                            key = decode(
+                                types[key_index], starts[key_index], ends[key_index]
+                            )
+                        if key == step.key:
+                            carried.append((number, position + 1))
+                if carried:
+                    children.append((key_index + 1, carried))
+                key_index = jumps[key_index + 1]
+        for child, carried in reversed(children):
+            stack.append((child, list(dict.fromkeys(carried))))
+    return matches
+
+
+def evaluate_objects(document: Any, path: CompiledPath) -> List[Any]:
+    """
+    Find the values matched by a path in an already converted document
+
+    Mirrors :func:`evaluate` for Python lists and dicts, for callers that
+    parsed without a tape.
+
+    Args:
+        document: Parsed JSON document
+        path: Compiled path
+
+    Returns:
+        The matching values in document order
+    """
+    steps = path.steps
+    matches: List[Any] = []
+    stack: List[Tuple[Any, Tuple[int, ...]]] = [(document, (0,))]
+    while stack:
+        value, states = stack.pop()
+        active = [position for position in states if position != len(steps)]
+        if len(active) != len(states):
+            matches.append(value)
+        if not active:
+            continue
+
+        children: List[Tuple[Any, List[int]]] = []
+        step = steps[active[0]]
+        if len(active) == 1 and not step.recursive:
+            # A single plain step: take the children directly
+            following = (active[0] + 1,)
+            if type(value) is list:
+                selected = _array_selection(step, len(value))
+                targets = (
+                    value if step.kind == "wildcard" else [value[i] for i in selected]
+                )
+            elif type(value) is dict:
+                if step.kind == "wildcard":
+                    targets = list(value.values())
+                else:
+                    targets = [value[step.key]] if step.key in value else []
+            else:
+                targets = []
+            if following[0] == len(steps):
+                matches.extend(targets)
+            else:
+                stack.extend((child, following) for child in reversed(targets))
+            continue
+        elif type(value) is list:
+            selections = [
+                _array_selection(steps[position], len(value)) for position in active
+            ]
+            for offset, child in enumerate(value):
+                carried = []
+                for position, selected in zip(active, selections):
+                    if steps[position].recursive:
+                        carried.append(position)
+                    if offset in selected:
+                        carried.append(position + 1)
+                if carried:
+                    children.append((child, carried))
+        elif type(value) is dict:
+            for key, child in value.items():
+                carried = []
+                for position in active:
+                    step = steps[position]
+                    if step.recursive:
+                        carried.append(position)
+                    if step.kind == "wildcard" or (
+                        step.kind == "key" and key == step.key
+                    ):
+                        carried.append(position + 1)
+                if carried:
+                    children.append((child, carried))
+        for child, carried in reversed(children):
+            # Scalars only matter when a path ends on them
+            if type(child) is list or type(child) is dict or len(steps) in carried:
+                stack.append((child, tuple(dict.fromkeys(carried))))
+    return matches
+
+
+def extract_from_tape(
+    tape: Tape, paths: Sequence[PathLike]
+) -> Dict[PathLike, List[Any]]:
+    """
+    Evaluate paths against a tape and convert only the matched values
+
+    Args:
+        tape: Tape of the document
+        paths: Expressions or compiled paths
+
+    Returns:
+        Mapping of each given path to the list of its matching values
+    """
+    compiled = [compile_path(path) if isinstance(path, str) else path for path in paths]
+    found = evaluate(tape, compiled)
+    return {
+        path: [tape.to_python(index) for index in indices]
+        for path, indices in zip(paths, found)
+    }
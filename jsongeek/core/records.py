@@ -0,0 +1,336 @@
+"""
+Compact ``__slots__`` record classes generated from an object schema
+"""
+
+import keyword
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from .tape import ARRAY, OBJECT, Tape
+from .validator import JsonValidator
+
+# Names a field cannot use as its attribute because Record defines them
+_RESERVED = frozenset(("get", "keys", "values", "items", "to_dict"))
+
+
+class _Missing:
+    """Marker for fields absent from a record"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        # Unpickle to the module-level singleton
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class Record:
+    """
+    Base class of generated record classes
+
+    A record stores one JSON object in ``__slots__`` instead of a dict.
+    Fields are readable as attributes (when the key is a valid identifier)
+    and as items, and :meth:`to_dict` converts back. A field missing from
+    the source object is missing from the record as well, so
+    ``to_dict()`` round-trips exactly.
+    """
+
+    __slots__ = ()
+    # JSON keys, and the slot holding each of them
+    _fields: Tuple[str, ...] = ()
+    _slot_of: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._slot_of[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field, or ``default`` if the record lacks it"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        slot = self._slot_of.get(key)
+        return slot is not None and hasattr(self, slot)
+
+    def keys(self) -> List[str]:
+        """Get the fields present in this record"""
+        return [key for key in self._fields if hasattr(self, self._slot_of[key])]
+
+    def values(self) -> List[Any]:
+        """Get the values of the fields present in this record"""
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Get ``(field, value)`` pairs for the fields present"""
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a plain dict"""
+        return dict(self.items())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        values = tuple(
+            getattr(self, self._slot_of[key], MISSING) for key in self._fields
+        )
+        return _rebuild, (self._fields, type(self).__name__, values)
+
+
+def _slot_name(field: str, position: int) -> str:
+    """Use the key as attribute name when possible, a positional name otherwise"""
+    if (
+        field.isidentifier()
+        and not keyword.iskeyword(field)
+        and not field.startswith("_")
+        and field not in _RESERVED
+    ):
+        return field
+    return f"_f{position}"
+
+
+@lru_cache(maxsize=128)
+def record_class(fields: Tuple[str, ...], name: str = "Record") -> type:
+    """
+    Generate (or reuse) the record class for an object shape
+
+    Args:
+        fields: JSON keys of the shape, in order
+        name: Class name
+
+    Returns:
+        Subclass of :class:`Record` whose constructor takes one positional
+        argument per field; pass :data:`MISSING` for absent fields
+    """
+    slots = tuple(_slot_name(field, i) for i, field in enumerate(fields))
+    params = ", ".join(f"_{i}=MISSING" for i in range(len(fields)))
+    body = (
+        "".join(
+            f"    if _{i} is not MISSING: self.{slot} = _{i}\n"
+            for i, slot in enumerate(slots)
+        )
+        or "    pass\n"
+    )
+    namespace: Dict[str, Any] = {"MISSING": MISSING}
+    exec(f"def __init__(self, {params}):\n{body}", namespace)
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": slots,
+            "__init__": namespace["__init__"],
+            "_fields": fields,
+            "_slot_of": dict(zip(fields, slots)),
+        },
+    )
+
+
+def _rebuild(fields: Tuple[str, ...], name: str, values: Tuple[Any, ...]) -> Record:
+    """Unpickle a record by regenerating its class"""
+    return record_class(fields, name)(*values)
+
+
+def schema_fields(
+    schema: Union[JsonValidator, Dict[str, Any]],
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Get the record shape described by a schema
+
+    Args:
+        schema: Object schema, or array schema whose ``items`` is one
+
+    Returns:
+        Field names in property order and the required field names
+
+    Raises:
+        ValueError: If the schema does not describe objects with properties,
+            or requires fields that are not among them
+    """
+    if isinstance(schema, JsonValidator):
+        schema = schema.schema
+    if schema.get("type") == "array":
+        schema = schema.get("items", {})
+    if schema.get("type") != "object" or not schema.get("properties"):
+        raise ValueError("Record schemas must describe objects with properties")
+    fields, required = tuple(schema["properties"]), tuple(schema.get("required", ()))
+    missing = [field for field in required if field not in schema["properties"]]
+    if missing:
+        raise ValueError(f"Required fields {missing} are not record properties")
+    return fields, required
+
+
+def infer_fields(tape: Tape, arrays: Sequence[int]) -> Tuple[str, ...]:
+    """
+    Infer a record shape from the objects in some arrays
+
+    Args:
+        tape: Tape of the document
+        arrays: Indices of array entries
+
+    Returns:
+        Union of the objects' keys in order of first appearance
+    """
+    seen: Dict[str, None] = {}
+    decode = tape.decode_token
+    for array in arrays:
+        if tape.kind(array) != ARRAY:
+            continue
+        types, starts, ends, jumps = tape.fields(array)
+        i = 1
+        while i < len(types):
+            end = jumps[i] - array
+            if types[i] == OBJECT:
+                key = i + 1
+                while key < end:
+                    seen.setdefault(decode(types[key], starts[key], ends[key]))
+                    key = jumps[key + 1] - array
+            i = end
+    return tuple(seen)
+
+
+def infer_object_fields(elements: Iterable[Any]) -> Tuple[str, ...]:
+    """
+    Infer a record shape from already converted objects
+
+    Args:
+        elements: Array elements; non-objects are ignored
+
+    Returns:
+        Union of the objects' keys in order of first appearance
+    """
+    seen: Dict[str, None] = {}
+    for element in elements:
+        if type(element) is dict and not element.keys() <= seen.keys():
+            seen.update(dict.fromkeys(element))
+    return tuple(seen)
+
+
+def convert_records(
+    elements: Iterable[Any],
+    fields: Tuple[str, ...],
+    required: Tuple[str, ...] = (),
+    name: str = "Record",
+) -> List[Any]:
+    """
+    Turn already converted objects into records
+
+    Used when a document was parsed with ``json.loads`` rather than into a
+    tape. Elements that do not fit the shape are kept as they are; see
+    :func:`build_records`.
+
+    Args:
+        elements: Array elements
+        fields: Record fields
+        required: Fields every record must have
+        name: Record class name
+
+    Returns:
+        The elements, with fitting objects replaced by records
+    """
+    cls = record_class(fields, name)
+    shape = dict.fromkeys(fields).keys()
+    results: List[Any] = []
+    append = results.append
+    for element in elements:
+        if (
+            type(element) is dict
+            and element.keys() <= shape
+            and (not required or all(field in element for field in required))
+        ):
+            append(cls(*[element.get(field, MISSING) for field in fields]))
+        else:
+            append(element)
+    return results
+
+
+def build_records(
+    tape: Tape,
+    arrays: Sequence[int],
+    fields: Tuple[str, ...],
+    required: Tuple[str, ...] = (),
+    name: str = "Record",
+) -> List[Any]:
+    """
+    Build records straight from the tape, without intermediate dicts
+
+    Elements that do not fit the shape (not objects, keys outside
+    ``fields`` or missing a required field) are converted to plain values.
+
+    Args:
+        tape: Tape of the document
+        arrays: Indices of the array entries holding the records
+        fields: Record fields
+        required: Fields every record must have
+        name: Record class name
+
+    Returns:
+        Elements of all arrays, in document order
+    """
+    cls = record_class(fields, name)
+    positions = {field: i for i, field in enumerate(fields)}
+    required_positions = [positions[field] for field in required]
+    width = len(fields)
+    decode = tape.decode_token
+    results: List[Any] = []
+    for array in arrays:
+        if tape.kind(array) != ARRAY:
+            continue
+        # Indices below are relative to the array entry
+        types, starts, ends, jumps = tape.fields(array)
+        i = 1
+        while i < len(types):
+            end = jumps[i] - array
+            if types[i] != OBJECT:
+                results.append(tape.to_python(array + i))
+                i = end
+                continue
+            values: List[Any] = [MISSING] * width
+            fits = True
+            key = i + 1
+            while key < end:
+                position = positions.get(decode(types[key], starts[key], ends[key]))
+                if position is None:
+                    fits = False
+                    break
+                value = key + 1
+                kind = types[value]
+                if kind == ARRAY or kind == OBJECT:
+                    values[position] = tape.to_python(array + value)
+                else:
+                    values[position] = decode(kind, starts[value], ends[value])
+                key = jumps[value] - array
+            if fits and (
+                not required_positions
+                or all(values[p] is not MISSING for p in required_positions)
+            ):
+                results.append(cls(*values))
+            else:
+                results.append(tape.to_python(array + i))
+            i = end
+    return results
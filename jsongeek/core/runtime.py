@@ -0,0 +1,541 @@
+"""
+Shared WebAssembly runtime: process-wide module registry and instance pools
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..utils.simd_detection import has_simd_support
+
+if TYPE_CHECKING:
+    from wasmer import Instance, Module, Store
+
+WASM_DIR = os.path.join(os.path.dirname(__file__), "wasm")
+SIMD_MODULE = "simd.wasm"
+FALLBACK_MODULE = "fallback.wasm"
+
+# Bump when the layout of serialized artifacts changes
+CACHE_FORMAT_VERSION = 1
+
+ARENA_INITIAL_SIZE = 64 * 1024
+ARENA_GROWTH_FACTOR = 2
+ARENA_IDLE_TIMEOUT = 30.0
+
+
+def default_cache_dir() -> str:
+    """
+    Get the directory used for precompiled wasm artifacts
+
+    ``JSONGEEK_CACHE_DIR`` takes precedence, then ``$XDG_CACHE_HOME/jsongeek``
+    and finally ``~/.cache/jsongeek``.
+    """
+    cache_dir = os.environ.get("JSONGEEK_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "jsongeek")
+
+
+def _wasmer_version() -> str:
+    """Get the installed wasmer version used to key serialized artifacts"""
+    import wasmer
+
+    version = getattr(wasmer, "__version__", None)
+    if version is None:
+        from importlib.metadata import version as dist_version
+
+        version = dist_version("wasmer")
+    return version
+
+
+class InstancePool:
+    """
+    Bounded pool of ready-to-use instances of a single compiled module
+    """
+
+    def __init__(self, registry: "ModuleRegistry", name: str, max_size: int = 8):
+        self.name = name
+        self.max_size = max_size
+        self._registry = registry
+        self._idle: List["Instance"] = []
+        # Arenas stay with their instance, whose memory holds the block
+        self._arenas: Dict[int, Tuple["Instance", "WasmArena"]] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "returned": 0,
+            "discarded": 0,
+            "renewed": 0,
+        }
+
+    def _instantiate(self) -> "Instance":
+        """Create a new instance of the module"""
+        from wasmer import Instance
+
+        return Instance(self._registry.get_module(self.name))
+
+    def acquire(self) -> "Instance":
+        """
+        Borrow an instance from the pool, instantiating a new one if none is idle
+
+        An idle instance whose arena has expired is renewed first, so its
+        memory is freed instead of being handed out again.
+
+        Returns:
+            A wasm instance owned by the caller until it is released
+        """
+        with self._lock:
+            if not self._idle:
+                self._stats["misses"] += 1
+                instance = None
+            else:
+                self._stats["hits"] += 1
+                instance = self._idle.pop()
+                entry = self._arenas.get(id(instance))
+                if entry is None or not entry[1].expired:
+                    return instance
+        if instance is None:
+            return self._instantiate()
+        return self.renew(instance)
+
+    def release(self, instance: "Instance") -> None:
+        """
+        Return a borrowed instance to the pool
+
+        Instances beyond ``max_size`` are dropped rather than kept idle.
+
+        Args:
+            instance: Instance previously obtained from :meth:`acquire`
+        """
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(instance)
+                self._stats["returned"] += 1
+            else:
+                self._arenas.pop(id(instance), None)
+                self._stats["discarded"] += 1
+
+    def renew(self, instance: "Instance") -> "Instance":
+        """
+        Replace a borrowed instance whose arena has expired with a fresh one
+
+        Linear memory never shrinks, so dropping the instance is the only
+        way to give its arena block back. The new instance's arena keeps the
+        settings and statistics of the old one and starts empty.
+
+        Args:
+            instance: Instance previously obtained from :meth:`acquire`
+
+        Returns:
+            The replacement, owned by the caller until it is released
+        """
+        fresh = self._instantiate()
+        with self._lock:
+            entry = self._arenas.pop(id(instance), None)
+            if entry is not None:
+                self._arenas[id(fresh)] = (fresh, entry[1].moved_to(fresh.exports))
+            self._stats["renewed"] += 1
+        return fresh
+
+    def arena(self, instance: "Instance") -> "WasmArena":
+        """
+        Get the scratch arena of an instance
+
+        The arena is created on first use and handed to every later borrower
+        of the instance, so its block is allocated only once.
+
+        Args:
+            instance: Instance previously obtained from :meth:`acquire`
+
+        Returns:
+            The arena inside the instance's linear memory
+        """
+        with self._lock:
+            entry = self._arenas.get(id(instance))
+            if entry is None:
+                entry = self._arenas[id(instance)] = (
+                    instance,
+                    WasmArena(instance.exports),
+                )
+        return entry[1]
+
+    def clear(self) -> None:
+        """Drop all idle instances"""
+        with self._lock:
+            for instance in self._idle:
+                self._arenas.pop(id(instance), None)
+            self._idle.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        with self._lock:
+            stats = self._stats.copy()
+            stats["idle"] = len(self._idle)
+        return stats
+
+
+class WasmArena:
+    """
+    Reusable scratch region inside an instance's linear memory
+
+    A single allocation holds parse inputs and outputs across calls instead
+    of allocating inside the module for every parse. The region grows
+    geometrically when a request does not fit. Linear memory never shrinks
+    and the modules' ``free`` does not reclaim anything, so a block larger
+    than ``initial_size`` is given back by dropping the whole instance:
+    once such an arena has been idle for ``idle_timeout`` seconds it is
+    :attr:`expired`, and its owner renews the instance through
+    :meth:`InstancePool.renew` before the next call.
+    """
+
+    def __init__(
+        self,
+        exports: Any,
+        initial_size: int = ARENA_INITIAL_SIZE,
+        idle_timeout: float = ARENA_IDLE_TIMEOUT,
+    ):
+        self.initial_size = initial_size
+        self.idle_timeout = idle_timeout
+        self.ptr = 0
+        self.capacity = 0
+        self._exports = exports
+        self._last_used = time.monotonic()
+        self._stats = {"high_water_mark": 0, "growth_count": 0, "shrink_count": 0}
+
+    @property
+    def expired(self) -> bool:
+        """Whether the block is above ``initial_size`` and has been idle too long"""
+        return (
+            self.capacity > self.initial_size
+            and time.monotonic() - self._last_used > self.idle_timeout
+        )
+
+    def moved_to(self, exports: Any) -> "WasmArena":
+        """
+        Get an empty arena in another instance that continues this one
+
+        Settings and statistics carry over, and the move counts as a shrink.
+
+        Args:
+            exports: Exports of the instance replacing this arena's one
+
+        Returns:
+            The new arena, which allocates its block on first use
+        """
+        arena = WasmArena(exports, self.initial_size, self.idle_timeout)
+        arena._stats = self._stats.copy()
+        arena._stats["shrink_count"] += 1
+        return arena
+
+    def reserve(self, size: int) -> int:
+        """
+        Make sure the arena can hold ``size`` bytes
+
+        Args:
+            size: Bytes needed
+
+        Returns:
+            Pointer to the start of the arena
+        """
+        if size > self.capacity:
+            capacity = max(self.initial_size, self.capacity)
+            while capacity < size:
+                capacity *= ARENA_GROWTH_FACTOR
+            self.ptr = self._exports.malloc(capacity)
+            self.capacity = capacity
+            self._stats["growth_count"] += 1
+        self._last_used = time.monotonic()
+        if size > self._stats["high_water_mark"]:
+            self._stats["high_water_mark"] = size
+        return self.ptr
+
+    def view(self, size: int, offset: int = 0, dtype: Any = None) -> Any:
+        """
+        Get a NumPy view over part of the arena
+
+        The view must not be kept across calls that may grow the memory.
+
+        Args:
+            size: Number of elements
+            offset: Byte offset from the arena start
+            dtype: Element type, defaults to ``uint8``
+
+        Returns:
+            Writable array backed by the linear memory
+        """
+        import numpy as np
+
+        return np.frombuffer(
+            self._exports.memory.buffer,
+            dtype=dtype or np.uint8,
+            count=size,
+            offset=self.ptr + offset,
+        )
+
+    def write(self, buf: Any) -> int:
+        """
+        Copy an input buffer into the arena
+
+        Args:
+            buf: Bytes-like object
+
+        Returns:
+            Pointer to the copied bytes
+        """
+        import numpy as np
+
+        size = len(buf)
+        ptr = self.reserve(size)
+        if size:
+            self.view(size)[:] = np.frombuffer(buf, dtype=np.uint8)
+        return ptr
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get arena statistics; ``current_size`` is the allocated block"""
+        stats = self._stats.copy()
+        stats["current_size"] = self.capacity
+        return stats
+
+
+class ModuleRegistry:
+    """
+    Process-wide registry that compiles each WebAssembly module only once
+
+    Compiled modules are shared by every parser in the process; instances are
+    handed out through one :class:`InstancePool` per module. Compiled modules
+    are also serialized to ``cache_dir`` so later processes can deserialize
+    them instead of running the compiler again. Pass ``cache_dir=None`` to
+    disable the on-disk cache.
+    """
+
+    def __init__(
+        self,
+        wasm_dir: str = WASM_DIR,
+        pool_size: int = 8,
+        cache_dir: Optional[str] = "",
+    ):
+        self.wasm_dir = wasm_dir
+        self.pool_size = pool_size
+        self.cache_dir = default_cache_dir() if cache_dir == "" else cache_dir
+        self._store: Optional["Store"] = None
+        self._modules: Dict[str, "Module"] = {}
+        self._pools: Dict[str, InstancePool] = {}
+        self._lock = threading.RLock()
+        self._stats = {
+            "module_hits": 0,
+            "module_misses": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "compile_time": 0.0,
+            "deserialize_time": 0.0,
+        }
+
+    def has_simd_support(self) -> bool:
+        """Check for WebAssembly SIMD support (memoized per process)"""
+        return has_simd_support()
+
+    def module_name(self, use_simd: bool) -> str:
+        """Get the module file name for the requested SIMD mode"""
+        return SIMD_MODULE if use_simd else FALLBACK_MODULE
+
+    def get_module(self, name: str) -> "Module":
+        """
+        Get a compiled module, compiling it on first use
+
+        Args:
+            name: Module file name inside ``wasm_dir``
+
+        Returns:
+            Compiled wasm module
+        """
+        with self._lock:
+            module = self._modules.get(name)
+            if module is not None:
+                self._stats["module_hits"] += 1
+                return module
+
+            self._stats["module_misses"] += 1
+            if self._store is None:
+                from wasmer import Store
+
+                self._store = Store()
+
+            with open(os.path.join(self.wasm_dir, name), "rb") as f:
+                wasm_bytes = f.read()
+
+            module = self._load_artifact(name, wasm_bytes)
+            if module is None:
+                from wasmer import Module
+
+                start_time = time.perf_counter()
+                module = Module(self._store, wasm_bytes)
+                self._stats["compile_time"] += time.perf_counter() - start_time
+                self._store_artifact(name, wasm_bytes, module)
+
+            self._modules[name] = module
+            return module
+
+    def artifact_path(self, name: str, wasm_bytes: bytes) -> Optional[str]:
+        """
+        Get the on-disk path of the precompiled artifact for a module
+
+        The file name is keyed by the wasm content hash, the wasmer version and
+        the cache format, so stale artifacts are never picked up.
+
+        Args:
+            name: Module file name
+            wasm_bytes: Raw wasm module bytes
+
+        Returns:
+            Artifact path, or None if the on-disk cache is disabled
+        """
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(wasm_bytes).hexdigest()[:32]
+        stem = os.path.splitext(name)[0]
+        return os.path.join(
+            self.cache_dir,
+            f"{stem}-{digest}-wasmer{_wasmer_version()}-v{CACHE_FORMAT_VERSION}.bin",
+        )
+
+    def _load_artifact(self, name: str, wasm_bytes: bytes) -> Optional["Module"]:
+        """Deserialize a previously compiled module, if a valid artifact exists"""
+        path = self.artifact_path(name, wasm_bytes)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                artifact = f.read()
+        except OSError:
+            self._stats["disk_misses"] += 1
+            return None
+
+        from wasmer import Module
+
+        start_time = time.perf_counter()
+        try:
+            module = Module.deserialize(self._store, artifact)
+        except Exception:
+            # Corrupt or incompatible artifact: recompile and overwrite it
+            self._stats["disk_misses"] += 1
+            return None
+        self._stats["deserialize_time"] += time.perf_counter() - start_time
+        self._stats["disk_hits"] += 1
+        return module
+
+    def _store_artifact(self, name: str, wasm_bytes: bytes, module: "Module") -> None:
+        """Serialize a compiled module to the on-disk cache"""
+        path = self.artifact_path(name, wasm_bytes)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(module.serialize())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # A read-only or full cache directory must never break parsing
+            pass
+
+    def warmup(self, use_simd: bool = True, instances: int = 1) -> Dict[str, Any]:
+        """
+        Do all one-time setup ahead of the first parse
+
+        Probes SIMD support, loads (or compiles and persists) the module and
+        fills its pool with ready instances.
+
+        Args:
+            use_simd: Warm up the SIMD module if the host supports it
+            instances: Number of idle instances to pre-create
+
+        Returns:
+            Registry statistics after warming up
+        """
+        pool = self.get_pool(self.module_name(use_simd and self.has_simd_support()))
+        borrowed = [pool.acquire() for _ in range(max(1, instances))]
+        for instance in borrowed:
+            pool.release(instance)
+        return self.get_stats()
+
+    def get_pool(self, name: str) -> InstancePool:
+        """
+        Get the instance pool for a module
+
+        Args:
+            name: Module file name inside ``wasm_dir``
+
+        Returns:
+            Shared instance pool
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = InstancePool(self, name, self.pool_size)
+                self._pools[name] = pool
+            return pool
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics
+
+        Returns:
+            Module hit/miss counters, total compile time and per-module pool stats
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            stats["compiled_modules"] = sorted(self._modules)
+            pools = list(self._pools.items())
+        stats["pools"] = {name: pool.get_stats() for name, pool in pools}
+        return stats
+
+    def clear(self) -> None:
+        """Drop all compiled modules and idle instances"""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+            self._pools.clear()
+            self._modules.clear()
+            self._store = None
+
+
+_registry: Optional[ModuleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModuleRegistry:
+    """Get the process-wide module registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModuleRegistry()
+    return _registry
+
+
+def warmup(use_simd: bool = True, instances: int = 1) -> Dict[str, Any]:
+    """
+    Prepare the shared runtime ahead of time
+
+    Useful at the start of short-lived processes so the first ``loads()`` does
+    not pay for the SIMD probe, module compilation or instantiation.
+
+    Args:
+        use_simd: Warm up the SIMD module if the host supports it
+        instances: Number of idle instances to pre-create
+
+    Returns:
+        Registry statistics after warming up
+    """
+    return get_registry().warmup(use_simd=use_simd, instances=instances)
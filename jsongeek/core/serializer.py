@@ -0,0 +1,168 @@
+"""
+Shared JSON encoders with fast paths for common and NumPy types
+"""
+
+import json
+import math
+import sys
+import threading
+from json import encoder as json_encoder
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .lazy import LazyArray, LazyDocument, LazyObject
+from .records import Record
+
+# Item and key separators of json.dumps' default (non-compact) output
+ITEM_SEPARATOR = ", "
+KEY_SEPARATOR = ": "
+
+
+def is_numpy(obj: Any) -> bool:
+    """
+    Check whether an object is a NumPy array, including subclasses such as
+    masked arrays, or a NumPy scalar
+
+    NumPy is only looked up once something has imported it; no object can
+    be a NumPy value before that.
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(obj, (numpy.ndarray, numpy.generic))
+
+
+def _default(obj: Any) -> Any:
+    """
+    Convert objects the stdlib encoder does not know about
+
+    Args:
+        obj: Object found while encoding
+
+    Returns:
+        JSON-compatible replacement
+
+    Raises:
+        TypeError: If the object is not serializable
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, (LazyObject, LazyArray, LazyDocument)):
+        return obj.materialize()
+    if is_numpy(obj):
+        # Scalars convert too; masked items of masked arrays become None
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Serializer:
+    """
+    Configured wrapper around the C-accelerated stdlib encoder
+
+    The encoder is set up once per option set instead of per call, and its
+    output is the same as ``json.dumps`` with those options. Top-level
+    strings and numbers skip the encoder entirely, lists and dicts go
+    straight to the C scanner, and NumPy arrays and scalars, records and
+    lazy documents are converted by the ``default`` hook. Instances hold no
+    per-call state and may be shared between threads.
+    """
+
+    def __init__(self, sort_keys: bool = False, ensure_ascii: bool = True):
+        """
+        Args:
+            sort_keys: Emit object keys in sorted order
+            ensure_ascii: Escape non-ASCII characters
+        """
+        self.sort_keys = sort_keys
+        self.ensure_ascii = ensure_ascii
+        self._encoder = json.JSONEncoder(
+            sort_keys=sort_keys, ensure_ascii=ensure_ascii, default=_default
+        )
+        self._encode_str: Callable[[str], str] = (
+            json_encoder.encode_basestring_ascii
+            if ensure_ascii
+            else json_encoder.encode_basestring
+        )
+        self._floatstr = float.__repr__
+
+    def _make_scanner(self) -> Callable[[Any, int], Any]:
+        """Build a one-shot C encoder with fresh circular-reference markers"""
+        c_make_encoder = json_encoder.c_make_encoder
+        if c_make_encoder is None:
+            return lambda obj, level: self._encoder.iterencode(obj)
+        return c_make_encoder(
+            {},
+            _default,
+            self._encode_str,
+            None,
+            KEY_SEPARATOR,
+            ITEM_SEPARATOR,
+            self.sort_keys,
+            False,
+            True,
+        )
+
+    def encode(self, obj: Any) -> str:
+        """
+        Serialize an object to JSON text
+
+        Args:
+            obj: Object to serialize
+
+        Returns:
+            JSON text
+
+        Raises:
+            TypeError: If the object contains unsupported types
+            ValueError: On circular references
+        """
+        cls = type(obj)
+        if cls is str:
+            return self._encode_str(obj)
+        if cls is int:
+            return int.__repr__(obj)
+        if cls is float and math.isfinite(obj):
+            return self._floatstr(obj)
+        if cls is list or cls is dict:
+            return "".join(self._make_scanner()(obj, 0))
+        if is_numpy(obj):
+            obj = _default(obj)
+        return self._encoder.encode(obj)
+
+    def encode_bytes(self, obj: Any) -> bytes:
+        """Serialize an object to UTF-8 encoded JSON"""
+        return self.encode(obj).encode("ascii" if self.ensure_ascii else "utf-8")
+
+    def iterencode(self, obj: Any) -> Iterator[str]:
+        """
+        Serialize an object to JSON text chunk by chunk
+
+        Args:
+            obj: Object to serialize
+
+        Yields:
+            Pieces of JSON text
+        """
+        return self._encoder.iterencode(obj)
+
+
+_serializers: Dict[Tuple[bool, bool], Serializer] = {}
+_lock = threading.Lock()
+
+
+def get_serializer(sort_keys: bool = False, ensure_ascii: bool = True) -> Serializer:
+    """
+    Get the shared serializer for a set of options
+
+    Args:
+        sort_keys: Emit object keys in sorted order
+        ensure_ascii: Escape non-ASCII characters
+
+    Returns:
+        Serializer configured once per option set
+    """
+    key = (sort_keys, ensure_ascii)
+    serializer: Optional[Serializer] = _serializers.get(key)
+    if serializer is None:
+        with _lock:
+            serializer = _serializers.setdefault(
+                key, Serializer(sort_keys, ensure_ascii)
+            )
+    return serializer
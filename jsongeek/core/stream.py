@@ -1,74 +1,139 @@
 """
 Stream parsing implementation for JsonGeekAI
 """
-from typing import BinaryIO, Iterator, Any, Optional
+
+import codecs
 import json
-from .parser import JSONParser
+from typing import Any, BinaryIO, Iterator, Optional
+
+from ..utils.compression import FrameError, StreamDecompressor
 from .exceptions import JSONParseError
+from .parser import JSONParser
+
 
 class StreamParser:
     """
     Stream parser for processing large JSON files
+
+    Compressed streams (gzip, zlib, xz, bz2 and frames written by
+    :meth:`SmartCompressor.compressor`) are recognised from their first bytes
+    and decompressed chunk by chunk, so memory stays bounded by the chunk
+    size and the largest document rather than the archive size.
     """
+
     def __init__(
         self,
         chunk_size: int = 8192,
         use_simd: bool = True,
-        validate_utf8: bool = True
+        validate_utf8: bool = True,
+        decompress: bool = True,
+        max_size: Optional[int] = None,
     ):
+        """
+        Args:
+            chunk_size: Bytes read from the stream, and decompressed, at once
+            use_simd: Whether to use SIMD optimizations
+            validate_utf8: Whether to reject invalid UTF-8
+            decompress: Whether to detect and decompress compressed streams
+            max_size: Maximum size of the (decompressed) stream in bytes
+        """
         self.chunk_size = chunk_size
+        self.decompress = decompress
+        self.max_size = max_size
         self.parser = JSONParser(use_simd=use_simd, validate_utf8=validate_utf8)
+        self._errors = "strict" if validate_utf8 else "surrogateescape"
         self._buffer = ""
 
     def iter_parse(self, stream: BinaryIO) -> Iterator[Any]:
         """
         Iterate over JSON objects in a stream
-        
+
         Args:
             stream: Binary stream containing JSON data
-            
+
         Yields:
             Parsed JSON objects
+
+        Raises:
+            JSONParseError: On invalid JSON or UTF-8, corrupt compressed data,
+                or a stream larger than ``max_size``
         """
-        while True:
-            chunk = stream.read(self.chunk_size)
-            if not chunk:
-                break
-                
+        # Incremental, so characters split across chunks decode correctly
+        decoder = codecs.getincrementaldecoder("utf-8")(self._errors)
+        consumed = 0
+        for chunk in self._read_chunks(stream):
+            final = not chunk
+
             # Decode chunk and add to buffer
+            pending = len(decoder.getstate()[0])
             try:
-                self._buffer += chunk.decode('utf-8')
+                self._buffer += decoder.decode(chunk, final)
             except UnicodeDecodeError as e:
-                raise JSONParseError(f"Invalid UTF-8 encoding: {e}")
-                
+                raise JSONParseError(
+                    f"Invalid UTF-8 encoding: {e.reason}", consumed - pending + e.start
+                ) from None
+            consumed += len(chunk)
+            if final:
+                break
+
             # Process complete objects from buffer
             while True:
                 obj = self._extract_object()
                 if obj is None:
                     break
                 yield obj
-                
+
         # Process any remaining data
         if self._buffer.strip():
             try:
                 yield self.parser.parse(self._buffer)
             except Exception as e:
                 raise JSONParseError(f"Error parsing final chunk: {e}")
-                
+
         self._buffer = ""
 
+    def _read_chunks(self, stream: BinaryIO) -> Iterator[bytes]:
+        """Read (decompressed) chunks from a stream, ending with an empty one"""
+        inflater = (
+            StreamDecompressor(self.max_size, self.chunk_size)
+            if self.decompress
+            else None
+        )
+        total = 0
+        try:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if inflater is None:
+                    total += len(chunk)
+                    if self.max_size is not None and total > self.max_size:
+                        raise JSONParseError(
+                            f"Stream larger than {self.max_size} bytes", self.max_size
+                        )
+                    if chunk:
+                        yield chunk
+                elif chunk:
+                    yield from inflater.decompress(chunk)
+                else:
+                    yield from inflater.finish()
+                if not chunk:
+                    break
+        except FrameError as e:
+            raise JSONParseError(str(e), inflater.bytes_in) from None
+        yield b""
+
     def _extract_object(self) -> Optional[Any]:
         """
         Extract a complete JSON object from the buffer
-        
+
         Returns:
             Parsed object if complete object found, None otherwise
         """
         try:
             # Find complete object
             decoder = json.JSONDecoder()
+            self._buffer = self._buffer.lstrip()
             obj, index = decoder.raw_decode(self._buffer)
-            
+
             # Update buffer and return object
             self._buffer = self._buffer[index:].lstrip()
             return obj
@@ -78,12 +143,12 @@ class StreamParser:
     def parse_file(self, filename: str) -> Iterator[Any]:
         """
         Parse JSON objects from a file
-        
+
         Args:
             filename: Path to JSON file
-            
+
         Yields:
             Parsed JSON objects
         """
-        with open(filename, 'rb') as f:
+        with open(filename, "rb") as f:
             yield from self.iter_parse(f)
@@ -0,0 +1,432 @@
+"""
+Structural tape: a flat index of a JSON document's values
+
+The tape records one entry per value or object key in document order, with
+byte offsets into the source buffer instead of decoded values. Skipping a
+subtree is a single jump, and Python objects are only built for the parts
+that are actually converted. The wasm backends fill the tape in linear
+memory (see wasm/assembly/tape.ts); :func:`build_tape` is the pure-Python
+equivalent used by the other backends.
+"""
+
+import json
+import re
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple, Union
+
+from .exceptions import JSONParseError
+from .intern import pairs_hook
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .intern import InternTable
+
+# Entry types, mirrors TapeType in wasm/assembly/tape.ts
+NULL = 0
+FALSE = 1
+TRUE = 2
+INTEGER = 3
+FLOAT = 4
+STRING = 5
+KEY = 6
+ARRAY = 7
+OBJECT = 8
+# ORed into STRING and KEY entries whose text contains escape sequences
+ESCAPED = 0x80
+
+# Bytes per tape entry: type, start, end, jump as little-endian u32
+TAPE_RECORD_SIZE = 16
+MAX_DEPTH = 1024
+
+# Mirrors ErrorCode in wasm/assembly/types.ts
+ERROR_MESSAGES = {
+    1: "Unexpected end of input",
+    2: "Invalid token",
+    3: "Unterminated string",
+    4: "Invalid string",
+    5: "Invalid number",
+    6: "Invalid array",
+    7: "Invalid object",
+    8: "Nesting too deep",
+    10: "String too long",
+    11: "Number too long",
+    12: "Too many elements",
+    13: "Invalid UTF-8 encoding",
+}
+TAPE_FULL = 9
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_VALUE = re.compile(
+    rb"""
+    (?P<plain>"[^"\\\x00-\x1f]*")
+  | (?P<escaped>"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*")
+  | (?P<integer>-?(?:0|[1-9][0-9]*)(?![.eE0-9]))
+  | (?P<float>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+  | (?P<true>true)
+  | (?P<false>false)
+  | (?P<null>null)
+  | (?P<open>[\[{])
+""",
+    re.VERBOSE,
+)
+_SCALAR_TYPES = {
+    "plain": STRING,
+    "escaped": STRING | ESCAPED,
+    "integer": INTEGER,
+    "float": FLOAT,
+    "true": TRUE,
+    "false": FALSE,
+    "null": NULL,
+}
+_LITERALS = {NULL: None, FALSE: False, TRUE: True}
+
+_dtype = None
+
+
+def tape_dtype() -> "np.dtype":
+    """Get the NumPy structured dtype of a tape entry"""
+    global _dtype
+    if _dtype is None:
+        import numpy as np
+
+        _dtype = np.dtype(
+            [("type", "<u4"), ("start", "<u4"), ("end", "<u4"), ("jump", "<u4")]
+        )
+    return _dtype
+
+
+def _value_error(buf: Any, pos: int) -> JSONParseError:
+    """Describe why no value could be matched at ``pos``"""
+    if pos >= len(buf):
+        return JSONParseError(ERROR_MESSAGES[1], pos)
+    char = buf[pos]
+    if char == 0x22:
+        return JSONParseError(ERROR_MESSAGES[4], pos)
+    if char == 0x2D or 0x30 <= char <= 0x39:
+        return JSONParseError(ERROR_MESSAGES[5], pos)
+    return JSONParseError(ERROR_MESSAGES[2], pos)
+
+
+def build_tape(buf: Union[bytes, memoryview], max_depth: int = MAX_DEPTH) -> "Tape":
+    """
+    Build the structural tape of a document in Python
+
+    Args:
+        buf: UTF-8 encoded JSON
+        max_depth: Maximum container nesting depth
+
+    Returns:
+        Tape over ``buf``
+
+    Raises:
+        JSONParseError: If the document is malformed
+    """
+    import numpy as np
+
+    skip = _WHITESPACE.match
+    match = _VALUE.match
+    types: List[int] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    jumps: List[int] = []
+    stack: List[int] = []
+    objects: List[bool] = []
+    length = len(buf)
+    pos = skip(buf, 0).end()
+    expect_key = False
+
+    while True:
+        if expect_key:
+            # A key and its colon precede every object member
+            m = match(buf, pos)
+            if m is None or m.lastgroup not in ("plain", "escaped"):
+                if pos >= length:
+                    raise JSONParseError(ERROR_MESSAGES[1], pos)
+                raise JSONParseError(ERROR_MESSAGES[7], pos)
+            types.append(KEY | (ESCAPED if m.lastgroup == "escaped" else 0))
+            starts.append(pos)
+            ends.append(m.end())
+            jumps.append(len(types))
+            pos = skip(buf, m.end()).end()
+            if pos >= length or buf[pos] != 0x3A:
+                raise JSONParseError(ERROR_MESSAGES[1 if pos >= length else 7], pos)
+            pos = skip(buf, pos + 1).end()
+            expect_key = False
+
+        m = match(buf, pos)
+        if m is None:
+            raise _value_error(buf, pos)
+        kind = m.lastgroup
+        if kind == "open":
+            if len(stack) >= max_depth:
+                raise JSONParseError(ERROR_MESSAGES[8], pos)
+            is_object = buf[pos] == 0x7B
+            stack.append(len(types))
+            objects.append(is_object)
+            types.append(OBJECT if is_object else ARRAY)
+            starts.append(pos)
+            ends.append(0)
+            jumps.append(0)
+            pos = skip(buf, pos + 1).end()
+            if pos >= length or buf[pos] != (0x7D if is_object else 0x5D):
+                expect_key = is_object
+                continue
+            # Empty container: closed by the loop below
+        else:
+            types.append(_SCALAR_TYPES[kind])
+            starts.append(pos)
+            pos = m.end()
+            ends.append(pos)
+            jumps.append(len(types))
+
+        # A value is complete: close containers or move to the next member
+        while True:
+            pos = skip(buf, pos).end()
+            if not stack:
+                if pos != length:
+                    raise JSONParseError(ERROR_MESSAGES[2], pos)
+                entries = np.empty(len(types), dtype=tape_dtype())
+                entries["type"] = types
+                entries["start"] = starts
+                entries["end"] = ends
+                entries["jump"] = jumps
+                return Tape(buf, entries)
+            if pos >= length:
+                raise JSONParseError(ERROR_MESSAGES[1], pos)
+            char = buf[pos]
+            is_object = objects[-1]
+            if char == 0x2C:
+                pos = skip(buf, pos + 1).end()
+                expect_key = is_object
+                break
+            if char == (0x7D if is_object else 0x5D):
+                pos += 1
+                index = stack.pop()
+                objects.pop()
+                ends[index] = pos
+                jumps[index] = len(types)
+                continue
+            raise JSONParseError(ERROR_MESSAGES[7 if is_object else 6], pos)
+
+
+def _decode_escaped(buf: Any, start: int, end: int, errors: str = "strict") -> str:
+    """Decode a quoted string token with escape sequences spanning ``buf[start:end]``"""
+    return json.loads(str(buf[start:end], "utf-8", errors))
+
+
+class Tape:
+    """
+    Structural tape over a source buffer
+
+    ``entries`` is a NumPy structured array with ``type``, ``start``, ``end``
+    and ``jump`` fields. Entries are in document order without closing
+    tokens: a container is followed by its children, an object member by
+    its key entry then its value, and ``jump`` is the index just past an
+    entry's subtree. ``start`` and ``end`` are byte offsets into ``buf``,
+    quotes and brackets included.
+
+    A tape filled by a wasm backend is a view into that backend's linear
+    memory and stays valid only until the backend's next call; use
+    :meth:`copy` to keep it longer.
+
+    ``errors`` is the codec error handler for string tokens: ``"strict"``
+    for validated input, ``"surrogateescape"`` when UTF-8 validation is off
+    so malformed bytes pass through instead of failing.
+    """
+
+    def __init__(
+        self,
+        buf: Union[bytes, memoryview],
+        entries: "np.ndarray",
+        errors: str = "strict",
+    ):
+        self.buf = buf
+        self.entries = entries
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def copy(self) -> "Tape":
+        """Get a tape that owns its entries and does not reference wasm memory"""
+        return Tape(self.buf, self.entries.copy(), self.errors)
+
+    def kind(self, index: int) -> int:
+        """Get the entry type at ``index`` without the ESCAPED flag"""
+        return int(self.entries["type"][index]) & ~ESCAPED
+
+    def jump(self, index: int) -> int:
+        """Get the index just past the subtree rooted at ``index``"""
+        return int(self.entries["jump"][index])
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """Get the byte range of the value at ``index`` in the source buffer"""
+        entry = self.entries[index]
+        return int(entry["start"]), int(entry["end"])
+
+    def children(self, index: int) -> Iterator[int]:
+        """
+        Iterate over the direct children of a container
+
+        Args:
+            index: Index of an array or object entry
+
+        Yields:
+            Element indices for arrays, key indices for objects (the value
+            entry follows its key)
+        """
+        jumps = self.entries["jump"]
+        step = 2 if self.kind(index) == OBJECT else 1
+        end = int(jumps[index])
+        child = index + 1
+        while child < end:
+            yield child
+            child = int(jumps[child + step - 1])
+
+    def fields(self, index: int) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Get the entries of a subtree as plain lists
+
+        One bulk conversion is much cheaper than a NumPy scalar access per
+        entry when walking many entries from Python.
+
+        Args:
+            index: Root entry index of the subtree
+
+        Returns:
+            ``types``, ``starts``, ``ends`` and ``jumps`` lists, where item 0
+            is the entry at ``index``; jumps stay absolute tape indices
+        """
+        window = self.entries[index : int(self.entries["jump"][index])]
+        return (
+            window["type"].tolist(),
+            window["start"].tolist(),
+            window["end"].tolist(),
+            window["jump"].tolist(),
+        )
+
+    def decode(self, index: int) -> Any:
+        """
+        Convert a single scalar or key entry to Python
+
+        Args:
+            index: Index of a non-container entry
+
+        Returns:
+            Decoded value
+        """
+        entry = self.entries[index]
+        return self.decode_token(
+            int(entry["type"]), int(entry["start"]), int(entry["end"])
+        )
+
+    def decode_token(self, kind: int, start: int, end: int) -> Any:
+        """
+        Convert a scalar or key token to Python from its raw entry fields
+
+        Args:
+            kind: Entry type, including the ESCAPED flag
+            start: Token start offset
+            end: Token end offset
+
+        Returns:
+            Decoded value
+        """
+        if kind == STRING or kind == KEY:
+            return str(self.buf[start + 1 : end - 1], "utf-8", self.errors)
+        if kind & ESCAPED:
+            return _decode_escaped(self.buf, start, end, self.errors)
+        if kind == INTEGER:
+            return int(bytes(self.buf[start:end]))
+        if kind == FLOAT:
+            return float(bytes(self.buf[start:end]))
+        return _LITERALS[kind]
+
+    def to_python(
+        self,
+        index: int = 0,
+        keys: Optional["InternTable"] = None,
+        strings: Optional["InternTable"] = None,
+    ) -> Any:
+        """
+        Convert the subtree rooted at ``index`` to Python objects
+
+        The tape has already validated the subtree, so a container is handed
+        to the C decoder of ``json.loads`` in one call instead of being
+        walked entry by entry; only documents nested deeper than that
+        decoder's recursion limit take the entry walk.
+
+        Args:
+            index: Root entry index, 0 for the whole document
+            keys: Intern table shared by equal object keys
+            strings: Intern table deduplicating string values of object
+                members
+
+        Returns:
+            Parsed Python object
+        """
+        entries = self.entries
+        kind = int(entries["type"][index])
+        start = int(entries["start"][index])
+        end = int(entries["end"][index])
+        if kind != ARRAY and kind != OBJECT:
+            value = self.decode_token(kind, start, end)
+            if strings is not None and type(value) is str:
+                value = strings.intern(value)
+            return value
+        text = str(self.buf[start:end], "utf-8", self.errors)
+        try:
+            return json.loads(text, object_pairs_hook=pairs_hook(keys, strings))
+        except RecursionError:
+            return self._walk(index, keys, strings)
+
+    def _walk(
+        self,
+        index: int,
+        keys: Optional["InternTable"],
+        strings: Optional["InternTable"],
+    ) -> Any:
+        """Convert a subtree entry by entry, without recursion"""
+        stop = int(self.entries["jump"][index])
+        types, starts, ends, jumps = self.fields(index)
+        scalar = self.decode_token
+        intern_key = keys.intern if keys is not None else None
+        intern_string = strings.intern if strings is not None else None
+
+        # Open containers as (container, end index, pending key)
+        stack: List[List[Any]] = []
+        root: Any = None
+        i = 0
+        count = stop - index
+        while i < count:
+            kind = types[i]
+            if kind == ARRAY or kind == OBJECT:
+                value: Any = [] if kind == ARRAY else {}
+                frame = [value, jumps[i] - index, None]
+            elif kind == KEY or kind == KEY | ESCAPED:
+                key = scalar(kind, starts[i], ends[i])
+                stack[-1][2] = intern_key(key) if intern_key is not None else key
+                i += 1
+                continue
+            else:
+                value = scalar(kind, starts[i], ends[i])
+                if intern_string is not None and (
+                    kind == STRING or kind == STRING | ESCAPED
+                ):
+                    value = intern_string(value)
+                frame = None
+
+            if stack:
+                parent = stack[-1]
+                if parent[2] is None:
+                    parent[0].append(value)
+                else:
+                    parent[0][parent[2]] = value
+            else:
+                root = value
+            i += 1
+            if frame is not None:
+                stack.append(frame)
+            while stack and stack[-1][1] == i:
+                stack.pop()
+        return root
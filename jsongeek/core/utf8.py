@@ -0,0 +1,47 @@
+"""
+UTF-8 validation of raw JSON bytes
+"""
+
+import codecs
+import re
+from typing import Union
+
+from .exceptions import JSONParseError
+
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+def is_ascii(buf: Union[bytes, bytearray, memoryview]) -> bool:
+    """
+    Check in bulk whether a buffer holds only ASCII bytes
+
+    Args:
+        buf: Bytes-like object; memoryviews and mmaps are not copied
+
+    Returns:
+        True if every byte is below 0x80
+    """
+    if isinstance(buf, (bytes, bytearray)):
+        return buf.isascii()
+    return _NON_ASCII.search(buf) is None
+
+
+def check_utf8(buf: Union[bytes, bytearray, memoryview]) -> None:
+    """
+    Validate that a buffer is well-formed UTF-8
+
+    ASCII-only input, the common case, is recognised in bulk and needs no
+    decoding.
+
+    Args:
+        buf: Bytes-like object
+
+    Raises:
+        JSONParseError: At the first malformed byte
+    """
+    if is_ascii(buf):
+        return
+    try:
+        codecs.utf_8_decode(buf, "strict", True)
+    except UnicodeDecodeError as e:
+        raise JSONParseError(f"Invalid UTF-8 encoding: {e.reason}", e.start) from None
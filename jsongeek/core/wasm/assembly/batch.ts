@@ -0,0 +1,46 @@
+import { ErrorCode } from './types';
+import { buildTape, tape_error_code, tape_error_position } from './tape';
+
+// Bytes per document in the batch output: error code, error position, root
+export const BATCH_RECORD_SIZE: i32 = 12;
+
+// Build the tapes of `count` documents packed back to back at `dataPtr` in
+// one call. Document i spans [offsets[i], offsets[i + 1]) relative to
+// `dataPtr`, where `offsetsPtr` points to count + 1 u32 offsets. All tapes
+// share the `capacity` records at `tapePtr`, with offsets relative to each
+// document's start. One record per document is written to `outPtr`: the
+// error code, the error position relative to the document start and the
+// index of the document's root tape record. Returns the number of failed
+// documents, or -1 if the tape ran out of capacity.
+export function parseBatch(
+  dataPtr: i32,
+  offsetsPtr: i32,
+  count: i32,
+  outPtr: i32,
+  tapePtr: i32,
+  capacity: i32
+): i32 {
+  let failures = 0;
+  let used = 0;
+  for (let i = 0; i < count; i++) {
+    const start = dataPtr + load<i32>(offsetsPtr + (i << 2));
+    const end = dataPtr + load<i32>(offsetsPtr + ((i + 1) << 2));
+    const written = buildTape(start, end - start, tapePtr, capacity, used);
+    const record = outPtr + i * BATCH_RECORD_SIZE;
+    if (written < 0) {
+      if (tape_error_code() == ErrorCode.TAPE_FULL) {
+        return -1;
+      }
+      store<i32>(record, tape_error_code());
+      store<i32>(record, tape_error_position(), 4);
+      store<i32>(record, 0, 8);
+      failures++;
+      continue;
+    }
+    store<i32>(record, ErrorCode.NONE);
+    store<i32>(record, 0, 4);
+    store<i32>(record, used, 8);
+    used += written;
+  }
+  return failures;
+}
@@ -1,4 +1,6 @@
 import { JSONType, ParseResult, ErrorCode } from './types';
+import { parseBatch } from './batch';
+export { build_tape, set_limits, set_utf8_validation, tape_error_code, tape_error_position } from './tape';
 
 // Memory management
 let heap: ArrayBuffer | null = null;
@@ -13,23 +15,23 @@ function isDigit(c: u8): bool {
   return c >= 0x30 && c <= 0x39;
 }
 
-function parseNumber(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseNumber(start: i32, end: i32): ParseResult {
   let pos = start;
   let isNegative = false;
   let hasDecimal = false;
   let value = 0;
 
   // Handle sign
-  if (bytes[pos] == 0x2D) { // -
+  if (load<u8>(pos) == 0x2D) { // -
     isNegative = true;
     pos++;
-  } else if (bytes[pos] == 0x2B) { // +
+  } else if (load<u8>(pos) == 0x2B) { // +
     pos++;
   }
 
   // Parse digits
-  while (pos < end && isDigit(bytes[pos])) {
-    value = value * 10 + (bytes[pos] - 0x30);
+  while (pos < end && isDigit(load<u8>(pos))) {
+    value = value * 10 + (load<u8>(pos) - 0x30);
     pos++;
   }
 
@@ -40,86 +42,86 @@ function parseNumber(bytes: Uint8Array, start: i32, end: i32): ParseResult {
   return new ParseResult(JSONType.NUMBER, start, pos, ErrorCode.NONE);
 }
 
-function parseString(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseString(start: i32, end: i32): ParseResult {
   let pos = start + 1; // Skip opening quote
   
-  while (pos < end && bytes[pos] != 0x22) { // "
-    if (bytes[pos] == 0x5C) { // \
+  while (pos < end && load<u8>(pos) != 0x22) { // "
+    if (load<u8>(pos) == 0x5C) { // \
       pos++; // Skip escape character
     }
     pos++;
   }
   
-  if (pos >= end || bytes[pos] != 0x22) {
+  if (pos >= end || load<u8>(pos) != 0x22) {
     return new ParseResult(JSONType.NULL, start, pos, ErrorCode.INVALID_STRING);
   }
   
   return new ParseResult(JSONType.STRING, start, pos + 1, ErrorCode.NONE);
 }
 
-function parseTrue(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseTrue(start: i32, end: i32): ParseResult {
   if (end - start < 4 ||
-      bytes[start] != 0x74 || // t
-      bytes[start + 1] != 0x72 || // r
-      bytes[start + 2] != 0x75 || // u
-      bytes[start + 3] != 0x65) { // e
+      load<u8>(start) != 0x74 || // t
+      load<u8>(start + 1) != 0x72 || // r
+      load<u8>(start + 2) != 0x75 || // u
+      load<u8>(start + 3) != 0x65) { // e
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.BOOLEAN, start, start + 4, ErrorCode.NONE);
 }
 
-function parseFalse(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseFalse(start: i32, end: i32): ParseResult {
   if (end - start < 5 ||
-      bytes[start] != 0x66 || // f
-      bytes[start + 1] != 0x61 || // a
-      bytes[start + 2] != 0x6C || // l
-      bytes[start + 3] != 0x73 || // s
-      bytes[start + 4] != 0x65) { // e
+      load<u8>(start) != 0x66 || // f
+      load<u8>(start + 1) != 0x61 || // a
+      load<u8>(start + 2) != 0x6C || // l
+      load<u8>(start + 3) != 0x73 || // s
+      load<u8>(start + 4) != 0x65) { // e
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.BOOLEAN, start, start + 5, ErrorCode.NONE);
 }
 
-function parseNull(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseNull(start: i32, end: i32): ParseResult {
   if (end - start < 4 ||
-      bytes[start] != 0x6E || // n
-      bytes[start + 1] != 0x75 || // u
-      bytes[start + 2] != 0x6C || // l
-      bytes[start + 3] != 0x6C) { // l
+      load<u8>(start) != 0x6E || // n
+      load<u8>(start + 1) != 0x75 || // u
+      load<u8>(start + 2) != 0x6C || // l
+      load<u8>(start + 3) != 0x6C) { // l
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.NULL, start, start + 4, ErrorCode.NONE);
 }
 
-function parseValue(bytes: Uint8Array, start: i32, end: i32): ParseResult {
+function parseValue(start: i32, end: i32): ParseResult {
   if (start >= end) {
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.UNEXPECTED_EOF);
   }
 
-  const c = bytes[start];
+  const c = load<u8>(start);
   
   // Skip whitespace
   if (isWhitespace(c)) {
     let pos = start;
-    while (pos < end && isWhitespace(bytes[pos])) {
+    while (pos < end && isWhitespace(load<u8>(pos))) {
       pos++;
     }
     if (pos >= end) {
       return new ParseResult(JSONType.NULL, start, pos, ErrorCode.UNEXPECTED_EOF);
     }
-    return parseValue(bytes, pos, end);
+    return parseValue(pos, end);
   }
 
   // Parse based on first character
   switch (c) {
     case 0x22: // "
-      return parseString(bytes, start, end);
+      return parseString(start, end);
     case 0x74: // t
-      return parseTrue(bytes, start, end);
+      return parseTrue(start, end);
     case 0x66: // f
-      return parseFalse(bytes, start, end);
+      return parseFalse(start, end);
     case 0x6E: // n
-      return parseNull(bytes, start, end);
+      return parseNull(start, end);
     case 0x2D: // -
     case 0x30: // 0
     case 0x31: // 1
@@ -131,7 +133,7 @@ function parseValue(bytes: Uint8Array, start: i32, end: i32): ParseResult {
     case 0x37: // 7
     case 0x38: // 8
     case 0x39: // 9
-      return parseNumber(bytes, start, end);
+      return parseNumber(start, end);
     default:
       return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
@@ -150,33 +152,46 @@ export function free(ptr: i32): void {
   dataView = null;
 }
 
-export function parse(input: Uint8Array): ParseResult {
-  const length = input.length;
-  let pos = 0;
+// Parse one UTF-8 document of `len` bytes at `ptr` in linear memory
+export function parse(ptr: i32, len: i32): ParseResult {
+  const end = ptr + len;
+  let pos = ptr;
 
   // Skip whitespace
-  while (pos < length && isWhitespace(input[pos])) {
+  while (pos < end && isWhitespace(load<u8>(pos))) {
     pos++;
   }
 
-  if (pos >= length) {
-    return new ParseResult(JSONType.NULL, 0, 0, ErrorCode.UNEXPECTED_EOF);
+  if (pos >= end) {
+    return new ParseResult(JSONType.NULL, ptr, ptr, ErrorCode.UNEXPECTED_EOF);
   }
 
-  const result = parseValue(input, pos, length);
+  const result = parseValue(pos, end);
   if (result.error != ErrorCode.NONE) {
     return result;
   }
 
   // Skip trailing whitespace
   pos = result.end;
-  while (pos < length && isWhitespace(input[pos])) {
+  while (pos < end && isWhitespace(load<u8>(pos))) {
     pos++;
   }
 
-  if (pos < length) {
-    return new ParseResult(JSONType.NULL, 0, 0, ErrorCode.INVALID_TOKEN);
+  if (pos < end) {
+    return new ParseResult(JSONType.NULL, pos, pos, ErrorCode.INVALID_TOKEN);
   }
 
   return result;
 }
+
+// Build the tapes of many packed documents in a single call (see batch.ts)
+export function parse_batch(
+  dataPtr: i32,
+  offsetsPtr: i32,
+  count: i32,
+  outPtr: i32,
+  tapePtr: i32,
+  capacity: i32
+): i32 {
+  return parseBatch(dataPtr, offsetsPtr, count, outPtr, tapePtr, capacity);
+}
@@ -1,4 +1,6 @@
 import { JSONType, TokenType, ParseResult, ErrorCode } from './types';
+import { parseBatch } from './batch';
+export { build_tape, set_limits, set_utf8_validation, tape_error_code, tape_error_position } from './tape';
 
 // SIMD constants for JSON parsing
 const QUOTE: v128 = v128.splat<u8>(0x22);  // '"'
@@ -150,57 +152,69 @@ function parseNumberSimd(start: i32, end: i32): f64 {
   return sign * value;
 }
 
-// Main parse function
-export function parse(input: string): ParseResult {
-  const length = input.length;
-  let pos = 0;
+// Parse one UTF-8 document of `len` bytes at `ptr` in linear memory
+export function parse_simd(ptr: i32, len: i32): ParseResult {
+  const end = ptr + len;
+  let pos = ptr;
 
   // Skip whitespace
-  while (pos < length && (input.charCodeAt(pos) <= 0x20 || input.charCodeAt(pos) == 0x2C)) {
+  while (pos < end && (load<u8>(pos) <= 0x20 || load<u8>(pos) == 0x2C)) {
     pos++;
   }
 
-  if (pos >= length) {
-    return new ParseResult(JSONType.NULL, 0, 0, ErrorCode.UNEXPECTED_EOF);
+  if (pos >= end) {
+    return new ParseResult(JSONType.NULL, ptr, ptr, ErrorCode.UNEXPECTED_EOF);
   }
 
-  const result = parseValue(input, pos, length);
+  const result = parseValue(pos, end);
   if (result.error != ErrorCode.NONE) {
     return result;
   }
 
   // Skip trailing whitespace
   pos = result.end;
-  while (pos < length && (input.charCodeAt(pos) <= 0x20 || input.charCodeAt(pos) == 0x2C)) {
+  while (pos < end && (load<u8>(pos) <= 0x20 || load<u8>(pos) == 0x2C)) {
     pos++;
   }
 
-  if (pos < length) {
-    return new ParseResult(JSONType.NULL, 0, 0, ErrorCode.INVALID_TOKEN);
+  if (pos < end) {
+    return new ParseResult(JSONType.NULL, pos, pos, ErrorCode.INVALID_TOKEN);
   }
 
   return result;
 }
 
-function parseValue(input: string, start: i32, end: i32): ParseResult {
+// Build the tapes of many packed documents in a single call (see batch.ts)
+export function parse_batch(
+  dataPtr: i32,
+  offsetsPtr: i32,
+  count: i32,
+  outPtr: i32,
+  tapePtr: i32,
+  capacity: i32
+): i32 {
+  return parseBatch(dataPtr, offsetsPtr, count, outPtr, tapePtr, capacity);
+}
+
+function parseValue(start: i32, end: i32): ParseResult {
   if (start >= end) {
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.UNEXPECTED_EOF);
   }
 
-  const c = input.charCodeAt(start);
+  const c = load<u8>(start);
   switch (c) {
     case 0x22: // '"'
-      return parseString(input, start, end);
+      return parseString(start, end);
     case 0x7B: // '{'
       return new ParseResult(JSONType.OBJECT, start, start + 1, ErrorCode.NONE); // TODO: Implement object parsing
     case 0x5B: // '['
       return new ParseResult(JSONType.ARRAY, start, start + 1, ErrorCode.NONE);  // TODO: Implement array parsing
     case 0x74: // 't'
-      return parseTrue(input, start, end);
+      return parseTrue(start, end);
     case 0x66: // 'f'
-      return parseFalse(input, start, end);
+      return parseFalse(start, end);
     case 0x6E: // 'n'
-      return parseNull(input, start, end);
+      return parseNull(start, end);
     case 0x2D: // '-'
     case 0x30: // '0'
     case 0x31: // '1'
@@ -212,14 +226,14 @@ function parseValue(input: string, start: i32, end: i32): ParseResult {
     case 0x37: // '7'
     case 0x38: // '8'
     case 0x39: // '9'
-      return parseNumber(input, start, end);
+      return parseNumber(start, end);
     default:
       return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
 }
 
 // Helper functions for parsing specific types
-function parseString(input: string, start: i32, end: i32): ParseResult {
+function parseString(start: i32, end: i32): ParseResult {
   const quoteEnd = findQuoteSimd(start + 1, end);
   if (quoteEnd == -1) {
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_STRING);
@@ -227,44 +241,44 @@ function parseString(input: string, start: i32, end: i32): ParseResult {
   return new ParseResult(JSONType.STRING, start, quoteEnd + 1, ErrorCode.NONE);
 }
 
-function parseNumber(input: string, start: i32, end: i32): ParseResult {
+function parseNumber(start: i32, end: i32): ParseResult {
   const value = parseNumberSimd(start, end);
   if (isNaN(value)) {
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_NUMBER);
   }
   let pos = start;
-  while (pos < end && isNumberChar(input.charCodeAt(pos))) {
+  while (pos < end && isNumberChar(load<u8>(pos))) {
     pos++;
   }
   return new ParseResult(JSONType.NUMBER, start, pos, ErrorCode.NONE);
 }
 
-function parseTrue(input: string, start: i32, end: i32): ParseResult {
+function parseTrue(start: i32, end: i32): ParseResult {
   if (start + 4 > end || 
-      input.charCodeAt(start + 1) != 0x72 || // 'r'
-      input.charCodeAt(start + 2) != 0x75 || // 'u'
-      input.charCodeAt(start + 3) != 0x65) { // 'e'
+      load<u8>(start + 1) != 0x72 || // 'r'
+      load<u8>(start + 2) != 0x75 || // 'u'
+      load<u8>(start + 3) != 0x65) { // 'e'
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.BOOLEAN, start, start + 4, ErrorCode.NONE);
 }
 
-function parseFalse(input: string, start: i32, end: i32): ParseResult {
+function parseFalse(start: i32, end: i32): ParseResult {
   if (start + 5 > end ||
-      input.charCodeAt(start + 1) != 0x61 || // 'a'
-      input.charCodeAt(start + 2) != 0x6C || // 'l'
-      input.charCodeAt(start + 3) != 0x73 || // 's'
-      input.charCodeAt(start + 4) != 0x65) { // 'e'
+      load<u8>(start + 1) != 0x61 || // 'a'
+      load<u8>(start + 2) != 0x6C || // 'l'
+      load<u8>(start + 3) != 0x73 || // 's'
+      load<u8>(start + 4) != 0x65) { // 'e'
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.BOOLEAN, start, start + 5, ErrorCode.NONE);
 }
 
-function parseNull(input: string, start: i32, end: i32): ParseResult {
+function parseNull(start: i32, end: i32): ParseResult {
   if (start + 4 > end ||
-      input.charCodeAt(start + 1) != 0x75 || // 'u'
-      input.charCodeAt(start + 2) != 0x6C || // 'l'
-      input.charCodeAt(start + 3) != 0x6C) { // 'l'
+      load<u8>(start + 1) != 0x75 || // 'u'
+      load<u8>(start + 2) != 0x6C || // 'l'
+      load<u8>(start + 3) != 0x6C) { // 'l'
     return new ParseResult(JSONType.NULL, start, start, ErrorCode.INVALID_TOKEN);
   }
   return new ParseResult(JSONType.NULL, start, start + 4, ErrorCode.NONE);
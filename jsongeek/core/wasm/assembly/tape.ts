@@ -0,0 +1,444 @@
+import { ErrorCode } from './types';
+
+// Structural tape: one 16-byte record per value or object key, written in
+// document order. Mirrored by jsongeek/core/tape.py.
+//   u32 type   TapeType, ORed with TAPE_ESCAPED for strings with escapes
+//   u32 start  byte offset of the token, relative to the document start
+//   u32 end    byte offset just past the token (past the closing bracket
+//              for containers)
+//   u32 jump   index of the record following this value and its children
+export const TAPE_RECORD_SIZE: i32 = 16;
+export const TAPE_ESCAPED: u32 = 0x80;
+export const MAX_DEPTH: i32 = 1024;
+
+export enum TapeType {
+  NULL,
+  FALSE,
+  TRUE,
+  INTEGER,
+  FLOAT,
+  STRING,
+  KEY,
+  ARRAY,
+  OBJECT
+}
+
+// Open containers: tape index and whether the container is an object
+const containerIndex = new StaticArray<i32>(MAX_DEPTH);
+const containerIsObject = new StaticArray<bool>(MAX_DEPTH);
+
+// Resource limits, see set_limits
+let maxDepth: i32 = MAX_DEPTH;
+let maxStringLength: i32 = i32.MAX_VALUE;
+let maxNumberLength: i32 = i32.MAX_VALUE;
+let maxElements: i32 = i32.MAX_VALUE;
+
+// Set the limits enforced by build_tape and parse_batch. Negative values
+// mean no limit; the depth is capped at MAX_DEPTH. Strings are measured in
+// bytes between the quotes and elements count tape records per document.
+export function set_limits(depth: i32, stringLength: i32, numberLength: i32, elements: i32): void {
+  maxDepth = depth < 0 || depth > MAX_DEPTH ? MAX_DEPTH : depth;
+  maxStringLength = stringLength < 0 ? i32.MAX_VALUE : stringLength;
+  maxNumberLength = numberLength < 0 ? i32.MAX_VALUE : numberLength;
+  maxElements = elements < 0 ? i32.MAX_VALUE : elements;
+}
+
+// Whether non-ASCII bytes in strings are checked to be well-formed UTF-8
+let validateUtf8 = true;
+
+// Enable (non-zero) or disable UTF-8 validation for trusted input
+export function set_utf8_validation(enabled: i32): void {
+  validateUtf8 = enabled != 0;
+}
+
+let lastErrorCode: ErrorCode = ErrorCode.NONE;
+let lastErrorPosition: i32 = 0;
+
+// Error code of the last failed build_tape call
+export function tape_error_code(): i32 {
+  return lastErrorCode;
+}
+
+// Byte offset (relative to the document) of the last build_tape failure
+export function tape_error_position(): i32 {
+  return lastErrorPosition;
+}
+
+function fail(code: ErrorCode, position: i32): i32 {
+  lastErrorCode = code;
+  lastErrorPosition = position;
+  return -1;
+}
+
+@inline
+function isSpace(c: u8): bool {
+  return c == 0x20 || c == 0x0A || c == 0x0D || c == 0x09;
+}
+
+@inline
+function isDigit(c: u8): bool {
+  return c >= 0x30 && c <= 0x39;
+}
+
+function skipSpace(pos: i32, end: i32): i32 {
+  while (pos < end && isSpace(load<u8>(pos))) {
+    pos++;
+  }
+  return pos;
+}
+
+@inline
+function writeRecord(tape: i32, index: i32, type: u32, start: i32, end: i32, jump: i32): void {
+  const record = tape + index * TAPE_RECORD_SIZE;
+  store<u32>(record, type);
+  store<u32>(record, start, 4);
+  store<u32>(record, end, 8);
+  store<u32>(record, jump, 12);
+}
+
+// Length of the well-formed UTF-8 sequence starting with lead byte `c` at
+// `pos` (RFC 3629: no overlongs, surrogates or code points past U+10FFFF),
+// or 0 if it is malformed.
+function utf8SequenceLength(pos: i32, end: i32, c: u32): i32 {
+  let size: i32;
+  let low: u32 = 0x80;
+  let high: u32 = 0xBF;
+  if (c >= 0xC2 && c <= 0xDF) {
+    size = 2;
+  } else if (c >= 0xE0 && c <= 0xEF) {
+    size = 3;
+    if (c == 0xE0) low = 0xA0;
+    if (c == 0xED) high = 0x9F;
+  } else if (c >= 0xF0 && c <= 0xF4) {
+    size = 4;
+    if (c == 0xF0) low = 0x90;
+    if (c == 0xF4) high = 0x8F;
+  } else {
+    return 0;
+  }
+  if (pos + size > end) {
+    return 0;
+  }
+  // Only the first continuation byte has a narrowed range
+  const second = <u32>load<u8>(pos + 1);
+  if (second < low || second > high) {
+    return 0;
+  }
+  for (let i = 2; i < size; i++) {
+    if ((load<u8>(pos + i) & 0xC0) != 0x80) {
+      return 0;
+    }
+  }
+  return size;
+}
+
+// Bit 7 of each byte of `w` is set where the byte is below 0x20, is '"' or
+// '\\', or is not ASCII: the bytes that end the bulk string scan.
+@inline
+function specialBytes(w: u64): u64 {
+  const ones: u64 = 0x0101010101010101;
+  const high: u64 = 0x8080808080808080;
+  const quote = w ^ (ones * 0x22);
+  const backslash = w ^ (ones * 0x5C);
+  return ((w - ones * 0x20) | (quote - ones) | (backslash - ones) | w) & high;
+}
+
+// Scan a string starting at the opening quote. Returns the offset just past
+// the closing quote, or -1. Sets `scanEscaped` when the string has escapes
+// and `scanBadUtf8`, with the offending offset in `scanUtf8Position`, when
+// it failed on malformed UTF-8.
+let scanEscaped = false;
+let scanBadUtf8 = false;
+let scanUtf8Position: i32 = 0;
+
+function scanString(pos: i32, end: i32): i32 {
+  scanEscaped = false;
+  scanBadUtf8 = false;
+  pos++;
+  while (pos < end) {
+    // Plain ASCII runs are skipped eight bytes at a time
+    while (pos + 8 <= end && specialBytes(load<u64>(pos)) == 0) {
+      pos += 8;
+    }
+    if (pos >= end) {
+      break;
+    }
+    const c = load<u8>(pos);
+    if (c == 0x22) { // "
+      return pos + 1;
+    }
+    if (c == 0x5C) { // backslash
+      scanEscaped = true;
+      if (pos + 1 >= end) {
+        return -1;
+      }
+      const e = load<u8>(pos + 1);
+      if (e == 0x75) { // u
+        if (pos + 6 > end) {
+          return -1;
+        }
+        for (let i = 2; i < 6; i++) {
+          const h = load<u8>(pos + i);
+          if (!(isDigit(h) || (h >= 0x41 && h <= 0x46) || (h >= 0x61 && h <= 0x66))) {
+            return -1;
+          }
+        }
+        pos += 6;
+        continue;
+      }
+      if (e != 0x22 && e != 0x5C && e != 0x2F && e != 0x62 &&
+          e != 0x66 && e != 0x6E && e != 0x72 && e != 0x74) {
+        return -1;
+      }
+      pos += 2;
+      continue;
+    }
+    if (c < 0x20) {
+      return -1;
+    }
+    if (c >= 0x80 && validateUtf8) {
+      const size = utf8SequenceLength(pos, end, c);
+      if (size == 0) {
+        scanBadUtf8 = true;
+        scanUtf8Position = pos;
+        return -1;
+      }
+      pos += size;
+      continue;
+    }
+    pos++;
+  }
+  return -1;
+}
+
+// Record the failure of scanString for the string at `pos`
+function failString(pos: i32, doc: i32): i32 {
+  if (scanBadUtf8) {
+    return fail(ErrorCode.INVALID_UTF8, scanUtf8Position - doc);
+  }
+  return fail(ErrorCode.INVALID_STRING, pos - doc);
+}
+
+// Scan a number per RFC 8259. Returns the offset just past it, or -1. Sets
+// `scanFloat` when the number has a fraction or exponent.
+let scanFloat = false;
+
+function scanNumber(pos: i32, end: i32): i32 {
+  scanFloat = false;
+  if (pos < end && load<u8>(pos) == 0x2D) { // -
+    pos++;
+  }
+  if (pos >= end || !isDigit(load<u8>(pos))) {
+    return -1;
+  }
+  if (load<u8>(pos) == 0x30) { // leading zero
+    pos++;
+  } else {
+    while (pos < end && isDigit(load<u8>(pos))) {
+      pos++;
+    }
+  }
+  if (pos < end && load<u8>(pos) == 0x2E) { // .
+    scanFloat = true;
+    pos++;
+    if (pos >= end || !isDigit(load<u8>(pos))) {
+      return -1;
+    }
+    while (pos < end && isDigit(load<u8>(pos))) {
+      pos++;
+    }
+  }
+  if (pos < end && (load<u8>(pos) | 0x20) == 0x65) { // e or E
+    scanFloat = true;
+    pos++;
+    if (pos < end && (load<u8>(pos) == 0x2B || load<u8>(pos) == 0x2D)) {
+      pos++;
+    }
+    if (pos >= end || !isDigit(load<u8>(pos))) {
+      return -1;
+    }
+    while (pos < end && isDigit(load<u8>(pos))) {
+      pos++;
+    }
+  }
+  return pos;
+}
+
+function matchLiteral(pos: i32, end: i32, word: u32, size: i32): bool {
+  if (pos + size > end) {
+    return false;
+  }
+  for (let i = 0; i < size; i++) {
+    if (load<u8>(pos + i) != <u8>(word >> (8 * i))) {
+      return false;
+    }
+  }
+  return true;
+}
+
+// Build the tape for the document of `len` bytes at `doc`, writing records
+// from index `first` on. Returns the number of records written, or -1 with
+// tape_error_code()/tape_error_position() describing the failure.
+export function buildTape(doc: i32, len: i32, tape: i32, capacity: i32, first: i32): i32 {
+  const end = doc + len;
+  let pos = skipSpace(doc, end);
+  let n = first;
+  let depth = 0;
+
+  while (true) {
+    // A value is expected at `pos`
+    if (pos >= end) {
+      return fail(ErrorCode.UNEXPECTED_EOF, pos - doc);
+    }
+    if (n - first >= maxElements) {
+      return fail(ErrorCode.TOO_MANY_ELEMENTS, pos - doc);
+    }
+    if (n >= capacity) {
+      return fail(ErrorCode.TAPE_FULL, pos - doc);
+    }
+    const c = load<u8>(pos);
+    let open = false;
+
+    if (c == 0x7B || c == 0x5B) { // { or [
+      if (depth == maxDepth) {
+        return fail(ErrorCode.NESTING_TOO_DEEP, pos - doc);
+      }
+      const isObject = c == 0x7B;
+      writeRecord(tape, n, isObject ? TapeType.OBJECT : TapeType.ARRAY, pos - doc, 0, 0);
+      containerIndex[depth] = n;
+      containerIsObject[depth] = isObject;
+      depth++;
+      n++;
+      pos = skipSpace(pos + 1, end);
+      // '}' and ']' are two past '{' and '['
+      if (pos < end && load<u8>(pos) == c + 2) {
+        pos++;
+        depth--;
+        const index = containerIndex[depth];
+        store<u32>(tape + index * TAPE_RECORD_SIZE, pos - doc, 8);
+        store<u32>(tape + index * TAPE_RECORD_SIZE, n, 12);
+      } else {
+        open = true;
+      }
+    } else if (c == 0x22) { // "
+      const stop = scanString(pos, end);
+      if (stop < 0) {
+        return failString(pos, doc);
+      }
+      if (stop - pos - 2 > maxStringLength) {
+        return fail(ErrorCode.STRING_TOO_LONG, pos - doc);
+      }
+      const type = <u32>TapeType.STRING | (scanEscaped ? TAPE_ESCAPED : 0);
+      writeRecord(tape, n, type, pos - doc, stop - doc, n + 1);
+      n++;
+      pos = stop;
+    } else if (c == 0x2D || isDigit(c)) {
+      const stop = scanNumber(pos, end);
+      if (stop < 0) {
+        return fail(ErrorCode.INVALID_NUMBER, pos - doc);
+      }
+      if (stop - pos > maxNumberLength) {
+        return fail(ErrorCode.NUMBER_TOO_LONG, pos - doc);
+      }
+      writeRecord(tape, n, scanFloat ? TapeType.FLOAT : TapeType.INTEGER, pos - doc, stop - doc, n + 1);
+      n++;
+      pos = stop;
+    } else if (matchLiteral(pos, end, 0x65757274, 4)) { // true
+      writeRecord(tape, n, TapeType.TRUE, pos - doc, pos + 4 - doc, n + 1);
+      n++;
+      pos += 4;
+    } else if (matchLiteral(pos, end, 0x736C6166, 4) && pos + 4 < end && load<u8>(pos + 4) == 0x65) { // false
+      writeRecord(tape, n, TapeType.FALSE, pos - doc, pos + 5 - doc, n + 1);
+      n++;
+      pos += 5;
+    } else if (matchLiteral(pos, end, 0x6C6C756E, 4)) { // null
+      writeRecord(tape, n, TapeType.NULL, pos - doc, pos + 4 - doc, n + 1);
+      n++;
+      pos += 4;
+    } else {
+      return fail(ErrorCode.INVALID_TOKEN, pos - doc);
+    }
+
+    // Inside a new non-empty object the first key comes next
+    if (open && containerIsObject[depth - 1]) {
+      pos = scanKey(pos, end, doc, tape, n, capacity, first);
+      if (pos < 0) {
+        return -1;
+      }
+      n++;
+      continue;
+    }
+    if (open) {
+      continue;
+    }
+
+    // A value is complete: close containers or move to the next element
+    while (true) {
+      pos = skipSpace(pos, end);
+      if (depth == 0) {
+        if (pos != end) {
+          return fail(ErrorCode.INVALID_TOKEN, pos - doc);
+        }
+        return n - first;
+      }
+      if (pos >= end) {
+        return fail(ErrorCode.UNEXPECTED_EOF, pos - doc);
+      }
+      const d = load<u8>(pos);
+      const isObject = containerIsObject[depth - 1];
+      if (d == 0x2C) { // ,
+        pos = skipSpace(pos + 1, end);
+        if (isObject) {
+          pos = scanKey(pos, end, doc, tape, n, capacity, first);
+          if (pos < 0) {
+            return -1;
+          }
+          n++;
+        }
+        break;
+      }
+      if (d == (isObject ? 0x7D : 0x5D)) { // } or ]
+        pos++;
+        depth--;
+        const index = containerIndex[depth];
+        store<u32>(tape + index * TAPE_RECORD_SIZE, pos - doc, 8);
+        store<u32>(tape + index * TAPE_RECORD_SIZE, n, 12);
+        continue;
+      }
+      return fail(isObject ? ErrorCode.INVALID_OBJECT : ErrorCode.INVALID_ARRAY, pos - doc);
+    }
+  }
+  return -1;
+}
+
+// Scan `"key" :` at `pos` and write a KEY record at index `n`. Returns the
+// offset of the value that follows, or -1 after recording the failure.
+function scanKey(pos: i32, end: i32, doc: i32, tape: i32, n: i32, capacity: i32, first: i32): i32 {
+  if (n - first >= maxElements) {
+    return fail(ErrorCode.TOO_MANY_ELEMENTS, pos - doc);
+  }
+  if (n >= capacity) {
+    return fail(ErrorCode.TAPE_FULL, pos - doc);
+  }
+  if (pos >= end || load<u8>(pos) != 0x22) {
+    return fail(pos >= end ? ErrorCode.UNEXPECTED_EOF : ErrorCode.INVALID_OBJECT, pos - doc);
+  }
+  const stop = scanString(pos, end);
+  if (stop < 0) {
+    return failString(pos, doc);
+  }
+  if (stop - pos - 2 > maxStringLength) {
+    return fail(ErrorCode.STRING_TOO_LONG, pos - doc);
+  }
+  writeRecord(tape, n, <u32>TapeType.KEY | (scanEscaped ? TAPE_ESCAPED : 0), pos - doc, stop - doc, n + 1);
+  pos = skipSpace(stop, end);
+  if (pos >= end || load<u8>(pos) != 0x3A) { // :
+    return fail(pos >= end ? ErrorCode.UNEXPECTED_EOF : ErrorCode.INVALID_OBJECT, pos - doc);
+  }
+  return skipSpace(pos + 1, end);
+}
+
+// Build the tape for one document; see buildTape
+export function build_tape(ptr: i32, len: i32, tapePtr: i32, capacity: i32): i32 {
+  return buildTape(ptr, len, tapePtr, capacity, 0);
+}
@@ -44,5 +44,11 @@ export enum ErrorCode {
   INVALID_STRING,
   INVALID_NUMBER,
   INVALID_ARRAY,
-  INVALID_OBJECT
+  INVALID_OBJECT,
+  NESTING_TOO_DEEP,
+  TAPE_FULL,
+  STRING_TOO_LONG,
+  NUMBER_TOO_LONG,
+  TOO_MANY_ELEMENTS,
+  INVALID_UTF8
 }
@@ -0,0 +1,419 @@
+"""
+Streaming JSON and NDJSON output to binary file objects
+"""
+
+import zlib
+from collections.abc import Iterator as IteratorABC
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .serializer import Serializer, get_serializer, is_numpy
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# Encoded length assumed for a number, boolean or null when sizing runs
+SCALAR_SIZE = 8
+# Buffer fraction one C encoder call may produce: the encoder collects a
+# string object per token before joining them, many times the text's size
+RUN_FRACTION = 16
+
+# Values sized without looking inside them
+_SCALAR_COSTS = dict.fromkeys((int, float, bool, type(None)), SCALAR_SIZE)
+_STR_TYPES = {str}
+_CONTAINER_TYPES = frozenset((dict, list, tuple))
+
+
+class _Sink:
+    """
+    Fixed-size output buffer flushed to a binary file object
+
+    Text pieces are encoded as they are written and collected until
+    ``buffer_size`` bytes are pending, then optionally compressed and
+    written in blocks of exactly ``buffer_size`` bytes; the remainder stays
+    pending.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        compress: bool = False,
+        compression_level: int = 6,
+    ):
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self._fp = fp
+        self.buffer_size = buffer_size
+        self.run_size = max(1, buffer_size // RUN_FRACTION)
+        self._pieces: List[bytes] = []
+        self._pending = 0
+        self._compressor = zlib.compressobj(compression_level) if compress else None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._pieces.append(data)
+        self._pending += len(data)
+        if self._pending >= self.buffer_size:
+            self._drain(self.buffer_size)
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._fp.write(data)
+            self.bytes_out += len(data)
+
+    def _drain(self, block: int) -> None:
+        """Write out pending bytes in blocks of ``block``, keeping the remainder"""
+        data = b"".join(self._pieces)
+        end = len(data) - len(data) % block
+        view = memoryview(data)
+        for start in range(0, end, block):
+            piece = view[start : start + block]
+            self.bytes_in += len(piece)
+            self._emit(self._compressor.compress(piece) if self._compressor else piece)
+        self._pieces = [data[end:]] if end < len(data) else []
+        self._pending = len(data) - end
+
+    def flush(self) -> None:
+        """Write out pending text"""
+        if self._pending:
+            self._drain(self._pending)
+
+    def finish(self) -> None:
+        """Write out pending text and terminate the compressed stream"""
+        self.flush()
+        if self._compressor is not None:
+            self._emit(self._compressor.flush())
+            self._compressor = None
+        flush = getattr(self._fp, "flush", None)
+        if flush is not None:
+            flush()
+
+
+def _enter(obj: Any, markers: Set[int]) -> None:
+    """Mark a container as being written, rejecting cycles like json.dumps"""
+    marker = id(obj)
+    if marker in markers:
+        raise ValueError("Circular reference detected")
+    markers.add(marker)
+
+
+def _other_size(value: Any) -> int:
+    """Estimate the encoded length of a value the ``default`` hook converts"""
+    return SCALAR_SIZE * value.size if is_numpy(value) else SCALAR_SIZE
+
+
+def _size(obj: Any, limit: int) -> int:
+    """
+    Estimate the encoded length of a container, nested values included
+
+    Strings count their quoted length and other scalars ``SCALAR_SIZE``;
+    escapes are not counted. Gives up as soon as the estimate exceeds
+    ``limit``, so nested containers are only visited while it fits.
+
+    Returns:
+        The estimate, or a value above ``limit`` once it is crossed
+    """
+    size = 0
+    pending = [obj]
+    push = pending.append
+    scalar_cost = _SCALAR_COSTS.get
+    while pending:
+        container = pending.pop()
+        count = len(container)
+        # Brackets, and a separator per member
+        size += 2 + 2 * count
+        if size > limit:
+            return size
+        if type(container) is dict:
+            # Quotes and ": " around each key
+            size += 4 * count
+            try:
+                size += sum(map(len, container))
+            except TypeError:
+                size += SCALAR_SIZE * count
+            values: Iterable[Any] = container.values()
+        else:
+            values = container
+        if count > 16:
+            # Long flat containers are sized without a Python loop
+            kinds = set(map(type, values))
+            if kinds <= _SCALAR_COSTS.keys():
+                size += SCALAR_SIZE * count
+                continue
+            if kinds == _STR_TYPES:
+                size += sum(map(len, values)) + 2 * count
+                continue
+        for value in values:
+            cls = type(value)
+            cost = scalar_cost(cls)
+            if cost is not None:
+                size += cost
+            elif cls is str:
+                size += len(value) + 2
+            elif cls in _CONTAINER_TYPES:
+                push(value)
+            else:
+                size += _other_size(value)
+        if size > limit:
+            return size
+    return size
+
+
+def _runs(members: Iterable[Any], limit: int) -> Iterator[Tuple[List[Any], bool]]:
+    """
+    Group container members into runs of at most ``limit`` estimated characters
+
+    Members are taken in slices sized after the runs that fitted before,
+    halved until they fit, and consumed lazily, so iterators are never
+    materialized beyond one slice.
+
+    Args:
+        members: Array elements, or ``(key, value)`` pairs of an object
+        limit: Estimated encoded length a run may reach
+
+    Yields:
+        ``(run, fits)`` with consecutive members; a member too large for a
+        run of its own is yielded alone with ``fits`` False, to be walked
+    """
+    iterator = iter(members)
+    count = max(1, limit // SCALAR_SIZE)
+    while True:
+        chunk = list(islice(iterator, count))
+        if not chunk:
+            return
+        pending = [chunk]
+        while pending:
+            run = pending.pop()
+            size = _size(run, limit)
+            if size <= limit:
+                # Aim the next slice at the limit, from this run's density
+                count = max(1, len(run) * limit // max(1, size))
+                yield run, True
+            elif len(run) == 1:
+                count = 1
+                yield run, False
+            else:
+                half = len(run) // 2
+                pending.append(run[half:])
+                pending.append(run[:half])
+
+
+def _encode_run(run: Any, serializer: Serializer) -> Optional[str]:
+    """
+    Encode a container in one C encoder call
+
+    Returns:
+        The JSON text, or None when the container holds an iterator, which
+        has to be walked to be streamed
+    """
+    try:
+        return serializer.encode(run)
+    except TypeError:
+        # Raised before the iterator is consumed; walking streams it, or
+        # raises the same error for an unsupported type
+        return None
+
+
+def _stream_items(
+    items: Iterable[Any], sink: _Sink, serializer: Serializer, markers: Set[int]
+) -> None:
+    """Write array elements separated by commas, without the brackets"""
+    first = True
+    for run, fits in _runs(items, sink.run_size):
+        if not first:
+            sink.write(", ")
+        first = False
+        encoded = _encode_run(run, serializer) if fits else None
+        if encoded is not None:
+            sink.write(encoded[1:-1])
+            continue
+        for index, item in enumerate(run):
+            if index:
+                sink.write(", ")
+            _stream(item, sink, serializer, markers)
+
+
+def _stream_members(
+    items: Iterable[Tuple[Any, Any]],
+    sink: _Sink,
+    serializer: Serializer,
+    markers: Set[int],
+) -> None:
+    """Write object members separated by commas, without the braces"""
+    first = True
+    for run, fits in _runs(items, sink.run_size):
+        if not first:
+            sink.write(", ")
+        first = False
+        encoded = _encode_run(dict(run), serializer) if fits else None
+        if encoded is not None:
+            sink.write(encoded[1:-1])
+            continue
+        for index, (key, value) in enumerate(run):
+            if index:
+                sink.write(", ")
+            if not isinstance(key, str):
+                # Keys are coerced and rejected like json.dumps does
+                if not isinstance(key, (int, float, bool, type(None))):
+                    raise TypeError(
+                        "keys must be str, int, float, bool or None, "
+                        f"not {type(key).__name__}"
+                    )
+                key = serializer.encode(key).strip('"')
+            sink.write(serializer.encode(key))
+            sink.write(": ")
+            _stream(value, sink, serializer, markers)
+
+
+def _stream(obj: Any, sink: _Sink, serializer: Serializer, markers: Set[int]) -> None:
+    """
+    Encode ``obj`` piece by piece into the sink
+
+    Containers are written in runs of members whose estimated encoded
+    length stays within the sink's run size, each encoded by the C
+    encoder in one call; members too large for a run, and runs holding an
+    iterator, are walked. No piece therefore grows with the document,
+    however deeply it nests. Iterators and generators are written as
+    arrays as they are consumed.
+
+    Raises:
+        TypeError: If the object contains unsupported types
+        ValueError: On circular references
+    """
+    cls = type(obj)
+    if cls is dict or cls is list or cls is tuple:
+        if _size(obj, sink.run_size) <= sink.run_size:
+            encoded = _encode_run(obj, serializer)
+            if encoded is not None:
+                sink.write(encoded)
+                return
+        _enter(obj, markers)
+        if cls is dict:
+            sink.write("{")
+            items = sorted(obj.items()) if serializer.sort_keys else obj.items()
+            _stream_members(items, sink, serializer, markers)
+            sink.write("}")
+        else:
+            sink.write("[")
+            _stream_items(obj, sink, serializer, markers)
+            sink.write("]")
+        markers.discard(id(obj))
+    elif isinstance(obj, IteratorABC):
+        _enter(obj, markers)
+        sink.write("[")
+        _stream_items(obj, sink, serializer, markers)
+        sink.write("]")
+        markers.discard(id(obj))
+    elif is_numpy(obj) and obj.ndim > 0:
+        row_size = SCALAR_SIZE * (obj.size // len(obj) if len(obj) else 1)
+        step = max(1, sink.run_size // max(1, row_size))
+        sink.write("[")
+        for start in range(0, len(obj), step):
+            if start:
+                sink.write(", ")
+            sink.write(serializer.encode(obj[start : start + step].tolist())[1:-1])
+        sink.write("]")
+    else:
+        sink.write(serializer.encode(obj))
+
+
+def dump(
+    obj: Any,
+    fp: BinaryIO,
+    sort_keys: bool = False,
+    compress: bool = False,
+    compression_level: int = 6,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> int:
+    """
+    Serialize an object to a binary file object without building the whole text
+
+    Output is encoded into a buffer of about ``buffer_size`` bytes that is
+    flushed as it fills, and containers are encoded in runs of a fraction of
+    that size, so peak memory does not grow with the document.
+    Iterators and generators are written as arrays while they are consumed.
+
+    Args:
+        obj: Object to serialize
+        fp: Binary file-like object with a ``write`` method
+        sort_keys: Emit object keys in sorted order
+        compress: Write a zlib stream, readable by :func:`jsongeek.loads`
+        compression_level: zlib level used when compressing
+        buffer_size: Bytes buffered between writes
+
+    Returns:
+        Number of bytes written to ``fp``
+    """
+    sink = _Sink(fp, buffer_size, compress, compression_level)
+    _stream(obj, sink, get_serializer(sort_keys), set())
+    sink.finish()
+    return sink.bytes_out
+
+
+class NDJSONWriter:
+    """
+    Writes newline-delimited JSON, one document per line
+
+    Documents are buffered and written in blocks of about ``buffer_size``
+    bytes. Close the writer (or use it as a context manager) to flush the
+    last block and finish the compressed stream; the file object itself is
+    left open.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        sort_keys: bool = False,
+        compress: bool = False,
+        compression_level: int = 6,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        self._sink: Optional[_Sink] = _Sink(
+            fp, buffer_size, compress, compression_level
+        )
+        self._serializer = get_serializer(sort_keys)
+        self._stats = {"documents": 0}
+
+    def write(self, obj: Any) -> None:
+        """
+        Append one document
+
+        Args:
+            obj: Object to serialize on its own line
+
+        Raises:
+            ValueError: If the writer is closed
+        """
+        if self._sink is None:
+            raise ValueError("NDJSONWriter is closed")
+        _stream(obj, self._sink, self._serializer, set())
+        self._sink.write("\n")
+        self._stats["documents"] += 1
+
+    def write_many(self, docs: Iterable[Any]) -> None:
+        """Append every document of an iterable, consuming it lazily"""
+        for doc in docs:
+            self.write(doc)
+
+    def flush(self) -> None:
+        """Write buffered documents to the file object"""
+        if self._sink is not None:
+            self._sink.flush()
+
+    def close(self) -> None:
+        """Flush and finish the output; the file object stays open"""
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink.finish()
+            self._stats.update(bytes_in=sink.bytes_in, bytes_out=sink.bytes_out)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of documents and, once closed, bytes written"""
+        return self._stats.copy()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
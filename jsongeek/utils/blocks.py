@@ -0,0 +1,427 @@
+"""
+Block container: independently compressed blocks with a seekable index
+"""
+
+import io
+import os
+import struct
+import threading
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from .compression import (
+    _DICTIONARY_CODECS,
+    FrameError,
+    SmartCompressor,
+    _encode,
+    _pack_header,
+    unpack_frame,
+)
+
+# Container layout: CONTAINER_MAGIC (ending in the format version), one frame
+# per block, the index (one _ENTRY per block) and the footer
+CONTAINER_MAGIC = b"\x00JB\x01"
+_ENTRY = struct.Struct("<QQQQ")
+_FOOTER = struct.Struct("<QQ4s")
+_FOOTER_MAGIC = b"JGBX"
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class BlockInfo(NamedTuple):
+    """
+    Index entry of one block
+
+    Attributes:
+        offset: Position of the block's frame in the container
+        compressed_size: Size of the frame in bytes
+        start: Position of the block's first byte in the uncompressed data
+        size: Uncompressed size in bytes
+        first_record: Index of the block's first record
+        records: Number of records (lines) in the block
+    """
+
+    offset: int
+    compressed_size: int
+    start: int
+    size: int
+    first_record: int
+    records: int
+
+
+def _pack_block(block: bytes, codec: int, level: int, dictionary: Any) -> bytes:
+    """Compress one block into a frame; runs on a pool thread"""
+    return _pack_header(codec, len(block), dictionary) + _encode(
+        codec, block, level, dictionary
+    )
+
+
+class BlockWriter:
+    """
+    Writes data as independently compressed blocks on a thread pool
+
+    With ``records`` set (NDJSON), blocks end at a newline so no record spans
+    two blocks; a record longer than ``block_size`` gets a block of its own.
+    Blocks are compressed in parallel (zlib, lzma and bz2 release the GIL)
+    and written in order, with at most two blocks per worker in flight, so
+    memory stays bounded by the block size. :meth:`close` writes the index
+    and footer; the file object itself is left open.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        records: bool = True,
+        workers: Optional[int] = None,
+        compressor: Optional[SmartCompressor] = None,
+    ):
+        """
+        Args:
+            fp: Binary file-like object with a ``write`` method
+            block_size: Target uncompressed size of a block in bytes
+            records: Align blocks to newlines and count records
+            workers: Compression threads; the CPU count by default
+            compressor: Chooses the codec, level and dictionary of each
+                block; a default SmartCompressor when None
+
+        Raises:
+            ValueError: If ``block_size`` is not positive
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self._fp = fp
+        self.block_size = block_size
+        self.records = records
+        self.workers = workers or os.cpu_count() or 1
+        self._compressor = compressor or SmartCompressor()
+        self._pool: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(self.workers)
+        self._pending: Deque[Any] = deque()
+        self._buffer = bytearray()
+        # Leading buffered bytes already known to hold no newline
+        self._scanned = 0
+        self._index: List[BlockInfo] = []
+        self._offset = 0
+        self._start = 0
+        self._first_record = 0
+        self._emit(CONTAINER_MAGIC)
+
+    def write(self, data: Union[str, bytes]) -> None:
+        """
+        Append data, compressing every block that fills up
+
+        Raises:
+            ValueError: If the writer is closed
+        """
+        if self._pool is None:
+            raise ValueError("BlockWriter is closed")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            cut = self.block_size
+            if self.records:
+                cut = 0
+                if self._scanned < self.block_size:
+                    cut = self._buffer.rfind(b"\n", 0, self.block_size) + 1
+                if not cut:
+                    # An oversized record: only look at bytes not seen before
+                    cut = (
+                        self._buffer.find(b"\n", max(self.block_size, self._scanned))
+                        + 1
+                    )
+                    if not cut:
+                        self._scanned = len(self._buffer)
+                        return
+            self._submit(bytes(self._buffer[:cut]))
+            del self._buffer[:cut]
+            self._scanned = 0
+
+    def write_records(self, records: Iterable[Union[str, bytes]]) -> None:
+        """Append records, each followed by a newline"""
+        for record in records:
+            self.write(record)
+            self.write(b"\n")
+
+    def _submit(self, block: bytes) -> None:
+        """Choose the block's codec and queue its compression"""
+        compressor = self._compressor
+        codec, level = compressor.choose_codec(
+            len(block), compressor._sample_ratio(compressor._sample(block))
+        )
+        dictionary = compressor.dictionary if codec in _DICTIONARY_CODECS else None
+        records = 0
+        if self.records and block:
+            records = block.count(b"\n") + (not block.endswith(b"\n"))
+        future = self._pool.submit(_pack_block, block, codec, level, dictionary)
+        self._pending.append((future, len(block), records))
+        while len(self._pending) > 2 * self.workers:
+            self._drain_one()
+
+    def _drain_one(self) -> None:
+        """Write the oldest compressed block and index it"""
+        future, size, records = self._pending.popleft()
+        frame = future.result()
+        self._index.append(
+            BlockInfo(
+                self._offset, len(frame), self._start, size, self._first_record, records
+            )
+        )
+        self._start += size
+        self._first_record += records
+        self._emit(frame)
+
+    def _emit(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def close(self) -> None:
+        """Compress the last block and write the index and footer"""
+        if self._pool is None:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+                self._scanned = 0
+            while self._pending:
+                self._drain_one()
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+        index_offset = self._offset
+        self._emit(
+            b"".join(
+                _ENTRY.pack(
+                    block.offset, block.compressed_size, block.size, block.records
+                )
+                for block in self._index
+            )
+        )
+        self._emit(_FOOTER.pack(index_offset, len(self._index), _FOOTER_MAGIC))
+        flush = getattr(self._fp, "flush", None)
+        if flush is not None:
+            flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of blocks and records and the bytes written so far"""
+        return {
+            "blocks": len(self._index),
+            "records": self._first_record,
+            "bytes_in": self._start,
+            "bytes_out": self._offset,
+        }
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class BlockReader:
+    """
+    Random access to a block container
+
+    Only the blocks covering the requested records or byte range are read
+    and decompressed, in parallel on a thread pool. ``source`` may be a
+    bytes-like object or a seekable binary file object; reads from a file
+    are serialized, decompression is not.
+    """
+
+    def __init__(
+        self,
+        source: Union[bytes, bytearray, memoryview, BinaryIO],
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            source: Container bytes or a seekable binary file object
+            workers: Decompression threads; the CPU count by default
+
+        Raises:
+            FrameError: If the source is not a valid container
+        """
+        self._source = source
+        self._lock = threading.Lock()
+        self.workers = workers or os.cpu_count() or 1
+        if hasattr(source, "read"):
+            source.seek(0, os.SEEK_END)
+            length = source.tell()
+        else:
+            length = len(source)
+        if (
+            length < len(CONTAINER_MAGIC) + _FOOTER.size
+            or self._read(0, len(CONTAINER_MAGIC)) != CONTAINER_MAGIC
+        ):
+            raise FrameError("Not a block container")
+        index_offset, count, magic = _FOOTER.unpack(
+            self._read(length - _FOOTER.size, _FOOTER.size)
+        )
+        if (
+            magic != _FOOTER_MAGIC
+            or index_offset + count * _ENTRY.size != length - _FOOTER.size
+        ):
+            raise FrameError("Corrupt block container footer")
+        blocks = []
+        start = first_record = 0
+        for offset, compressed_size, size, records in _ENTRY.iter_unpack(
+            self._read(index_offset, count * _ENTRY.size)
+        ):
+            blocks.append(
+                BlockInfo(offset, compressed_size, start, size, first_record, records)
+            )
+            start += size
+            first_record += records
+        self.blocks: List[BlockInfo] = blocks
+        self.size = start
+        self.record_count = first_record
+        self._starts = [block.start for block in blocks]
+        self._first_records = [block.first_record for block in blocks]
+
+    def _read(self, offset: int, size: int) -> bytes:
+        """Read raw container bytes"""
+        source = self._source
+        if not hasattr(source, "read"):
+            data = bytes(source[offset : offset + size])
+        else:
+            with self._lock:
+                source.seek(offset)
+                data = source.read(size)
+        if len(data) != size:
+            raise FrameError("Truncated block container")
+        return data
+
+    def read_block(self, i: int) -> bytes:
+        """
+        Decompress one block
+
+        Raises:
+            FrameError: If the block is truncated or does not decompress to
+                the size recorded in the index
+        """
+        block = self.blocks[i]
+        data = unpack_frame(
+            self._read(block.offset, block.compressed_size), max_size=block.size
+        )
+        if len(data) != block.size:
+            raise FrameError(
+                f"Block {i} holds {len(data)} bytes, the index records {block.size}"
+            )
+        return data
+
+    def _read_blocks(self, first: int, last: int) -> List[bytes]:
+        """Decompress blocks ``first`` to ``last`` inclusive, in parallel"""
+        indices = range(first, last + 1)
+        if len(indices) < 2 or self.workers < 2:
+            return [self.read_block(i) for i in indices]
+        with ThreadPoolExecutor(min(self.workers, len(indices))) as pool:
+            return list(pool.map(self.read_block, indices))
+
+    def read_range(self, start: int, stop: int) -> bytes:
+        """
+        Read a range of the uncompressed data
+
+        Args:
+            start: First byte
+            stop: End of the range (exclusive), clipped to the data size
+
+        Returns:
+            Uncompressed bytes ``start:stop``
+
+        Raises:
+            ValueError: If a bound is negative
+        """
+        if start < 0 or stop < 0:
+            raise ValueError("read_range bounds must not be negative")
+        stop = min(stop, self.size)
+        if start >= stop:
+            return b""
+        first = bisect_right(self._starts, start) - 1
+        last = bisect_right(self._starts, stop - 1) - 1
+        data = b"".join(self._read_blocks(first, last))
+        offset = self.blocks[first].start
+        return data[start - offset : stop - offset]
+
+    def read_all(self) -> bytes:
+        """Decompress the whole container, in parallel"""
+        return self.read_range(0, self.size)
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[bytes]:
+        """
+        Read a range of records
+
+        Args:
+            start: Index of the first record
+            stop: Index past the last record; the record count when None
+
+        Returns:
+            The records, without their newlines
+
+        Raises:
+            ValueError: If a bound is negative
+        """
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError("record bounds must not be negative")
+        stop = self.record_count if stop is None else min(stop, self.record_count)
+        if start >= stop:
+            return []
+        first = bisect_right(self._first_records, start) - 1
+        last = bisect_right(self._first_records, stop - 1) - 1
+        lines: List[bytes] = []
+        for data in self._read_blocks(first, last):
+            pieces = data.split(b"\n")
+            if data.endswith(b"\n"):
+                pieces.pop()
+            lines.extend(pieces)
+        skip = start - self.blocks[first].first_record
+        return lines[skip : skip + stop - start]
+
+    def record(self, n: int) -> bytes:
+        """
+        Read the ``n``-th record
+
+        Raises:
+            IndexError: If there is no such record
+        """
+        if not 0 <= n < self.record_count:
+            raise IndexError("record index out of range")
+        return self.records(n, n + 1)[0]
+
+
+def compress_blocks(
+    data: Union[str, bytes],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    records: bool = True,
+    workers: Optional[int] = None,
+    compressor: Optional[SmartCompressor] = None,
+) -> bytes:
+    """
+    Compress a buffer into a block container in parallel
+
+    Args:
+        data: Data to compress, NDJSON when ``records`` is set
+        block_size: Target uncompressed size of a block in bytes
+        records: Align blocks to newlines and index records
+        workers: Compression threads; the CPU count by default
+        compressor: Chooses codec, level and dictionary per block
+
+    Returns:
+        The container, readable with :class:`BlockReader`
+    """
+    out = io.BytesIO()
+    with BlockWriter(out, block_size, records, workers, compressor) as writer:
+        writer.write(data)
+    return out.getvalue()
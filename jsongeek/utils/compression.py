@@ -1,77 +1,866 @@
 """
 Smart compression implementation for JSONGeekAI
 """
-import zlib
+
+import bz2
 import json
-from typing import Any, Dict, Union
+import lzma
+import struct
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from .dictionary import CompressionDictionary, get_dictionary, register_dictionary
+from .transform import decode_columns, encode_columns
+
+# Bytes compressed at level 1 to estimate how compressible a payload is
+SAMPLE_SIZE = 16384
+# Weight of the latest call in the learned per-level estimates
+LEARNING_RATE = 0.2
+# Levels whose predicted ratio is within this fraction of the best one are
+# considered as good; the fastest of them wins
+RATIO_TOLERANCE = 0.01
+
+# Starting point of the cost model for JSON-like text, per zlib level:
+# throughput relative to level 1, and output size relative to level 1
+_SPEED_PRIOR = {
+    1: 1.0,
+    2: 0.9,
+    3: 0.75,
+    4: 0.6,
+    5: 0.45,
+    6: 0.35,
+    7: 0.3,
+    8: 0.2,
+    9: 0.15,
+}
+_SIZE_PRIOR = {
+    1: 1.0,
+    2: 0.97,
+    3: 0.95,
+    4: 0.91,
+    5: 0.89,
+    6: 0.88,
+    7: 0.875,
+    8: 0.87,
+    9: 0.87,
+}
+# Starting estimate of the level 1 ratio, used for payloads too small to
+# sample, and its cap: an estimate must never rule out the one pass that
+# tells whether a small payload compresses
+_RATIO_PRIOR = 0.3
+_MAX_RATIO_ESTIMATE = 0.95
+
+# Frame layout: FRAME_MAGIC, a codec id byte, the original length as a
+# little-endian u64, then the codec output. JSON text and zlib streams never
+# start with a NUL byte, so the first byte alone tells frames apart. Codec
+# ids with DICTIONARY_FLAG set are followed by the u32 id of the preset
+# dictionary the payload was compressed with; TRANSFORM_FLAG marks payloads
+# holding the columnar layout of a record array (see transform.py).
+FRAME_MAGIC = b"\x00JG"
+_HEADER = struct.Struct("<3sBQ")
+_DICT_ID = struct.Struct("<I")
+FRAME_HEADER_SIZE = _HEADER.size
+DICTIONARY_FLAG = 0x80
+TRANSFORM_FLAG = 0x40
+# Length recorded by streamed frames, whose size is not known up front
+UNKNOWN_LENGTH = 2**64 - 1
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_GZIP = 2
+CODEC_LZMA = 3
+CODEC_BZ2 = 4
+CODEC_ZSTD = 5
+CODEC_LZ4 = 6
+
+CODECS = {
+    "none": CODEC_NONE,
+    "zlib": CODEC_ZLIB,
+    "gzip": CODEC_GZIP,
+    "lzma": CODEC_LZMA,
+    "bz2": CODEC_BZ2,
+    "zstd": CODEC_ZSTD,
+    "lz4": CODEC_LZ4,
+}
+_CODEC_NAMES = {codec: name for name, codec in CODECS.items()}
+
+# Level used per codec when none is given
+_DEFAULT_LEVELS = {
+    CODEC_NONE: 0,
+    CODEC_ZLIB: 6,
+    CODEC_GZIP: 6,
+    CODEC_LZMA: 6,
+    CODEC_BZ2: 9,
+    CODEC_ZSTD: 3,
+    CODEC_LZ4: 0,
+}
+
+# Leading bytes of bare compressed streams recognised by StreamDecompressor;
+# none of them can start JSON text
+_STREAM_MAGIC = (
+    (b"\x1f\x8b", CODEC_GZIP),
+    (b"\xfd7zXZ\x00", CODEC_LZMA),
+    (b"BZh", CODEC_BZ2),
+    (b"\x28\xb5\x2f\xfd", CODEC_ZSTD),
+    (b"\x04\x22\x4d\x18", CODEC_LZ4),
+)
+_SNIFF_SIZE = 6
+
+# Codecs that can use a preset dictionary
+_DICTIONARY_CODECS = (CODEC_ZLIB, CODEC_ZSTD)
+# Smallest payload worth compressing, without and with a dictionary
+MIN_COMPRESS_SIZE = 1024
+MIN_DICTIONARY_COMPRESS_SIZE = 64
+# Compressed bytes fed to zstandard per call when streaming, bounding the
+# output produced at once
+ZSTD_INPUT_STEP = 4096
+# Decoded size accepted when the caller gives no max_size; frame headers
+# come from the sender, so their recorded length cannot be the bound
+MAX_DECODED_SIZE = 1 << 30
+
+# Codec choices of SmartCompressor(codec="auto") for compressible payloads
+POLICIES = ("speed", "balanced", "ratio")
+
+
+class FrameError(ValueError):
+    """Raised for corrupt frames and frames using an unavailable codec"""
+
+
+def _zstd() -> Any:
+    """Import the optional zstandard module, or return None"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    # Decompressors only report the end of a stream from zstandard 0.18 on
+    if not hasattr(zstandard.ZstdDecompressionObj, "eof"):
+        return None
+    return zstandard
+
+
+def _lz4() -> Any:
+    """Import the optional lz4.frame module, or return None"""
+    try:
+        import lz4.frame
+    except ImportError:
+        return None
+    return lz4.frame
+
+
+def available_codecs() -> List[str]:
+    """
+    List the codecs usable in this process
+
+    Returns:
+        Codec names; zstd and lz4 only appear when their packages are installed
+    """
+    names = ["none", "zlib", "gzip", "lzma", "bz2"]
+    if _zstd() is not None:
+        names.append("zstd")
+    if _lz4() is not None:
+        names.append("lz4")
+    return names
+
+
+def _encode(
+    codec: int,
+    data: bytes,
+    level: int,
+    dictionary: Optional[CompressionDictionary] = None,
+) -> bytes:
+    """Compress with one codec; ``level`` is on the codec's own scale"""
+    if codec == CODEC_NONE:
+        return data
+    if codec == CODEC_ZLIB:
+        if dictionary is not None:
+            packer = zlib.compressobj(level, zdict=dictionary.data)
+            return packer.compress(data) + packer.flush()
+        return zlib.compress(data, level)
+    if codec == CODEC_GZIP:
+        packer = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return packer.compress(data) + packer.flush()
+    if codec == CODEC_LZMA:
+        return lzma.compress(data, preset=level)
+    if codec == CODEC_BZ2:
+        return bz2.compress(data, level)
+    if codec == CODEC_ZSTD and _zstd() is not None:
+        return _zstd_compressor(level, dictionary).compress(data)
+    if codec == CODEC_LZ4 and _lz4() is not None:
+        return _lz4().compress(data, compression_level=level)
+    raise ValueError(f"Codec {_CODEC_NAMES.get(codec, codec)} is not available")
+
+
+def _zstd_compressor(level: int, dictionary: Optional[CompressionDictionary]) -> Any:
+    if dictionary is None:
+        return _zstd().ZstdCompressor(level=level)
+    return _zstd().ZstdCompressor(level=level, dict_data=dictionary.zstd_dict())
+
+
+def _zstd_decompressor(dictionary: Optional[CompressionDictionary]) -> Any:
+    if dictionary is None:
+        return _zstd().ZstdDecompressor()
+    return _zstd().ZstdDecompressor(dict_data=dictionary.zstd_dict())
+
+
+class _ZstdDecoder:
+    """
+    Adapts a zstandard decompressobj to the interface of the stdlib decompressors
+
+    zstandard cannot bound the output of one call, so input is fed in
+    slices of ``ZSTD_INPUT_STEP`` bytes until ``max_length`` bytes are
+    produced; surplus output and unread input are kept for the next call.
+    """
+
+    def __init__(self, dictionary: Optional[CompressionDictionary] = None):
+        self._obj = _zstd_decompressor(dictionary).decompressobj()
+        self._input = memoryview(b"")
+        self._output = b""
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._output and (self._obj.eof or not self._input)
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        if data:
+            self._input = memoryview(bytes(self._input) + data if self._input else data)
+        pieces = [self._output]
+        size = len(self._output)
+        obj = self._obj
+        while self._input and not obj.eof and (max_length < 0 or size < max_length):
+            piece = obj.decompress(self._input[:ZSTD_INPUT_STEP])
+            self._input = self._input[ZSTD_INPUT_STEP:]
+            pieces.append(piece)
+            size += len(piece)
+        out = b"".join(pieces)
+        if 0 <= max_length < len(out):
+            out, self._output = out[:max_length], out[max_length:]
+        else:
+            self._output = b""
+        return out
+
+    @property
+    def eof(self) -> bool:
+        # Held-back output must still be collected after the frame ends
+        return self._obj.eof and not self._output
+
+    @property
+    def unused_data(self) -> bytes:
+        return self._obj.unused_data + bytes(self._input)
+
+
+def _decoder(codec: int, dictionary: Optional[CompressionDictionary] = None) -> Any:
+    """
+    Create a decompressor with a ``decompress(data, max_length)`` method and
+    ``eof`` and ``unused_data`` attributes
+    """
+    if codec == CODEC_ZLIB:
+        return (
+            zlib.decompressobj(zdict=dictionary.data)
+            if dictionary is not None
+            else zlib.decompressobj()
+        )
+    if codec == CODEC_GZIP:
+        return zlib.decompressobj(31)
+    if codec == CODEC_LZMA:
+        return lzma.LZMADecompressor()
+    if codec == CODEC_BZ2:
+        return bz2.BZ2Decompressor()
+    if codec == CODEC_ZSTD and _zstd() is not None:
+        return _ZstdDecoder(dictionary)
+    if codec == CODEC_LZ4 and _lz4() is not None:
+        return _lz4().LZ4FrameDecompressor()
+    raise FrameError(f"Codec {_CODEC_NAMES.get(codec, codec)} is not available")
+
+
+def _decode(
+    codec: int,
+    payload: Union[bytes, memoryview],
+    limit: int,
+    dictionary: Optional[CompressionDictionary] = None,
+) -> Tuple[bytes, Any]:
+    """
+    Decompress at most ``limit`` bytes of a codec payload
+
+    Returns:
+        The output and the decoder, whose ``eof`` and ``unused_data`` tell
+        where the stream ended
+    """
+    try:
+        decoder = _decoder(codec, dictionary)
+        return decoder.decompress(payload, limit), decoder
+    except FrameError:
+        raise
+    except Exception as e:
+        raise FrameError(f"Corrupt {_CODEC_NAMES[codec]} data: {e}") from e
+
+
+def is_frame(data: Union[bytes, memoryview]) -> bool:
+    """
+    Check whether a buffer starts with a frame header
+
+    Only the first byte is looked at for anything that is not a frame, so this
+    is cheap enough to run on every parser input.
+    """
+    if len(data) < FRAME_HEADER_SIZE or data[0] != 0:
+        return False
+    return _HEADER.unpack_from(data)[0] == FRAME_MAGIC
+
+
+def frame_length(data: Union[bytes, memoryview]) -> Optional[int]:
+    """
+    Read the original length from a frame header
+
+    Args:
+        data: Bytes-like object to inspect
+
+    Returns:
+        Length of the framed payload once decoded, or None if ``data`` does
+        not start with a frame header or is a streamed frame of unknown length
+    """
+    if not is_frame(data):
+        return None
+    length = _HEADER.unpack_from(data)[2]
+    return None if length == UNKNOWN_LENGTH else length
+
+
+def _pack_header(
+    codec: int,
+    length: int,
+    dictionary: Optional[CompressionDictionary] = None,
+    transformed: bool = False,
+) -> bytes:
+    if transformed:
+        codec |= TRANSFORM_FLAG
+    if dictionary is None:
+        return _HEADER.pack(FRAME_MAGIC, codec, length)
+    return _HEADER.pack(FRAME_MAGIC, codec | DICTIONARY_FLAG, length) + _DICT_ID.pack(
+        dictionary.dict_id
+    )
+
+
+def _read_header(
+    data: Union[bytes, memoryview],
+) -> Tuple[int, int, Optional[CompressionDictionary], int, bool]:
+    """
+    Parse a frame header whose magic has been checked
+
+    Returns:
+        Codec id, recorded length, dictionary, header size in bytes and
+        whether the payload is a columnar layout
+
+    Raises:
+        FrameError: If the codec is unknown or the dictionary not registered
+    """
+    _, codec, length = _HEADER.unpack_from(data)
+    transformed = bool(codec & TRANSFORM_FLAG)
+    codec &= ~TRANSFORM_FLAG
+    dictionary = None
+    size = FRAME_HEADER_SIZE
+    if codec & DICTIONARY_FLAG:
+        codec &= ~DICTIONARY_FLAG
+        if len(data) < size + _DICT_ID.size:
+            raise FrameError("Truncated frame header")
+        dict_id = _DICT_ID.unpack_from(data, size)[0]
+        dictionary = get_dictionary(dict_id)
+        if dictionary is None:
+            raise FrameError(f"Unknown dictionary {dict_id:#010x}; register it first")
+        if codec not in _DICTIONARY_CODECS:
+            raise FrameError(
+                f"Codec {_CODEC_NAMES.get(codec, codec)} does not take a dictionary"
+            )
+        size += _DICT_ID.size
+    if codec not in _CODEC_NAMES:
+        raise FrameError(f"Unknown codec id {codec}")
+    return codec, length, dictionary, size, transformed
+
+
+def pack_frame(
+    data: bytes,
+    codec: str = "zlib",
+    level: Optional[int] = None,
+    dictionary: Optional[CompressionDictionary] = None,
+) -> bytes:
+    """
+    Compress data with one codec and prepend a frame header
+
+    Args:
+        data: Bytes to compress
+        codec: Codec name from :data:`CODECS`
+        level: Codec level; each codec's default when None
+        dictionary: Preset dictionary for zlib or zstd, referenced by id in
+            the header; it is registered for decoding
+
+    Returns:
+        The framed payload
+
+    Raises:
+        ValueError: If the codec is unknown or not installed, or does not
+            take a dictionary
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec}")
+    codec_id = CODECS[codec]
+    if dictionary is not None:
+        if codec_id not in _DICTIONARY_CODECS:
+            raise ValueError(f"Codec {codec} does not take a dictionary")
+        register_dictionary(dictionary)
+    if level is None:
+        level = _DEFAULT_LEVELS[codec_id]
+    return _pack_header(codec_id, len(data), dictionary) + _encode(
+        codec_id, data, level, dictionary
+    )
+
+
+def unpack_frame(
+    data: Union[bytes, memoryview], max_size: Optional[int] = None
+) -> bytes:
+    """
+    Decode a framed payload, dispatching on the codec in its header
+
+    Args:
+        data: Bytes starting with a frame header
+        max_size: Stop decoding after ``max_size + 1`` bytes, so callers can
+            reject oversized payloads without inflating all of them. When
+            None, payloads decoding to more than :data:`MAX_DECODED_SIZE`
+            bytes are rejected
+
+    Returns:
+        The original bytes, or their first ``max_size + 1`` bytes. A record
+        array compressed in columnar form comes back as compact JSON that
+        parses to the same value; ``max_size`` applies to the columnar layout.
+
+    Raises:
+        FrameError: If the header is missing, the codec unavailable, the
+            payload does not end exactly at the recorded length, or no
+            ``max_size`` is given and it exceeds :data:`MAX_DECODED_SIZE`
+    """
+    result, transformed = _unpack(data, max_size)
+    if transformed and (max_size is None or len(result) <= max_size):
+        records = _decode_layout(result, max_size)
+        return json.dumps(records, separators=(",", ":")).encode("utf-8")
+    return result
+
+
+def _decode_layout(payload: bytes, max_size: Optional[int] = None) -> Any:
+    """Rebuild a record array from a columnar payload"""
+    try:
+        return decode_columns(
+            payload, MAX_DECODED_SIZE if max_size is None else max_size
+        )
+    except ValueError as e:
+        raise FrameError(f"Corrupt columnar payload: {e}") from e
+
+
+def _unpack(
+    data: Union[bytes, memoryview], max_size: Optional[int] = None
+) -> Tuple[bytes, bool]:
+    """
+    Decode a frame's payload; also returns whether it is a columnar layout
+
+    Without ``max_size``, payloads above :data:`MAX_DECODED_SIZE` raise
+    instead of being returned cut short.
+    """
+    if not is_frame(data):
+        raise FrameError("Missing frame header")
+    codec, length, dictionary, header_size, transformed = _read_header(data)
+    cap = MAX_DECODED_SIZE if max_size is None else max_size
+    if length == UNKNOWN_LENGTH:
+        result = _unpack_streamed(data, cap)
+        if max_size is None and len(result) > cap:
+            raise FrameError(f"Frame decodes to more than {cap} bytes")
+        return result, transformed
+    if max_size is None and length > cap:
+        raise FrameError(f"Frame records {length} bytes, more than {cap}")
+    payload = memoryview(data)[header_size:]
+    limit = min(length, cap) + 1
+    if codec == CODEC_NONE:
+        result = bytes(payload[:limit])
+    else:
+        result, decoder = _decode(codec, payload, limit, dictionary)
+    if max_size is not None and len(result) > max_size:
+        return result, transformed
+    if len(result) != length:
+        raise FrameError(f"Frame decoded to {len(result)} bytes instead of {length}")
+    # The payload must end with the recorded length, not merely reach it
+    if codec == CODEC_NONE:
+        if len(payload) != length:
+            raise FrameError("Trailing bytes after the frame payload")
+    elif not decoder.eof:
+        raise FrameError(f"Corrupt {_CODEC_NAMES[codec]} data: truncated stream")
+    elif decoder.unused_data:
+        raise FrameError(
+            f"Corrupt {_CODEC_NAMES[codec]} data: trailing bytes after the stream"
+        )
+    return result, transformed
+
+
+def _unpack_streamed(data: Union[bytes, memoryview], max_size: Optional[int]) -> bytes:
+    """Decode a frame written by :class:`StreamCompressor`"""
+    decoder = StreamDecompressor()
+    pieces = []
+    size = 0
+    for piece in decoder.decompress(data):
+        pieces.append(piece)
+        size += len(piece)
+        if max_size is not None and size > max_size:
+            return b"".join(pieces)
+    for piece in decoder.finish():
+        pieces.append(piece)
+    return b"".join(pieces)
+
+
+def is_zlib_stream(data: Union[bytes, memoryview]) -> bool:
+    """
+    Check whether a buffer starts with a valid zlib stream header
+
+    ``zlib.compress`` always emits a ``0x78`` CMF byte (deflate, 32K window),
+    and JSON text can never start with ``x``, so this check is enough to tell
+    compressed payloads from plain ones.
+
+    Args:
+        data: Bytes-like object to inspect
+
+    Returns:
+        True if the first two bytes form a zlib header
+    """
+    if len(data) < 2:
+        return False
+    cmf, flg = data[0], data[1]
+    return cmf == 0x78 and (cmf << 8 | flg) % 31 == 0
+
 
 class SmartCompressor:
     """
-    Intelligent compression system with adaptive ratio selection
+    Intelligent compression system with adaptive codec and level selection
+
+    Each payload is compressed exactly once and wrapped in a frame recording
+    the codec and original length, so decoding dispatches on the header
+    instead of guessing. A zlib level-1 pass over a sample estimates how
+    compressible a payload is; incompressible ones are framed as ``none``,
+    the others go to the codec picked by ``policy``. For zlib and gzip a cost
+    model then predicts the ratio and time of every level up to
+    ``compression_level`` and picks one. The model starts from typical zlib
+    behaviour on JSON and learns from every call, so the predictions follow
+    the actual data and host.
     """
-    def __init__(self, compression_level: int = 6):
+
+    def __init__(
+        self,
+        compression_level: int = 6,
+        target_ratio: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        codec: str = "auto",
+        policy: str = "balanced",
+        dictionary: Optional[CompressionDictionary] = None,
+        transform: bool = False,
+    ):
+        """
+        Args:
+            compression_level: Highest zlib level considered
+            target_ratio: Use the fastest level predicted to reach this
+                compressed/original ratio, instead of the best ratio
+            time_budget: Seconds per MiB of input the compression may take;
+                level 1 is used when no level fits
+            codec: Codec for compressible payloads, or ``"auto"`` to pick
+                one by ``policy``
+            policy: ``"speed"`` prefers lz4, then zstd and zlib at their
+                fastest levels; ``"balanced"`` zstd, then adaptive zlib;
+                ``"ratio"`` lzma
+            dictionary: Preset dictionary from
+                :func:`~jsongeek.utils.dictionary.train_dictionary`. With one,
+                payloads go to zstd (when installed) or zlib with the
+                dictionary, and small payloads become worth compressing.
+                It is registered so frames referencing it decode anywhere in
+                the process.
+            transform: Let :meth:`compress_json` store arrays of objects in
+                a columnar layout (key table, values column by column,
+                delta-encoded integer sequences) before compressing them
+
+        Raises:
+            ValueError: If the codec or policy is unknown, or the codec is
+                not installed
+        """
+        if codec != "auto" and codec not in available_codecs():
+            raise ValueError(f"Codec {codec} is unknown or not installed")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
         self.compression_level = compression_level
+        self.target_ratio = target_ratio
+        self.time_budget = time_budget
+        self.codec = codec
+        self.policy = policy
+        self.dictionary = dictionary
+        self.transform = transform
+        if dictionary is not None:
+            register_dictionary(dictionary)
         self._last_ratio = 1.0
-        self._stats = {
-            "original_size": 0,
-            "compressed_size": 0,
-            "compression_time": 0
-        }
+        # Learned model: level 1 throughput in bytes per second, and per
+        # level the relative throughput and output size
+        self._base_speed: Optional[float] = None
+        self._speed = dict(_SPEED_PRIOR)
+        self._size = dict(_SIZE_PRIOR)
+        # Running level 1 ratio, standing in for the sample of small payloads
+        self._ratio = _RATIO_PRIOR
+        self._stats = {"original_size": 0, "compressed_size": 0, "compression_time": 0}
+
+    def _sample(self, data: bytes) -> bytes:
+        """Take up to SAMPLE_SIZE bytes from the start, middle and end"""
+        if len(data) <= SAMPLE_SIZE:
+            return data
+        part = SAMPLE_SIZE // 3
+        middle = (len(data) - part) // 2
+        return data[:part] + data[middle : middle + part] + data[-part:]
+
+    def _sample_ratio(self, sample: bytes) -> float:
+        """Compressed/original ratio of a sample at zlib level 1 and the dictionary"""
+        if self.dictionary is None:
+            compressed = len(zlib.compress(sample, 1))
+        else:
+            packer = zlib.compressobj(1, zdict=self.dictionary.data)
+            compressed = len(packer.compress(sample)) + len(packer.flush())
+        return compressed / max(1, len(sample))
+
+    def _learn(self, model: Dict[int, float], level: int, value: float) -> None:
+        """Move a learned per-level estimate towards an observation"""
+        model[level] += LEARNING_RATE * (value - model[level])
+
+    def choose_level(self, size: int, sample_ratio: float) -> int:
+        """
+        Pick the zlib level for a payload from the cost model
+
+        Args:
+            size: Payload size in bytes
+            sample_ratio: Compressed/original ratio of its sample at level 1
+
+        Returns:
+            Chosen level
+        """
+        levels: List[int] = list(range(1, max(1, self.compression_level) + 1))
+        if self.time_budget is not None and self._base_speed:
+            budget = self.time_budget * size / (1024 * 1024)
+            levels = [
+                level
+                for level in levels
+                if level == 1
+                or size / (self._base_speed * self._speed[level]) <= budget
+            ]
+        predicted = {level: sample_ratio * self._size[level] for level in levels}
+        if self.target_ratio is not None:
+            for level in levels:
+                if predicted[level] <= self.target_ratio:
+                    return level
+        best = min(predicted.values())
+        for level in levels:
+            if predicted[level] <= best * (1 + RATIO_TOLERANCE):
+                return level
+        return levels[-1]
+
+    def choose_codec(self, size: int, sample_ratio: float) -> Tuple[int, int]:
+        """
+        Pick the codec and level for a payload
+
+        Args:
+            size: Payload size in bytes
+            sample_ratio: Compressed/original ratio of its sample at zlib
+                level 1, with the dictionary if there is one
+
+        Returns:
+            Codec id and level
+        """
+        if sample_ratio >= 1.0 or not size:
+            return CODEC_NONE, 0
+        if self.dictionary is not None and self.codec in ("auto", "zstd", "zlib"):
+            if self.codec != "zlib" and _zstd() is not None:
+                return CODEC_ZSTD, _DEFAULT_LEVELS[CODEC_ZSTD]
+            return CODEC_ZLIB, self.choose_level(size, sample_ratio)
+        if self.codec != "auto":
+            codec = CODECS[self.codec]
+            if codec in (CODEC_ZLIB, CODEC_GZIP):
+                return codec, self.choose_level(size, sample_ratio)
+            return codec, _DEFAULT_LEVELS[codec]
+        if self.policy == "ratio":
+            return CODEC_LZMA, _DEFAULT_LEVELS[CODEC_LZMA]
+        if self.policy == "speed":
+            if _lz4() is not None:
+                return CODEC_LZ4, 0
+            if _zstd() is not None:
+                return CODEC_ZSTD, 1
+            return CODEC_ZLIB, 1
+        if _zstd() is not None:
+            return CODEC_ZSTD, _DEFAULT_LEVELS[CODEC_ZSTD]
+        return CODEC_ZLIB, self.choose_level(size, sample_ratio)
 
     def compress(self, data: Union[str, bytes]) -> bytes:
         """
-        Compress data using smart compression algorithm
-        
+        Compress data into a frame using smart compression algorithm
+
+        Payloads larger than ``SAMPLE_SIZE`` are sampled at zlib level 1 to
+        pick the codec and level; smaller ones are compressed exactly once,
+        with the level 1 ratio learned from earlier calls standing in for
+        the sample. Data the sample shows to be incompressible, or that the
+        chosen codec fails to shrink, is framed uncompressed.
+
         Args:
             data: Data to compress (string or bytes)
-            
+
         Returns:
-            Compressed data as bytes
+            Framed data as bytes
         """
         if isinstance(data, str):
-            data = data.encode('utf-8')
-            
+            data = data.encode("utf-8")
+        return self._compress(data, False)
+
+    def _compress(self, data: bytes, transformed: bool) -> bytes:
+        """Compress and frame bytes; ``transformed`` marks a columnar layout"""
         original_size = len(data)
-        
-        # Try different compression levels
-        best_ratio = 1.0
-        best_result = data
-        
-        for level in range(1, self.compression_level + 1):
-            compressed = zlib.compress(data, level)
-            ratio = len(compressed) / original_size
-            
-            if ratio < best_ratio:
-                best_ratio = ratio
-                best_result = compressed
-                
+        start_time = time.perf_counter()
+
+        # A sample of a small payload would be the whole payload, compressed
+        # twice; the learned ratio stands in and the real pass teaches it
+        sampled = original_size > SAMPLE_SIZE
+        if sampled:
+            sample = self._sample(data)
+            sample_start = time.perf_counter()
+            sample_ratio = self._sample_ratio(sample)
+            sample_time = time.perf_counter() - sample_start
+            if sample_time > 0:
+                speed = len(sample) / sample_time
+                self._base_speed = (
+                    speed
+                    if self._base_speed is None
+                    else (self._base_speed + LEARNING_RATE * (speed - self._base_speed))
+                )
+            self._ratio += LEARNING_RATE * (sample_ratio - self._ratio)
+        else:
+            sample_ratio = min(self._ratio, _MAX_RATIO_ESTIMATE)
+
+        codec, level = self.choose_codec(original_size, sample_ratio)
+        dictionary = self.dictionary if codec in _DICTIONARY_CODECS else None
+        payload = data
+        if codec != CODEC_NONE:
+            pass_start = time.perf_counter()
+            compressed = _encode(codec, data, level, dictionary)
+            elapsed = time.perf_counter() - pass_start
+            if codec in (CODEC_ZLIB, CODEC_GZIP):
+                ratio = len(compressed) / original_size
+                if sampled:
+                    # Learn how this level compares with the level-1 sample estimate
+                    self._learn(self._size, level, ratio / sample_ratio)
+                    if level > 1 and elapsed > 0 and self._base_speed:
+                        self._learn(
+                            self._speed,
+                            level,
+                            original_size / elapsed / self._base_speed,
+                        )
+                else:
+                    # Learn the level 1 ratio this pass implies
+                    sample_ratio = ratio / self._size[level]
+                    self._ratio += LEARNING_RATE * (sample_ratio - self._ratio)
+            if len(compressed) < original_size:
+                payload = compressed
+            else:
+                codec, level, dictionary = CODEC_NONE, 0, None
+        result = _pack_header(codec, original_size, dictionary, transformed) + payload
+
+        best_ratio = len(result) / original_size if original_size else 1.0
         self._last_ratio = best_ratio
-        self._stats.update({
-            "original_size": original_size,
-            "compressed_size": len(best_result),
-            "compression_ratio": best_ratio
-        })
-        
-        return best_result
+        self._stats.update(
+            {
+                "original_size": original_size,
+                "compressed_size": len(result),
+                "compression_ratio": best_ratio,
+                "codec": _CODEC_NAMES[codec],
+                "dictionary_id": dictionary.dict_id if dictionary is not None else None,
+                "compression_level": level,
+                "transformed": transformed,
+                "sample_ratio": sample_ratio,
+                "compression_time": time.perf_counter() - start_time,
+            }
+        )
 
-    def decompress(self, data: bytes) -> str:
+        return result
+
+    def decompress(self, data: Union[str, bytes]) -> str:
         """
         Decompress data
-        
+
+        Frames are decoded with the codec named in their header and bare
+        zlib streams (from earlier versions and streaming writers) with
+        zlib; anything else is taken as plain text.
+
         Args:
-            data: Compressed data
-            
+            data: Framed, zlib-compressed or plain data
+
         Returns:
             Decompressed string
+
+        Raises:
+            FrameError: If compressed data is corrupt
         """
-        try:
-            decompressed = zlib.decompress(data)
-            return decompressed.decode('utf-8')
-        except Exception as e:
-            # If decompression fails, data might not be compressed
-            if isinstance(data, bytes):
-                return data.decode('utf-8')
+        if isinstance(data, str):
             return data
+        return bytes(self.decompress_bytes(data)).decode("utf-8")
+
+    def decompress_bytes(
+        self, data: Union[bytes, memoryview], max_size: Optional[int] = None
+    ) -> Union[bytes, memoryview]:
+        """
+        Decompress raw bytes without decoding them
+
+        Input that is neither a frame nor a bare zlib stream is returned
+        unchanged, so plain JSON buffers pass through without being copied.
+
+        Args:
+            data: Possibly compressed bytes-like object
+            max_size: Stop inflating after ``max_size + 1`` bytes, so callers
+                can reject oversized payloads without inflating all of them.
+                When None, payloads decoding to more than
+                :data:`MAX_DECODED_SIZE` bytes are rejected
+
+        Returns:
+            Decompressed bytes, or the input itself if it was not compressed
+
+        Raises:
+            FrameError: If compressed data is corrupt, or no ``max_size`` is
+                given and it exceeds :data:`MAX_DECODED_SIZE`
+        """
+        if is_frame(data):
+            return unpack_frame(data, max_size)
+        if not is_zlib_stream(data):
+            return data
+        cap = MAX_DECODED_SIZE if max_size is None else max_size
+        try:
+            stream = zlib.decompressobj()
+            result = stream.decompress(data, cap + 1)
+        except zlib.error as e:
+            raise FrameError(f"Corrupt zlib data: {e}") from e
+        if max_size is None and len(result) > cap:
+            raise FrameError(f"zlib data decodes to more than {cap} bytes")
+        # Output past max_size is rejected by the caller; anything shorter
+        # must be the whole stream
+        if len(result) <= cap:
+            if not stream.eof:
+                raise FrameError("Corrupt zlib data: incomplete or truncated stream")
+            if stream.unused_data:
+                raise FrameError("Corrupt zlib data: trailing bytes after the stream")
+        return result
+
+    def compressor(
+        self, fp: BinaryIO, max_size: Optional[int] = None
+    ) -> "StreamCompressor":
+        """
+        Compress incrementally into a file object
+
+        Args:
+            fp: Binary file-like object with a ``write`` method
+            max_size: Maximum uncompressed size accepted, in bytes
+
+        Returns:
+            A :class:`StreamCompressor` writing one frame to ``fp``, readable
+            by :class:`StreamDecompressor` and :func:`jsongeek.loads`
+        """
+        return StreamCompressor(self, fp, max_size)
 
     def get_ratio(self) -> float:
         """Get the last compression ratio"""
@@ -84,53 +873,375 @@ class SmartCompressor:
     def should_compress(self, data: Union[str, bytes]) -> bool:
         """
         Determine if data should be compressed based on content analysis
-        
+
         Args:
             data: Data to analyze
-            
+
         Returns:
             Boolean indicating whether compression is recommended
         """
         if isinstance(data, str):
-            data = data.encode('utf-8')
-            
-        # Don't compress small data
-        if len(data) < 1024:  # 1KB
-            return False
-            
-        # Sample the data to estimate compressibility
-        sample_size = min(1024, len(data))
-        sample = data[:sample_size]
-        compressed_sample = zlib.compress(sample)
-        
-        # If sample compression ratio is poor, skip compression
-        if len(compressed_sample) >= len(sample):
+            data = data.encode("utf-8")
+
+        # Don't compress small data; a dictionary supplies the history that
+        # small payloads lack
+        minimum = (
+            MIN_COMPRESS_SIZE
+            if self.dictionary is None
+            else MIN_DICTIONARY_COMPRESS_SIZE
+        )
+        if len(data) < minimum:
             return False
-            
-        return True
+
+        # If the sample compression ratio is poor, skip compression
+        return self._sample_ratio(data[:1024]) < 1.0
 
     def compress_json(self, obj: Any) -> bytes:
         """
         Compress JSON object
-        
+
+        With ``transform`` enabled, arrays of objects are compressed in
+        columnar layout; sizes in :meth:`get_stats` then refer to the layout.
+
         Args:
             obj: Python object to compress
-            
+
         Returns:
             Compressed JSON as bytes
         """
+        if self.transform:
+            layout = encode_columns(obj)
+            if layout is not None:
+                return self._compress(layout, True)
         json_str = json.dumps(obj)
         return self.compress(json_str)
 
     def decompress_json(self, data: bytes) -> Any:
         """
         Decompress JSON data
-        
+
+        Columnar frames are rebuilt straight into objects, without going
+        through JSON text.
+
         Args:
             data: Compressed JSON data
-            
+
         Returns:
             Python object
         """
+        if not isinstance(data, str) and is_frame(data):
+            payload, transformed = _unpack(data)
+            if transformed:
+                return _decode_layout(payload)
+            return json.loads(payload)
         json_str = self.decompress(data)
         return json.loads(json_str)
+
+
+def _stream_encoder(
+    codec: int, level: int, dictionary: Optional[CompressionDictionary] = None
+) -> Tuple[Any, bytes]:
+    """
+    Create an incremental compressor with ``compress`` and ``flush`` methods
+
+    Returns:
+        The compressor (None for ``none``) and bytes to write before its output
+    """
+    if codec == CODEC_NONE:
+        return None, b""
+    if codec == CODEC_ZLIB:
+        if dictionary is not None:
+            return zlib.compressobj(level, zdict=dictionary.data), b""
+        return zlib.compressobj(level), b""
+    if codec == CODEC_GZIP:
+        return zlib.compressobj(level, zlib.DEFLATED, 31), b""
+    if codec == CODEC_LZMA:
+        return lzma.LZMACompressor(preset=level), b""
+    if codec == CODEC_BZ2:
+        return bz2.BZ2Compressor(level), b""
+    if codec == CODEC_ZSTD and _zstd() is not None:
+        return _zstd_compressor(level, dictionary).compressobj(), b""
+    if codec == CODEC_LZ4 and _lz4() is not None:
+        encoder = _lz4().LZ4FrameCompressor(compression_level=level)
+        return encoder, encoder.begin()
+    raise ValueError(f"Codec {_CODEC_NAMES.get(codec, codec)} is not available")
+
+
+def _drain(decoder: Any, data: bytes, limit: int) -> Iterator[bytes]:
+    """Feed data to a decompressor, yielding pieces of at most ``limit`` bytes"""
+    # zlib keeps input it has not consumed in unconsumed_tail, the other
+    # decompressors buffer it and report needs_input
+    tail = hasattr(decoder, "unconsumed_tail")
+    out = decoder.decompress(data, limit)
+    while True:
+        if out:
+            yield out
+        if decoder.eof:
+            return
+        if tail:
+            if not decoder.unconsumed_tail:
+                return
+            out = decoder.decompress(decoder.unconsumed_tail, limit)
+        else:
+            if decoder.needs_input:
+                return
+            out = decoder.decompress(b"", limit)
+
+
+class StreamDecompressor:
+    """
+    Incremental decoder for compressed streams
+
+    The format is recognised from the first bytes: frames, and bare zlib,
+    gzip, xz, bz2 (and zstd and lz4 when installed) streams; anything else
+    passes through unchanged. Output comes in pieces of at most
+    ``chunk_size`` bytes, so memory stays bounded whatever the compression
+    ratio. Concatenated gzip members are decoded one after the other, like
+    ``gzip -d`` does.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, chunk_size: int = 65536):
+        """
+        Args:
+            max_size: Maximum decompressed size in bytes
+            chunk_size: Largest piece of output produced at once
+
+        Raises:
+            ValueError: If ``chunk_size`` is not positive
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.codec: Optional[str] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._head = b""
+        self._bare = False
+        self._length: Optional[int] = None
+        self._decoder: Any = None
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        """
+        Feed the next chunk of input
+
+        Args:
+            data: Compressed (or plain) bytes
+
+        Yields:
+            Decompressed pieces
+
+        Raises:
+            FrameError: On corrupt data or output above ``max_size``
+        """
+        self.bytes_in += len(data)
+        if self.codec is None:
+            self._head += data
+            if not self._detect(False):
+                return
+            data, self._head = self._head, b""
+        yield from self._feed(data)
+
+    def finish(self) -> Iterator[bytes]:
+        """
+        Signal the end of the input
+
+        Yields:
+            Pieces still held back while the format was being detected
+
+        Raises:
+            FrameError: If the compressed stream or frame is incomplete
+        """
+        if self.codec is None:
+            self._detect(True)
+            data, self._head = self._head, b""
+            yield from self._feed(data)
+        if self._decoder is not None and not self._decoder.eof:
+            raise FrameError(f"Truncated {self.codec} stream")
+        if self._length is not None and self.bytes_out != self._length:
+            raise FrameError(
+                f"Frame decoded to {self.bytes_out} bytes instead of {self._length}"
+            )
+
+    def _detect(self, final: bool) -> bool:
+        """Recognise the format from the buffered head once enough of it arrived"""
+        head = self._head
+        dictionary = None
+        if head[:1] == b"\x00":
+            needed = FRAME_HEADER_SIZE
+            if len(head) > 3 and head[3] & DICTIONARY_FLAG:
+                needed += _DICT_ID.size
+            if len(head) < needed:
+                if final:
+                    raise FrameError("Truncated frame header")
+                return False
+            if head[:3] != FRAME_MAGIC:
+                raise FrameError("Invalid frame header")
+            codec, length, dictionary, header_size, transformed = _read_header(head)
+            if transformed:
+                raise FrameError("Columnar frames cannot be decoded as a stream")
+            if length != UNKNOWN_LENGTH:
+                if self.max_size is not None and length > self.max_size:
+                    raise FrameError(
+                        f"Decompressed data larger than {self.max_size} bytes"
+                    )
+                self._length = length
+            self._head = head[header_size:]
+        else:
+            if (
+                len(head) < _SNIFF_SIZE
+                and not final
+                and head[:1] in b"\x1f\xfdB\x28\x04x"
+            ):
+                return False
+            codec = CODEC_ZLIB if is_zlib_stream(head) else CODEC_NONE
+            for magic, candidate in _STREAM_MAGIC:
+                if head.startswith(magic):
+                    codec = candidate
+                    break
+            self._bare = True
+        self.codec = _CODEC_NAMES[codec]
+        if codec != CODEC_NONE:
+            self._decoder = _decoder(codec, dictionary)
+        return True
+
+    def _count(self, piece: bytes) -> bytes:
+        """Account output and enforce ``max_size``"""
+        self.bytes_out += len(piece)
+        if self.max_size is not None and self.bytes_out > self.max_size:
+            raise FrameError(f"Decompressed data larger than {self.max_size} bytes")
+        return piece
+
+    def _feed(self, data: bytes) -> Iterator[bytes]:
+        """Decode input once the format is known"""
+        if self._decoder is None:
+            for start in range(0, len(data), self.chunk_size):
+                yield self._count(data[start : start + self.chunk_size])
+            return
+        while data:
+            decoder = self._decoder
+            if decoder.eof:
+                if not (self._bare and self.codec == "gzip"):
+                    raise FrameError(f"Trailing data after the {self.codec} stream")
+                decoder = self._decoder = _decoder(CODEC_GZIP)
+            try:
+                for piece in _drain(decoder, data, self.chunk_size):
+                    yield self._count(piece)
+            except FrameError:
+                raise
+            except Exception as e:
+                raise FrameError(f"Corrupt {self.codec} data: {e}") from e
+            data = decoder.unused_data if decoder.eof else b""
+
+
+class StreamCompressor:
+    """
+    Incremental frame writer over a binary file object
+
+    The first ``SAMPLE_SIZE`` bytes are held back to choose the codec and
+    level the way :meth:`SmartCompressor.compress` does; output is then
+    written as the codec produces it. The frame records an unknown length.
+    Close the compressor (or use it as a context manager) to finish the
+    frame; the file object itself is left open.
+    """
+
+    def __init__(
+        self, owner: SmartCompressor, fp: BinaryIO, max_size: Optional[int] = None
+    ):
+        """
+        Args:
+            owner: Compressor whose codec policy and level model are used
+            fp: Binary file-like object with a ``write`` method
+            max_size: Maximum uncompressed size accepted, in bytes
+        """
+        self._owner = owner
+        self._fp = fp
+        self.max_size = max_size
+        self.codec: Optional[str] = None
+        self.level = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._head: List[bytes] = []
+        self._encoder: Any = None
+        self._closed = False
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """
+        Compress and write data
+
+        Args:
+            data: Text (encoded as UTF-8) or bytes
+
+        Returns:
+            Number of uncompressed bytes accepted
+
+        Raises:
+            ValueError: If the compressor is closed or ``max_size`` is exceeded
+        """
+        if self._closed:
+            raise ValueError("StreamCompressor is closed")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        size = len(data)
+        if self.max_size is not None and self.bytes_in + size > self.max_size:
+            raise ValueError(f"Stream larger than {self.max_size} bytes")
+        self.bytes_in += size
+        if self.codec is None:
+            self._head.append(data)
+            if self.bytes_in < SAMPLE_SIZE:
+                return size
+            data = self._start()
+        if self._encoder is not None:
+            data = self._encoder.compress(data)
+        self._emit(data)
+        return size
+
+    def _start(self) -> bytes:
+        """Choose the codec from the held back data and write the frame header"""
+        head = b"".join(self._head)
+        self._head = []
+        owner = self._owner
+        codec, self.level = owner.choose_codec(
+            len(head), owner._sample_ratio(head[:SAMPLE_SIZE])
+        )
+        dictionary = owner.dictionary if codec in _DICTIONARY_CODECS else None
+        self.codec = _CODEC_NAMES[codec]
+        self._encoder, prefix = _stream_encoder(codec, self.level, dictionary)
+        self._emit(_pack_header(codec, UNKNOWN_LENGTH, dictionary) + prefix)
+        return head
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._fp.write(data)
+            self.bytes_out += len(data)
+
+    def close(self) -> None:
+        """Finish the frame and flush the file object; the file object stays open"""
+        if self._closed:
+            return
+        if self.codec is None:
+            head = self._start()
+            self._emit(
+                self._encoder.compress(head) if self._encoder is not None else head
+            )
+        if self._encoder is not None:
+            self._emit(self._encoder.flush())
+        self._closed = True
+        flush = getattr(self._fp, "flush", None)
+        if flush is not None:
+            flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the codec, level and bytes written so far"""
+        return {
+            "codec": self.codec,
+            "compression_level": self.level,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    def __enter__(self) -> "StreamCompressor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,168 @@
+"""
+Preset compression dictionaries trained from sample JSON payloads
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Serialized dictionaries start with this magic and a format version byte
+DICTIONARY_MAGIC = b"JGD"
+DICTIONARY_FORMAT = 1
+
+# zlib only looks back 32 KiB, so a larger preset dictionary is never used
+MAX_DICTIONARY_SIZE = 32768
+DEFAULT_DICTIONARY_SIZE = 16384
+
+# Fragments counted by the trainer: object keys with the delimiter before
+# them and the colon after, and string values
+_FRAGMENT = re.compile(
+    rb'[{,]\s*"(?:[^"\\]|\\.){0,64}"\s*:\s*' rb'|"(?:[^"\\]|\\.){1,64}"(?=\s*[,}\]])'
+)
+
+
+class CompressionDictionary:
+    """
+    Preset dictionary shared by the compressing and decompressing side
+
+    Used as the ``zdict`` of zlib and as a raw-content zstd dictionary.
+    ``dict_id`` is derived from the content, so every trained version gets
+    its own id and frames keep pointing at the exact dictionary that encoded
+    them.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Args:
+            data: Dictionary content, at most MAX_DICTIONARY_SIZE bytes
+
+        Raises:
+            ValueError: If the content is empty or too large
+        """
+        if not data or len(data) > MAX_DICTIONARY_SIZE:
+            raise ValueError(f"Dictionary must hold 1 to {MAX_DICTIONARY_SIZE} bytes")
+        self.data = bytes(data)
+        self.dict_id = int.from_bytes(
+            hashlib.blake2b(self.data, digest_size=4).digest(), "little"
+        )
+        self._zstd: Any = None
+
+    def zstd_dict(self) -> Any:
+        """Get the content as a ``zstandard.ZstdCompressionDict``"""
+        if self._zstd is None:
+            import zstandard
+
+            self._zstd = zstandard.ZstdCompressionDict(
+                self.data, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+            )
+        return self._zstd
+
+    def to_bytes(self) -> bytes:
+        """Serialize for shipping to other services"""
+        return DICTIONARY_MAGIC + bytes([DICTIONARY_FORMAT]) + self.data
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "CompressionDictionary":
+        """
+        Load a dictionary serialized by :meth:`to_bytes`
+
+        Raises:
+            ValueError: If the blob is not a dictionary or uses an unknown format
+        """
+        if blob[:3] != DICTIONARY_MAGIC:
+            raise ValueError("Not a compression dictionary")
+        if blob[3:4] != bytes([DICTIONARY_FORMAT]):
+            raise ValueError(f"Unsupported dictionary format {blob[3:4].hex()}")
+        return cls(blob[4:])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompressionDictionary(dict_id={self.dict_id:#010x}, "
+            f"size={len(self.data)})"
+        )
+
+
+def train_dictionary(
+    samples: Iterable[Union[str, bytes]], size: int = DEFAULT_DICTIONARY_SIZE
+) -> CompressionDictionary:
+    """
+    Build a preset dictionary from sample payloads
+
+    Object keys (with their delimiters) and string values are counted over
+    all samples and ranked by the bytes they would save, occurrences times
+    length. The best fragments fill up to half of ``size``; whole samples
+    richest in frequent fragments fill the rest, so the dictionary also
+    holds the usual order of keys. Fragments are laid out last, the most
+    valuable at the very end, where zlib reaches them with the shortest
+    distances.
+
+    Args:
+        samples: Representative JSON payloads
+        size: Maximum dictionary size in bytes
+
+    Returns:
+        The trained dictionary
+
+    Raises:
+        ValueError: If ``size`` is out of range or the samples contain no
+            repeated fragment
+    """
+    if not 0 < size <= MAX_DICTIONARY_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_DICTIONARY_SIZE}")
+    counts: Counter = Counter()
+    parsed = []
+    for sample in samples:
+        if isinstance(sample, str):
+            sample = sample.encode("utf-8")
+        fragments = _FRAGMENT.findall(sample)
+        counts.update(fragments)
+        parsed.append((sample, fragments))
+    ranked = sorted(
+        (fragment for fragment, count in counts.items() if count > 1),
+        key=lambda fragment: counts[fragment] * len(fragment),
+        reverse=True,
+    )
+    chosen = []
+    pool = bytearray()
+    for fragment in ranked:
+        # Skip fragments already contained in a better one
+        if len(pool) + len(fragment) > size // 2 or fragment in pool:
+            continue
+        chosen.append(fragment)
+        pool += fragment
+    if not chosen:
+        raise ValueError("Samples contain no repeated fragment to train on")
+
+    def coverage(entry: Tuple[bytes, List[bytes]]) -> float:
+        sample, fragments = entry
+        return sum(
+            len(fragment) for fragment in fragments if counts[fragment] > 1
+        ) / max(1, len(sample))
+
+    room = size - len(pool)
+    whole: List[bytes] = []
+    for sample, _ in sorted(parsed, key=coverage, reverse=True):
+        if len(sample) <= room and sample not in whole:
+            whole.append(sample)
+            room -= len(sample)
+    return CompressionDictionary(b"".join(whole) + b"".join(reversed(chosen)))
+
+
+_registry: Dict[int, CompressionDictionary] = {}
+_lock = threading.Lock()
+
+
+def register_dictionary(dictionary: CompressionDictionary) -> None:
+    """Make a dictionary available to decoders of frames that reference its id"""
+    with _lock:
+        _registry[dictionary.dict_id] = dictionary
+
+
+def get_dictionary(dict_id: int) -> Optional[CompressionDictionary]:
+    """Look up a registered dictionary by id"""
+    return _registry.get(dict_id)
@@ -0,0 +1,191 @@
+"""
+Reversible columnar transform of JSON record arrays, applied before compression
+"""
+
+import json
+from collections import Counter
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+# Version of the transformed layout, stored in every payload
+TRANSFORM_VERSION = 1
+# Arrays shorter than this gain nothing from the transform
+MIN_RECORDS = 2
+
+_SEPARATORS = (",", ":")
+
+
+def is_record_array(obj: Any) -> bool:
+    """Check whether an object is an array of objects worth transforming"""
+    return (
+        type(obj) is list
+        and len(obj) >= MIN_RECORDS
+        and all(type(record) is dict for record in obj)
+    )
+
+
+def _is_monotonic_int(column: List[Any]) -> bool:
+    """Check whether a column holds non-decreasing integers (bools excluded)"""
+    if not all(type(value) is int for value in column):
+        return False
+    return all(a <= b for a, b in zip(column, column[1:]))
+
+
+def encode_columns(records: List[Dict[str, Any]]) -> Optional[bytes]:
+    """
+    Transform an array of objects into a columnar layout
+
+    Key names are stored once in a key table. Each distinct key order
+    (shape) is stored once, with a shape id per record when records differ.
+    Values are laid out column by column, so similar values sit together,
+    and non-decreasing integer columns such as timestamps and ids are
+    delta-encoded. The result is compact JSON that :func:`decode_columns`
+    turns back into exactly the same records, key order included.
+
+    Args:
+        records: Array of JSON objects
+
+    Returns:
+        UTF-8 encoded layout, or None if ``records`` is not a record array
+        or has a key that is not a str
+
+    Raises:
+        TypeError: If a value is not JSON serializable
+    """
+    if not is_record_array(records):
+        return None
+    key_ids: Dict[str, int] = {}
+    shape_ids: Dict[Tuple[str, ...], int] = {}
+    record_shapes = []
+    for record in records:
+        shape = tuple(record)
+        shape_id = shape_ids.get(shape)
+        if shape_id is None:
+            if not all(type(key) is str for key in shape):
+                # json.dumps coerces such keys to strings, which the
+                # layout would not reproduce
+                return None
+            shape_id = shape_ids[shape] = len(shape_ids)
+            for key in shape:
+                key_ids.setdefault(key, len(key_ids))
+        record_shapes.append(shape_id)
+
+    if len(shape_ids) == 1:
+        columns = [[record[key] for record in records] for key in key_ids]
+        ids = None
+    else:
+        columns = [[] for _ in key_ids]
+        appenders = [column.append for column in columns]
+        for record in records:
+            for key, value in record.items():
+                appenders[key_ids[key]](value)
+        ids = record_shapes
+
+    deltas = []
+    for i, column in enumerate(columns):
+        if len(column) > 1 and _is_monotonic_int(column):
+            columns[i] = [column[0]] + [b - a for a, b in zip(column, column[1:])]
+            deltas.append(i)
+
+    layout = {
+        "v": TRANSFORM_VERSION,
+        "rows": len(records),
+        "keys": list(key_ids),
+        "shapes": [[key_ids[key] for key in shape] for shape in shape_ids],
+        "ids": ids,
+        "delta": deltas,
+        "columns": columns,
+    }
+    return json.dumps(layout, separators=_SEPARATORS).encode("utf-8")
+
+
+def decode_columns(data: bytes, max_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Rebuild the records of a layout from :func:`encode_columns`
+
+    The layout is checked for consistency, and its decoded size bounded,
+    before any record is built: ``rows`` must match the shape ids and the
+    column lengths, so a small payload cannot expand into millions of
+    records.
+
+    Args:
+        data: UTF-8 encoded layout
+        max_size: Reject layouts whose records take more than this many
+            bytes as JSON text
+
+    Returns:
+        The original records
+
+    Raises:
+        ValueError: If the layout is malformed, of an unknown version, or
+            larger than ``max_size`` once decoded
+    """
+    layout = json.loads(data)
+    if type(layout) is not dict or layout.get("v") != TRANSFORM_VERSION:
+        raise ValueError("Unknown columnar layout")
+    try:
+        keys = layout["keys"]
+        columns = layout["columns"]
+        rows = layout["rows"]
+        ids = layout["ids"]
+        shapes = [[keys[key_id] for key_id in shape] for shape in layout["shapes"]]
+        if type(rows) is not int or rows < 0 or len(columns) != len(keys):
+            raise ValueError("row or column count does not match the key table")
+        if ids is None:
+            if len(shapes) != 1:
+                raise ValueError("records of several shapes without shape ids")
+            shape_counts = Counter({0: rows})
+        else:
+            if len(ids) != rows:
+                raise ValueError(f"{len(ids)} shape ids for {rows} rows")
+            shape_counts = Counter(ids)
+        expected = [0] * len(keys)
+        key_ids = {key: i for i, key in enumerate(keys)}
+        # Lower bound of the decoded JSON text: brackets and commas, and per
+        # member a quoted key, a colon, a value and a comma
+        size = 2 + 3 * rows
+        for shape_id, count in shape_counts.items():
+            if type(shape_id) is not int or not 0 <= shape_id < len(shapes):
+                raise ValueError(f"Invalid shape id {shape_id}")
+            for name in shapes[shape_id]:
+                expected[key_ids[name]] += count
+                size += count * (len(name) + 5)
+        if [len(column) for column in columns] != expected:
+            raise ValueError("column lengths do not match the records")
+        if max_size is not None and size > max_size:
+            raise ValueError(
+                f"Columnar layout larger than {max_size} bytes once decoded"
+            )
+        for i in layout["delta"]:
+            column = columns[i]
+            if not all(type(value) is int for value in column):
+                raise ValueError(
+                    f"Delta column {i} holds a value that is not an integer"
+                )
+            decoded = []
+            append = decoded.append
+            for value in accumulate(column):
+                append(value)
+                # Decoded integers may be much longer than their deltas
+                size += len(str(value)) - 1
+                if max_size is not None and size > max_size:
+                    raise ValueError(
+                        f"Columnar layout larger than {max_size} bytes once decoded"
+                    )
+            columns[i] = decoded
+        if ids is None:
+            # With a single shape the columns follow its key order
+            names = shapes[0]
+            if not names:
+                return [{} for _ in range(rows)]
+            return [dict(zip(names, values)) for values in zip(*columns)]
+        iterators = [iter(column) for column in columns]
+        shape_iterators = [
+            [(name, iterators[key_ids[name]]) for name in names] for names in shapes
+        ]
+        return [
+            {name: next(values) for name, values in shape_iterators[shape_id]}
+            for shape_id in ids
+        ]
+    except (KeyError, IndexError, TypeError, StopIteration) as e:
+        raise ValueError(f"Malformed columnar layout: {e}") from None
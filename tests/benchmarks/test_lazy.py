@@ -0,0 +1,80 @@
+"""
+Lazy parsing benchmarks: reading a few fields against a full json.loads
+"""
+
+import gc
+import json
+import time
+
+from jsongeek import JSONParser, LazyDocument
+from jsongeek.core.backends import available_backends, sample_document
+from jsongeek.core.tape import build_tape
+
+SIZES = (1024, 16 * 1024, 256 * 1024, 4 * 1024 * 1024)
+
+
+def best_of(build, repeat: int = 5) -> float:
+    """Return the best wall time of ``build`` in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def best_of_pair(first, second, repeat: int = 10) -> tuple:
+    """Return the best wall times of two callables, interleaved without GC pauses"""
+    gc.disable()
+    try:
+        times = [(best_of(first, 1), best_of(second, 1)) for _ in range(repeat)]
+    finally:
+        gc.enable()
+    return tuple(map(min, zip(*times)))
+
+
+def make_document(size: int) -> bytes:
+    """Build an object with three small fields and a large payload"""
+    items = sample_document(size).decode()
+    head = '"id": 7, "name": "report", "meta": {"rows": 3}'
+    return f'{{{head}, "items": {items}}}'.encode()
+
+
+def read_fields(doc) -> tuple:
+    """Read the three small fields of a parsed document"""
+    return doc["id"], doc["name"], doc["meta"]["rows"]
+
+
+def test_lazy_crossover():
+    """Benchmark parse_lazy plus three field reads against json.loads per backend"""
+    documents = [make_document(size) for size in SIZES]
+    eager = [best_of(lambda: read_fields(json.loads(data))) for data in documents]
+    for data, baseline in zip(documents[:2], eager):
+        # The Python tape is what parse_lazy avoids on the stdlib backend
+        tape_time = best_of(lambda: read_fields(LazyDocument(build_tape(data))))
+        print(
+            f"{len(data)} bytes: Python tape {tape_time * 1e3:.3f}ms, "
+            f"json.loads {baseline * 1e3:.3f}ms"
+        )
+    for name in available_backends():
+        crossover = None
+        with JSONParser(backend=name) as parser:
+            for data, baseline in zip(documents, eager):
+                assert read_fields(parser.parse_lazy(data)) == (7, "report", 3)
+                lazy_time = best_of(lambda: read_fields(parser.parse_lazy(data)))
+                print(
+                    f"{name} {len(data)} bytes: parse_lazy {lazy_time * 1e3:.3f}ms, "
+                    f"json.loads {baseline * 1e3:.3f}ms"
+                )
+                if crossover is None and lazy_time < baseline:
+                    crossover = len(data)
+                if name == "json":
+                    # Without a native tape the document is parsed eagerly, and
+                    # the Python tape it avoids costs 15-20x json.loads
+                    lazy_time, baseline = best_of_pair(
+                        lambda: read_fields(parser.parse_lazy(data)),
+                        lambda: read_fields(json.loads(data)),
+                    )
+                    assert lazy_time < 2 * baseline + 1e-4
+        wins = f"from {crossover} bytes" if crossover else "at no tested size"
+        print(f"{name}: lazy access wins {wins}")
@@ -0,0 +1,72 @@
+"""
+Overhead of resource limit checks on the parse path
+"""
+
+import json
+import time
+
+from jsongeek import JSONParser
+from jsongeek.core.limits import ParseLimits, check_limits
+
+DOCUMENT = json.dumps(
+    [
+        {
+            "id": i,
+            "name": f"item {i}",
+            "tags": ["a", "b"],
+            "nested": {"x": [i, i * 0.5]},
+        }
+        for i in range(20000)
+    ]
+).encode()
+
+
+def best_of(run, repeat: int = 5) -> float:
+    """Return the fastest wall time of ``run`` in seconds"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def test_limit_scan_overhead():
+    """Benchmark the limit front-end against the parse it guards"""
+    strict = ParseLimits(
+        max_depth=4, max_string_length=64, max_number_length=32, max_elements=10**7
+    )
+    with JSONParser(backend="json", max_depth=None) as unlimited, JSONParser(
+        backend="json",
+        max_depth=4,
+        max_string_length=64,
+        max_number_length=32,
+        max_elements=10**7,
+    ) as limited:
+        base = best_of(lambda: unlimited.parse(DOCUMENT))
+        guarded = best_of(lambda: limited.parse(DOCUMENT))
+    bounds = best_of(lambda: check_limits(DOCUMENT, ParseLimits(max_depth=10**6)))
+    scan = best_of(lambda: check_limits(DOCUMENT, strict))
+    mb = len(DOCUMENT) / 1e6
+    print(
+        f"{mb:.1f} MB: parse {base * 1e3:.1f}ms, with limits {guarded * 1e3:.1f}ms; "
+        f"count bounds {bounds / mb * 1e3:.2f}ms/MB, "
+        f"full scan {scan / mb * 1e3:.2f}ms/MB"
+    )
+    # Documents within the count bounds, the common case, skip the scan
+    assert bounds < base / 10
+
+
+def test_default_limits_overhead():
+    """Benchmark the max_depth check on documents past the container count bound"""
+    small = json.dumps(
+        [{"id": i, "tags": [i], "meta": {"x": [1, 2]}} for i in range(12)]
+    ).encode()
+    for doc in (small, DOCUMENT):
+        check = best_of(lambda: check_limits(doc, ParseLimits()), repeat=50)
+        parse = best_of(lambda: json.loads(doc), repeat=50)
+        print(
+            f"{len(doc)} bytes: default limit check {check * 1e6:.1f}us, "
+            f"json.loads {parse * 1e6:.1f}us"
+        )
+        assert check < parse / 2
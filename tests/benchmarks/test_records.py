@@ -0,0 +1,65 @@
+"""
+Memory and construction benchmarks for record classes against dicts
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+from jsongeek import JSONParser
+
+# Size of the corpus; JSONGEEK_BENCH_RECORDS overrides it for quick runs
+RECORDS = int(os.environ.get("JSONGEEK_BENCH_RECORDS", "1000000"))
+SAMPLE = min(RECORDS, 10000)
+
+
+def make_corpus(count: int) -> bytes:
+    """Build an array of uniform records"""
+    return json.dumps(
+        [
+            {"ts": i, "value": i * 0.5, "host": f"h{i % 10}", "ok": i % 2 == 0}
+            for i in range(count)
+        ]
+    ).encode()
+
+
+def traced_size(build) -> int:
+    """Return the memory in bytes held by the result of ``build``"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def timed(build) -> float:
+    """Return the wall time of ``build`` in seconds"""
+    start_time = time.perf_counter()
+    build()
+    return time.perf_counter() - start_time
+
+
+def test_records_vs_dicts():
+    """Benchmark parse_records end to end against json.loads into dicts"""
+    corpus = make_corpus(RECORDS)
+    # tracemalloc slows allocation down, so memory is sampled separately
+    sample = make_corpus(SAMPLE)
+    with JSONParser(backend="json") as parser:
+        assert parser.parse_records(sample) == json.loads(sample)
+        dict_time = timed(lambda: json.loads(corpus))
+        record_time = timed(lambda: parser.parse_records(corpus))
+        dict_size = traced_size(lambda: json.loads(sample)) / SAMPLE
+        record_size = traced_size(lambda: parser.parse_records(sample)) / SAMPLE
+
+    print(
+        f"{RECORDS} records: json.loads {dict_size:.0f} B/record, "
+        f"{RECORDS / dict_time:,.0f} records/s; "
+        f"parse_records {record_size:.0f} B/record, "
+        f"{RECORDS / record_time:,.0f} records/s "
+        f"({record_time / dict_time:.1f}x the time)"
+    )
+    assert record_size < dict_size
+    # Building slotted objects in Python costs about as much as parsing
+    assert record_time < 6 * dict_time
@@ -0,0 +1,62 @@
+"""
+Cold start benchmarks for JsonGeek
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from jsongeek.core.runtime import FALLBACK_MODULE, WASM_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_python(code: str, env: dict = None) -> float:
+    """Run a snippet in a fresh interpreter and return its wall time in ms"""
+    start_time = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+    )
+    return (time.perf_counter() - start_time) * 1000
+
+
+def test_import_defers_heavy_modules():
+    """Test that importing jsongeek does not load wasmer or numpy"""
+    run_python(
+        "import sys, jsongeek\n"
+        "assert 'wasmer' not in sys.modules\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+
+
+def test_import_time():
+    """Benchmark bare import time against the stdlib json module"""
+    baseline = min(run_python("import json") for _ in range(3))
+    import_time = min(run_python("import jsongeek") for _ in range(3))
+    print(f"import json: {baseline:.1f}ms, import jsongeek: {import_time:.1f}ms")
+
+
+def test_precompiled_artifact_startup(tmp_path):
+    """Benchmark first parse with and without a precompiled artifact"""
+    pytest.importorskip("wasmer")
+    if not os.path.exists(os.path.join(WASM_DIR, FALLBACK_MODULE)):
+        pytest.skip("wasm modules are not built")
+    env = {"JSONGEEK_CACHE_DIR": str(tmp_path)}
+    code = (
+        "import jsongeek\n"
+        "jsongeek.query('{\"a\": 1}', '/a', backend='wasm-scalar')\n"
+        "assert jsongeek.warmup(use_simd=False)['compiled_modules']\n"
+    )
+
+    cold = run_python(code, env)
+    assert os.listdir(tmp_path), "compiled module was not persisted"
+    warm = min(run_python(code, env) for _ in range(3))
+
+    print(f"cold start: {cold:.1f}ms, with precompiled artifact: {warm:.1f}ms")
+    assert warm < cold
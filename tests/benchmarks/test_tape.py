@@ -0,0 +1,35 @@
+"""
+Tape conversion benchmarks against json.loads
+"""
+
+import json
+import time
+
+from jsongeek.core.backends import sample_document
+from jsongeek.core.tape import build_tape
+
+
+def best_of(build, repeat: int = 20) -> float:
+    """Return the best wall time of ``build`` in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def test_to_python_vs_json_loads():
+    """Benchmark converting a built tape against a full json.loads"""
+    for size in (1024, 50 * 1024, 1024 * 1024):
+        doc = sample_document(size)
+        tape = build_tape(doc)
+        assert tape.to_python() == json.loads(doc)
+        convert = best_of(tape.to_python)
+        baseline = best_of(lambda: json.loads(doc))
+        print(
+            f"{len(doc)} bytes: to_python {convert * 1e3:.3f}ms, "
+            f"json.loads {baseline * 1e3:.3f}ms"
+        )
+        # Conversion goes through the same C decoder as json.loads
+        assert convert < 2 * baseline + 1e-4
@@ -0,0 +1,77 @@
+"""
+Ratio and speed of the columnar pre-transform against plain zlib
+"""
+
+import json
+import os
+import random
+import time
+import zlib
+
+from jsongeek.utils.compression import SmartCompressor
+
+# Set JSONGEEK_BENCH_LOGS to benchmark a real NDJSON log file instead
+LOG_FILE = os.environ.get("JSONGEEK_BENCH_LOGS")
+RECORDS = 100000
+
+
+def make_logs(count: int) -> list:
+    """Build access-log-like records with increasing timestamps and ids"""
+    rng = random.Random(0)
+    ts = 1700000000000
+    logs = []
+    for i in range(count):
+        ts += rng.randrange(50)
+        record = {
+            "ts": ts,
+            "seq": i,
+            "level": rng.choice(["INFO", "INFO", "INFO", "WARN", "ERROR"]),
+            "service": rng.choice(["api", "auth", "billing"]),
+            "path": rng.choice(["/v1/orders", "/v1/users", "/health"]),
+            "status": rng.choice([200, 200, 200, 404, 500]),
+            "latency_ms": round(rng.lognormvariate(3, 1), 2),
+        }
+        if i % 7 == 0:
+            record["user_id"] = rng.randrange(10**6)
+        logs.append(record)
+    return logs
+
+
+def load_logs() -> list:
+    """Read the configured log corpus, or generate one"""
+    if not LOG_FILE:
+        return make_logs(RECORDS)
+    with open(LOG_FILE, "rb") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def best_of(run, repeat: int = 3) -> float:
+    """Return the fastest wall time of ``run`` in seconds"""
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def test_transform_vs_zlib():
+    """Benchmark compress_json with the columnar transform against json.dumps + zlib"""
+    logs = load_logs()
+    text = json.dumps(logs).encode()
+    compressor = SmartCompressor(transform=True)
+    plain = zlib.compress(text, 6)
+    packed = compressor.compress_json(logs)
+    zlib_time = best_of(lambda: zlib.compress(json.dumps(logs).encode(), 6))
+    transform_time = best_of(lambda: compressor.compress_json(logs))
+    zlib_read = best_of(lambda: json.loads(zlib.decompress(plain)))
+    transform_read = best_of(lambda: compressor.decompress_json(packed))
+    mb = len(text) / 1e6
+    print(
+        f"{len(logs)} records, {mb:.1f} MB: zlib {len(text) / len(plain):.1f}x "
+        f"{mb / zlib_time:.0f} MB/s write {mb / zlib_read:.0f} MB/s read; "
+        f"columnar {len(text) / len(packed):.1f}x "
+        f"{mb / transform_time:.0f} MB/s write {mb / transform_read:.0f} MB/s read"
+    )
+    assert compressor.decompress_json(packed) == logs
+    assert len(packed) < len(plain) / 1.5
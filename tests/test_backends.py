@@ -0,0 +1,142 @@
+"""
+Tests for parser backend selection
+"""
+
+import json
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+from jsongeek.core.backends import (
+    BackendSelector,
+    ParserBackend,
+    calibrate,
+    get_backend_stats,
+    load_calibration,
+    register_backend,
+    reset_backend_stats,
+    sample_document,
+    set_selector,
+    unregister_backend,
+)
+from jsongeek.core.tape import build_tape
+
+
+class EchoBackend(ParserBackend):
+    """Third-party style backend used by the tests"""
+
+    name = "echo"
+
+    def parse(self, buf):
+        return json.loads(bytes(buf))
+
+
+@pytest.fixture
+def echo_backend():
+    register_backend("echo", EchoBackend)
+    yield "echo"
+    unregister_backend("echo")
+    set_selector(None)
+
+
+def test_selector_routes_by_size():
+    """Test that thresholds are applied in order with fallbacks"""
+    selector = BackendSelector([(100, "json"), (None, "wasm-simd"), (None, "json")])
+    assert selector.select(50, ["json", "wasm-simd"]) == "json"
+    assert selector.select(500, ["json", "wasm-simd"]) == "wasm-simd"
+    assert selector.select(500, ["json"]) == "json"
+
+
+def test_forced_backend_and_counters(echo_backend):
+    """Test forcing a registered backend and counting its traffic"""
+    reset_backend_stats()
+    with JSONParser(backend=echo_backend) as parser:
+        assert parser.parse(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert get_backend_stats()[echo_backend] == {"calls": 1, "bytes": 13}
+
+
+def test_unknown_backend():
+    """Test that an unknown backend is rejected"""
+    with pytest.raises(ValueError):
+        JSONParser(backend="missing")
+
+
+def test_results_identical_across_backends(echo_backend):
+    """Test that every backend returns the same objects"""
+    doc = sample_document(2048)
+    with JSONParser(backend="json") as stdlib, JSONParser(backend=echo_backend) as echo:
+        assert stdlib.parse(doc) == echo.parse(doc) == json.loads(doc)
+
+
+def test_calibration_is_persisted(tmp_path, echo_backend):
+    """Test that calibration writes crossover points that load back"""
+    path = str(tmp_path / "calibration.json")
+    selector = calibrate(["json", echo_backend], sizes=(64, 1024), repeat=1, path=path)
+    loaded = load_calibration(path)
+    assert loaded is not None
+    assert loaded.thresholds == selector.thresholds
+
+
+def test_parse_batch_reports_per_document_errors():
+    """Test that a malformed document only fails its own entry"""
+    with JSONParser() as parser:
+        results = parser.parse_batch([b'{"a": 1}', b'{"a": ]', "[true]"])
+    assert results[0] == {"a": 1}
+    assert isinstance(results[1], JSONParseError)
+    assert results[1].position == 6
+    assert results[2] == [True]
+
+
+def test_non_standard_constants_rejected_at_any_size():
+    """Test that NaN and Infinity fail the same way whichever backend is picked"""
+    large = sample_document(256 * 1024)
+    for doc in (
+        b"[1, NaN]",
+        large[:-1] + b", NaN]",
+        b'{"a": Infinity}',
+        large[:-1] + b", -Infinity]",
+    ):
+        with pytest.raises(JSONParseError) as stdlib:
+            JSONParser(backend="json").parse(doc)
+        with pytest.raises(JSONParseError) as default:
+            JSONParser().parse(doc)
+        with pytest.raises(JSONParseError) as tape:
+            build_tape(doc)
+        assert stdlib.value.position == default.value.position == tape.value.position
+
+
+def test_uncalibrated_default_is_stdlib():
+    """Test that only a measured crossover moves inputs off the stdlib backend"""
+    selector = BackendSelector()
+    for size in (10, 10_000, 10_000_000):
+        assert selector.select(size, ["json", "wasm-simd", "wasm-scalar"]) == "json"
+
+
+def test_tape_only_backends_skip_full_parses(echo_backend):
+    """Test that full parses never reach a tape-only backend, even when forced"""
+
+    class TapeOnlyBackend(ParserBackend):
+        full_parse = False
+        native_tape = True
+
+        def parse_batch(self, bufs):
+            return [json.loads(bytes(buf)) for buf in bufs]
+
+    register_backend("tape-only", TapeOnlyBackend)
+    try:
+        set_selector(BackendSelector([(None, "tape-only"), (None, "json")]))
+        with JSONParser() as parser:
+            assert parser.parse(b"[1]") == [1]
+            assert parser._last_backend == "json"
+        with JSONParser(backend="tape-only") as parser:
+            assert parser.parse(b"[1]") == [1]
+            assert parser._last_backend == "json"
+            assert parser.parse_lazy(b'{"a": [1]}')["a"][0] == 1
+            assert parser._last_backend == "tape-only"
+            assert parser.parse_batch([b"[1]", b"{}"]) == [[1], {}]
+            assert parser._last_backend == "tape-only"
+        for names in (None, ["tape-only", "json"]):
+            selector = calibrate(names, sizes=(64,), repeat=1, persist=False)
+            assert "tape-only" not in [name for _, name in selector.thresholds]
+    finally:
+        unregister_backend("tape-only")
@@ -0,0 +1,150 @@
+"""
+Tests for the parallel block container
+"""
+
+import io
+import json
+import struct
+
+import pytest
+
+from jsongeek.utils.blocks import BlockReader, BlockWriter, compress_blocks
+from jsongeek.utils.compression import FrameError, SmartCompressor
+
+LINES = [
+    json.dumps({"id": i, "name": f"user {i}", "tags": ["x"] * (i % 4)}).encode()
+    for i in range(20000)
+]
+NDJSON = b"\n".join(LINES) + b"\n"
+
+
+def test_blocks_align_to_records():
+    """Test that blocks end at newlines and the index counts every record"""
+    container = compress_blocks(NDJSON, block_size=64 * 1024, workers=4)
+    reader = BlockReader(container)
+    assert len(reader.blocks) > 5
+    assert reader.record_count == len(LINES)
+    assert reader.size == len(NDJSON)
+    for i in range(len(reader.blocks)):
+        assert reader.read_block(i).endswith(b"\n")
+    assert reader.read_all() == NDJSON
+    assert len(container) < len(NDJSON) / 3
+
+
+def test_random_access():
+    """Test record and byte range lookups from bytes and file objects"""
+    container = compress_blocks(NDJSON, block_size=32 * 1024, workers=3)
+    for source in (container, io.BytesIO(container)):
+        reader = BlockReader(source)
+        assert reader.record(0) == LINES[0]
+        assert reader.record(12345) == LINES[12345]
+        assert reader.record(len(LINES) - 1) == LINES[-1]
+        assert reader.records(4990, 5100) == LINES[4990:5100]
+        assert reader.read_range(100000, 300000) == NDJSON[100000:300000]
+        assert reader.read_range(len(NDJSON) - 5, len(NDJSON) + 100) == NDJSON[-5:]
+        with pytest.raises(IndexError):
+            reader.record(len(LINES))
+
+
+def test_negative_bounds_are_rejected():
+    """Test that ranges do not silently come back empty for negative bounds"""
+    reader = BlockReader(compress_blocks(NDJSON[:10000], block_size=1000))
+    for start, stop in ((-5, 20), (0, -1)):
+        with pytest.raises(ValueError):
+            reader.read_range(start, stop)
+    for start, stop in ((-2, 3), (0, -1)):
+        with pytest.raises(ValueError):
+            reader.records(start, stop)
+    assert reader.records(2) == reader.records(2, reader.record_count)
+
+
+class ScanCountingBuffer(bytearray):
+    """Bytearray that adds up the bytes its newline searches cover"""
+
+    scanned = 0
+
+    def find(self, sub, start=0, end=None):
+        end = len(self) if end is None else end
+        ScanCountingBuffer.scanned += end - start
+        return bytearray.find(self, sub, start, end)
+
+    def rfind(self, sub, start=0, end=None):
+        end = len(self) if end is None else end
+        ScanCountingBuffer.scanned += end - start
+        return bytearray.rfind(self, sub, start, end)
+
+
+def test_oversized_record_is_scanned_once():
+    """Test that a record longer than a block is not rescanned on every write"""
+    fp = io.BytesIO()
+    ScanCountingBuffer.scanned = 0
+    with BlockWriter(fp, block_size=100, workers=1) as writer:
+        writer._buffer = ScanCountingBuffer()
+        for _ in range(1000):
+            writer.write(b"x" * 10)
+        writer.write(b"\n")
+    assert ScanCountingBuffer.scanned < 20000
+    assert BlockReader(fp.getvalue()).record(0) == b"x" * 10000
+
+
+def test_writer_streams_records():
+    """Test incremental writes, oversized records and unaligned blocks"""
+    fp = io.BytesIO()
+    with BlockWriter(
+        fp, block_size=1000, workers=2, compressor=SmartCompressor(codec="bz2")
+    ) as writer:
+        writer.write_records(line.decode() for line in LINES[:500])
+        writer.write(b"x" * 5000 + b"\n")
+        writer.write(b'{"last": true}')
+    assert writer.get_stats()["records"] == 502
+    reader = BlockReader(fp.getvalue())
+    assert reader.record(500) == b"x" * 5000
+    assert reader.record(501) == b'{"last": true}'
+    assert reader.records(0, 500) == LINES[:500]
+    raw = compress_blocks(b"abcdefghij" * 1000, block_size=333, records=False)
+    reader = BlockReader(raw)
+    assert reader.record_count == 0
+    assert reader.read_range(1000, 2000) == (b"abcdefghij" * 1000)[1000:2000]
+
+
+def test_corrupt_container():
+    """Test that damaged containers are rejected"""
+    container = compress_blocks(NDJSON[:10000])
+    with pytest.raises(FrameError):
+        BlockReader(container[:-3])
+    with pytest.raises(FrameError):
+        BlockReader(NDJSON)
+
+
+def _patch_entry(container, i, **fields):
+    """Rewrite fields of the i-th index entry of a container"""
+    footer = struct.Struct("<QQ4s")
+    entry = struct.Struct("<QQQQ")
+    index_offset, _, _ = footer.unpack(container[-footer.size :])
+    position = index_offset + i * entry.size
+    values = dict(
+        zip(
+            ("offset", "compressed_size", "size", "records"),
+            entry.unpack_from(container, position),
+        )
+    )
+    values.update(fields)
+    patched = bytearray(container)
+    entry.pack_into(patched, position, *values.values())
+    return bytes(patched)
+
+
+def test_index_is_checked_against_blocks():
+    """Test that blocks must match the sizes recorded in the index"""
+    container = compress_blocks(NDJSON[:10000], block_size=4096)
+    block = BlockReader(container).blocks[0]
+    for fields in (
+        {"size": block.size - 1},
+        {"size": block.size + 1},
+        {"compressed_size": len(container)},
+    ):
+        reader = BlockReader(_patch_entry(container, 0, **fields))
+        with pytest.raises(FrameError):
+            reader.read_block(0)
+        with pytest.raises(FrameError):
+            BlockReader(io.BytesIO(_patch_entry(container, 0, **fields))).read_block(0)
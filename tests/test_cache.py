@@ -0,0 +1,103 @@
+"""
+Tests for the parse result cache
+"""
+
+import json
+import zlib
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser, loads
+from jsongeek.core.cache import ParseCache, get_default_cache
+
+DOC = b'{"config": {"retries": 3, "hosts": ["a", "b"]}}'
+
+
+def test_hits_return_fresh_copies():
+    """Test that cached results cannot be corrupted by callers"""
+    cache = ParseCache()
+    with JSONParser(backend="json", cache=cache) as parser:
+        first = parser.parse(DOC)
+        first["config"]["hosts"].append("c")
+        second = parser.parse(bytearray(DOC))
+    assert second == {"config": {"retries": 3, "hosts": ["a", "b"]}}
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["bytes"] > 0
+
+
+def test_str_and_bytes_share_entries():
+    """Test that the key depends on the content only"""
+    cache = ParseCache()
+    with JSONParser(backend="json", cache=cache) as parser:
+        parser.parse(DOC.decode())
+        parser.parse(memoryview(DOC))
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_eviction_by_size():
+    """Test that least recently used entries go once the byte budget is exceeded"""
+    cache = ParseCache(max_bytes=200)
+    docs = [b'["%s"]' % (b"x" * 60 + bytes([65 + i])) for i in range(4)]
+    with JSONParser(backend="json", cache=cache) as parser:
+        for doc in docs:
+            parser.parse(doc)
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 200
+        assert stats["evictions"] == 4 - stats["entries"]
+        parser.parse(docs[-1])
+        assert cache.get_stats()["hits"] == 1
+        parser.parse(docs[0])
+        assert cache.get_stats()["hits"] == 1
+
+
+def test_oversized_and_failed_parses_are_not_cached():
+    """Test that values larger than the cache and errors are never stored"""
+    cache = ParseCache(max_bytes=8)
+    with JSONParser(backend="json", cache=cache) as parser:
+        parser.parse(DOC)
+        with pytest.raises(Exception):
+            parser.parse(b"{")
+    assert len(cache) == 0
+
+
+def test_compression_is_part_of_the_key():
+    """Test that compressed input cached by one parser does not leak to another"""
+    cache = ParseCache()
+    packed = zlib.compress(DOC)
+    with JSONParser(backend="json", cache=cache) as parser:
+        assert parser.parse(packed)["config"]["retries"] == 3
+    with JSONParser(backend="json", cache=cache, enable_compression=False) as parser:
+        with pytest.raises(Exception):
+            parser.parse(packed)
+
+
+def test_limits_are_part_of_the_key():
+    """Test that a result cached under loose limits is not served to a strict parser"""
+    cache = ParseCache()
+    deep = b"[" * 10 + b"]" * 10
+    long_string = json.dumps("x" * 5000).encode()
+    with JSONParser(backend="json", cache=cache) as parser:
+        parser.parse(deep)
+        parser.parse(long_string)
+    with JSONParser(backend="json", cache=cache, max_depth=3) as parser:
+        with pytest.raises(JSONParseError):
+            parser.parse(deep)
+    with JSONParser(backend="json", cache=cache, max_string_length=10) as parser:
+        with pytest.raises(JSONParseError):
+            parser.parse(long_string)
+    with JSONParser(backend="json", cache=cache) as parser:
+        assert parser.parse(long_string) == "x" * 5000
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_loads_uses_shared_cache():
+    """Test that loads(cache=True) reuses the process-wide cache"""
+    cache = get_default_cache()
+    before = cache.get_stats()["hits"]
+    for _ in range(3):
+        assert loads(DOC, backend="json", cache=True)["config"]["retries"] == 3
+    assert cache.get_stats()["hits"] - before >= 2
+    with JSONParser(backend="json", cache=True) as parser:
+        assert parser.get_performance_metrics()["cache"]["max_bytes"] == cache.max_bytes
@@ -0,0 +1,115 @@
+"""
+Tests for columnar extraction
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+
+RECORDS = b"""[
+  {"ts": 1, "value": 1.5, "host": "a", "ok": true},
+  {"ts": 2, "value": null, "host": "b\\u00e9"},
+  {"ts": 3, "value": 2, "ok": false}
+]"""
+
+
+@pytest.fixture
+def parser():
+    with JSONParser(backend="json") as parser:
+        yield parser
+
+
+def test_columns_inferred(parser):
+    """Test typed columns and masks for null and missing values"""
+    columns = parser.parse_columns(RECORDS)
+    assert list(columns) == ["ts", "value", "host", "ok"]
+    assert columns["ts"].dtype == np.int64
+    assert columns["ts"].tolist() == [1, 2, 3]
+    assert columns["value"].dtype == np.float64
+    assert columns["value"].mask.tolist() == [False, True, False]
+    assert columns["host"].tolist() == ["a", "bé", None]
+    assert columns["ok"].dtype == np.bool_
+    assert columns["ok"].tolist() == [True, None, False]
+
+
+def test_columns_selected_with_dtypes(parser):
+    """Test choosing fields and dtypes"""
+    columns = parser.parse_columns(
+        RECORDS, fields=["host", "ts", "nope"], dtypes={"host": "U2", "ts": np.float32}
+    )
+    assert list(columns) == ["host", "ts", "nope"]
+    assert columns["host"].dtype == np.dtype("U2")
+    assert columns["ts"].dtype == np.float32
+    assert columns["nope"].mask.all()
+
+
+def test_columns_require_records(parser):
+    """Test that other document shapes are rejected"""
+    with pytest.raises(JSONParseError):
+        parser.parse_columns(b'[{"a": 1}, 2]')
+    with pytest.raises(JSONParseError):
+        parser.parse_columns(b'{"a": 1}')
+
+
+def test_columns_integers_beyond_int64(parser):
+    """Test that inferred columns keep huge integers exact and typed ones reject them"""
+    doc = b'[{"n": 1}, {"n": 9223372036854775808}, {"n": -9223372036854775809}]'
+    columns = parser.parse_columns(doc)
+    assert columns["n"].dtype == object
+    assert columns["n"].tolist() == [1, 2**63, -(2**63) - 1]
+    with pytest.raises(JSONParseError):
+        parser.parse_columns(doc, dtypes={"n": np.int64})
+
+
+def test_columns_with_one_long_string(parser):
+    """Test that one long value does not make the whole column that wide"""
+    import tracemalloc
+
+    rows = [{"id": i, "s": "x%d" % i, "k%d" % (i % 3): 1} for i in range(2000)]
+    rows[7]["s"] = "é" * 10000
+    rows[9]["s"] = "tab\\t"
+    doc = json.dumps(rows).encode()
+    tracemalloc.start()
+    try:
+        columns = parser.parse_columns(doc)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert columns["s"].tolist() == [row["s"] for row in rows]
+    assert columns["id"].tolist() == list(range(2000))
+    assert list(columns) == ["id", "s", "k0", "k1", "k2"]
+    # A dense column would take 2000 x 20000 bytes, four times that decoded
+    assert peak < 10_000_000
+
+
+def test_columns_match_tape_extraction(parser):
+    """Test that the json.loads fallback builds the same columns as the tape"""
+    from jsongeek.core.columns import extract_columns
+
+    rows = [
+        {
+            "id": i,
+            "x": i / 2 if i % 3 else i,
+            "s": "v%d" % (i % 4),
+            "b": i % 2 == 0,
+            "mixed": [i] if i % 5 == 0 else "t",
+            "n": None if i % 7 else 2**64,
+        }
+        for i in range(300)
+    ]
+    del rows[4]["s"]
+    doc = json.dumps(rows).encode()
+    for fields, dtypes in (
+        (None, None),
+        (["s", "id", "none"], {"s": "U1", "id": np.float32}),
+    ):
+        fallback = parser.parse_columns(doc, fields=fields, dtypes=dtypes)
+        tape = extract_columns(parser.parse_tape(doc), fields, dtypes)
+        assert list(fallback) == list(tape)
+        for name in tape:
+            assert fallback[name].dtype == tape[name].dtype, name
+            assert fallback[name].mask.tolist() == tape[name].mask.tolist(), name
+            assert fallback[name].tolist() == tape[name].tolist(), name
@@ -0,0 +1,264 @@
+"""
+Tests for adaptive compression level selection and framing
+"""
+
+import gzip
+import io
+import json
+import os
+import struct
+import zlib
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser, loads
+from jsongeek.core.stream import StreamParser
+from jsongeek.utils import compression
+from jsongeek.utils.compression import (
+    FRAME_HEADER_SIZE,
+    FrameError,
+    SmartCompressor,
+    StreamDecompressor,
+    available_codecs,
+    frame_length,
+    pack_frame,
+    unpack_frame,
+)
+
+PAYLOAD = json.dumps(
+    [{"id": i, "name": f"user {i % 50}", "active": i % 3 == 0} for i in range(5000)]
+).encode()
+
+
+def test_compresses_once_and_round_trips():
+    """Test that the output is one framed zlib stream at the recorded level"""
+    compressor = SmartCompressor()
+    packed = compressor.compress(PAYLOAD)
+    assert frame_length(packed) == len(PAYLOAD)
+    assert zlib.decompress(packed[FRAME_HEADER_SIZE:]) == PAYLOAD
+    assert compressor.decompress(packed) == PAYLOAD.decode()
+    stats = compressor.get_stats()
+    assert 1 <= stats["compression_level"] <= 6
+    assert stats["compression_time"] > 0
+    assert stats["compressed_size"] == len(packed)
+    assert compressor.get_ratio() == len(packed) / len(PAYLOAD)
+
+
+def test_level_bounds_and_target():
+    """Test that the level stays within compression_level and a loose target is fast"""
+    assert SmartCompressor(compression_level=1).choose_level(10**6, 0.2) == 1
+    compressor = SmartCompressor(compression_level=9)
+    assert compressor.choose_level(10**6, 0.2) > 1
+    assert (
+        SmartCompressor(compression_level=9, target_ratio=0.5).choose_level(10**6, 0.2)
+        == 1
+    )
+
+
+def test_time_budget():
+    """Test that a tight CPU budget keeps the level low"""
+    compressor = SmartCompressor(compression_level=9, time_budget=1e-9)
+    compressor.compress(PAYLOAD)
+    assert compressor.get_stats()["compression_level"] == 1
+
+
+def test_incompressible_data_is_framed_uncompressed():
+    """Test that random bytes skip the compression pass"""
+    compressor = SmartCompressor()
+    data = os.urandom(50000)
+    packed = compressor.compress(data)
+    assert packed[FRAME_HEADER_SIZE:] == data
+    assert compressor.get_stats()["codec"] == "none"
+    assert compressor.get_stats()["compression_level"] == 0
+    assert compressor.decompress_bytes(packed) == data
+    assert compressor.get_ratio() == len(packed) / len(data)
+
+
+def test_model_learns_from_calls():
+    """Test that observed ratios update the per-level estimates"""
+    compressor = SmartCompressor()
+    before = dict(compressor._size)
+    for _ in range(3):
+        compressor.compress(PAYLOAD)
+    assert compressor._size != before
+
+
+def test_small_payloads_are_compressed_once(monkeypatch):
+    """Test that payloads of at most a sample skip sampling and teach the estimate"""
+    from jsongeek.utils import compression
+
+    calls = []
+    compress = zlib.compress
+    monkeypatch.setattr(
+        compression.zlib, "compress", lambda *args: calls.append(1) or compress(*args)
+    )
+    compressor = SmartCompressor(codec="zlib")
+    small = PAYLOAD[:4000]
+    packed = compressor.compress(small)
+    assert len(calls) == 1
+    assert compressor.decompress_bytes(packed) == small
+    assert compressor._ratio != 0.3
+    # Incompressible payloads cannot talk the model out of trying
+    for _ in range(20):
+        compressor.compress(os.urandom(20000))
+    packed = compressor.compress(small)
+    assert compressor.get_stats()["codec"] == "zlib"
+    assert compressor.decompress_bytes(packed) == small
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_codecs_round_trip(codec):
+    """Test that every installed codec decodes through the frame header"""
+    packed = pack_frame(PAYLOAD, codec)
+    assert packed[3] == ["none", "zlib", "gzip", "lzma", "bz2", "zstd", "lz4"].index(
+        codec
+    )
+    assert unpack_frame(packed) == PAYLOAD
+    assert JSONParser(backend="json").parse(packed) == json.loads(PAYLOAD)
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_frames_end_at_their_recorded_length(codec):
+    """Test that a frame must end where its recorded length says"""
+    packed = pack_frame(PAYLOAD, codec)
+    for damaged in (packed + b"x", packed + packed[FRAME_HEADER_SIZE:], packed[:-1]):
+        with pytest.raises(FrameError):
+            unpack_frame(damaged)
+        with pytest.raises(JSONParseError):
+            JSONParser(backend="json").parse(damaged)
+
+
+def test_decoded_size_is_capped_without_max_size(monkeypatch):
+    """Test that an unbounded decode stops at MAX_DECODED_SIZE, not the header"""
+    monkeypatch.setattr(compression, "MAX_DECODED_SIZE", 1000)
+    packed = pack_frame(PAYLOAD)
+    fp = io.BytesIO()
+    with SmartCompressor().compressor(fp) as writer:
+        writer.write(PAYLOAD)
+    lying = packed[:4] + struct.pack("<Q", 2**40) + packed[FRAME_HEADER_SIZE:]
+    for data in (packed, fp.getvalue(), lying):
+        with pytest.raises(FrameError, match="1000"):
+            unpack_frame(data)
+    with pytest.raises(FrameError, match="1000"):
+        SmartCompressor().decompress_bytes(zlib.compress(PAYLOAD))
+    with pytest.raises(JSONParseError):
+        JSONParser(backend="json").parse(packed)
+    assert unpack_frame(packed, max_size=len(PAYLOAD)) == PAYLOAD
+    assert unpack_frame(fp.getvalue(), max_size=len(PAYLOAD)) == PAYLOAD
+
+
+def test_policies():
+    """Test that the policy picks the codec and plain text passes through"""
+    assert SmartCompressor(policy="ratio").choose_codec(10**6, 0.2)[0] == 3
+    compressor = SmartCompressor(codec="bz2")
+    packed = compressor.compress(PAYLOAD)
+    assert compressor.get_stats()["codec"] == "bz2"
+    assert compressor.decompress(packed) == PAYLOAD.decode()
+    assert compressor.decompress(b'{"a": 1}') == '{"a": 1}'
+    with pytest.raises(ValueError):
+        SmartCompressor(policy="fastest")
+
+
+def test_corrupt_frames_are_rejected():
+    """Test that damaged or truncated frames raise instead of passing as text"""
+    packed = SmartCompressor().compress(PAYLOAD)
+    with pytest.raises(FrameError):
+        unpack_frame(packed[:-10])
+    damaged = bytearray(packed)
+    damaged[FRAME_HEADER_SIZE + 20] ^= 0xFF
+    with pytest.raises(FrameError):
+        SmartCompressor().decompress(bytes(damaged))
+    with pytest.raises(FrameError):
+        SmartCompressor().decompress(zlib.compress(PAYLOAD)[:-4])
+    with pytest.raises(JSONParseError, match="Invalid compressed data"):
+        JSONParser(backend="json").parse(bytes(damaged))
+
+
+def test_frame_header_enforces_max_size():
+    """Test that oversized frames are rejected from the header alone"""
+    packed = pack_frame(b"[" + b"0, " * 100000 + b"0]")
+    with pytest.raises(JSONParseError, match="larger than"):
+        JSONParser(backend="json", max_size=1000).parse(packed)
+
+
+DOCS = [{"id": i, "tags": ["a"] * (i % 5)} for i in range(2000)]
+NDJSON = "".join(json.dumps(doc) + "\n" for doc in DOCS).encode()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        NDJSON,
+        zlib.compress(NDJSON),
+        gzip.compress(NDJSON),
+        gzip.compress(NDJSON[:1000]) + gzip.compress(NDJSON[1000:]),
+    ],
+    ids=["plain", "zlib", "gzip", "gzip-members"],
+)
+def test_stream_parser_decompresses(data):
+    """Test that compressed NDJSON streams parse chunk by chunk"""
+    for chunk_size in (3, 8192):
+        assert (
+            list(StreamParser(chunk_size=chunk_size).iter_parse(io.BytesIO(data)))
+            == DOCS
+        )
+
+
+def test_stream_compressor_round_trip():
+    """Test that an incremental frame reads back through every decoder"""
+    fp = io.BytesIO()
+    with SmartCompressor().compressor(fp) as writer:
+        for doc in DOCS:
+            writer.write(json.dumps(doc) + "\n")
+    stats = writer.get_stats()
+    assert stats["codec"] == "zlib"
+    assert stats["bytes_in"] == len(NDJSON) and stats["bytes_out"] == len(fp.getvalue())
+    assert frame_length(fp.getvalue()) is None
+    assert (
+        list(StreamParser(chunk_size=100).iter_parse(io.BytesIO(fp.getvalue()))) == DOCS
+    )
+    fp = io.BytesIO()
+    with SmartCompressor().compressor(fp) as writer:
+        writer.write(b'{"a": 1}')
+    assert loads(fp.getvalue()) == {"a": 1}
+    with pytest.raises(ValueError):
+        SmartCompressor().compressor(io.BytesIO(), max_size=4).write(b"[1, 2]")
+
+
+def test_stream_decompression_is_bounded():
+    """Test that output pieces stay below the chunk size and bombs are stopped"""
+    bomb = gzip.compress(b" " * 10**7)
+    decoder = StreamDecompressor(chunk_size=4096)
+    assert max(len(piece) for piece in decoder.decompress(bomb)) <= 4096
+    with pytest.raises(FrameError):
+        list(StreamDecompressor(max_size=10**5).decompress(bomb))
+    with pytest.raises(JSONParseError, match="larger than"):
+        list(StreamParser(max_size=10**5).iter_parse(io.BytesIO(bomb)))
+    with pytest.raises(JSONParseError, match="Truncated"):
+        list(StreamParser().iter_parse(io.BytesIO(gzip.compress(NDJSON)[:-20])))
+
+
+def test_zstd_stream_decompression():
+    """Test that zstd streams decode in bounded pieces and report their end"""
+    zstandard = pytest.importorskip("zstandard")
+    if "zstd" not in available_codecs():
+        pytest.skip("zstandard is too old to stream")
+    stream = zstandard.ZstdCompressor().compress(NDJSON * 200)
+    for size in (7, len(stream)):
+        decoder = StreamDecompressor(chunk_size=4096)
+        pieces = []
+        for start in range(0, len(stream), size):
+            pieces.extend(decoder.decompress(stream[start : start + size]))
+        pieces.extend(decoder.finish())
+        assert max(len(piece) for piece in pieces) <= 4096
+        assert b"".join(pieces) == NDJSON * 200
+    assert (
+        list(StreamParser(chunk_size=100).iter_parse(io.BytesIO(stream))) == DOCS * 200
+    )
+    bomb = zstandard.ZstdCompressor().compress(b" " * 10**7)
+    with pytest.raises(FrameError):
+        list(StreamDecompressor(max_size=10**5).decompress(bomb))
+    with pytest.raises(JSONParseError, match="Truncated"):
+        list(StreamParser().iter_parse(io.BytesIO(stream[:-20])))
+    packed = pack_frame(PAYLOAD, "zstd")
+    assert unpack_frame(packed) == PAYLOAD
@@ -0,0 +1,107 @@
+"""
+Tests for trained compression dictionaries
+"""
+
+import io
+import json
+import random
+
+import pytest
+
+from jsongeek import JSONParser, loads
+from jsongeek.core.stream import StreamParser
+from jsongeek.utils.compression import (
+    FrameError,
+    SmartCompressor,
+    pack_frame,
+    unpack_frame,
+)
+from jsongeek.utils.dictionary import (
+    CompressionDictionary,
+    get_dictionary,
+    train_dictionary,
+)
+
+
+def _message(rng):
+    return json.dumps(
+        {
+            "event_type": rng.choice(
+                ["order.created", "order.updated", "payment.captured"]
+            ),
+            "order_id": f"ord_{rng.randrange(10 ** 9)}",
+            "customer": {
+                "customer_id": f"cus_{rng.randrange(10 ** 6)}",
+                "country": rng.choice(["US", "DE", "FR"]),
+            },
+            "amount": {"currency": "USD", "value": rng.randrange(10**5)},
+            "metadata": {
+                "source": "checkout-service",
+                "region": rng.choice(["us-east-1", "eu-west-1"]),
+            },
+        }
+    )
+
+
+RNG = random.Random(7)
+TRAINING = [_message(RNG) for _ in range(500)]
+MESSAGES = [_message(RNG) for _ in range(50)]
+
+
+def test_small_messages_compress_with_a_dictionary():
+    """Test that a trained dictionary makes small messages several times smaller"""
+    dictionary = train_dictionary(TRAINING)
+    assert len(dictionary) <= 16384
+    compressor = SmartCompressor(dictionary=dictionary)
+    assert compressor.should_compress(MESSAGES[0])
+    assert not SmartCompressor().should_compress(MESSAGES[0])
+    original = sum(len(message) for message in MESSAGES)
+    packed = [compressor.compress(message) for message in MESSAGES]
+    assert original / sum(len(frame) for frame in packed) > 3
+    assert compressor.get_stats()["dictionary_id"] == dictionary.dict_id
+    # Frames name their dictionary, so any decoder in the process reads them
+    assert [loads(frame) for frame in packed] == [
+        json.loads(message) for message in MESSAGES
+    ]
+    assert SmartCompressor().decompress(packed[0]) == MESSAGES[0]
+
+
+def test_dictionary_versions_and_serialization():
+    """Test that ids follow the content and dictionaries survive a round trip"""
+    first = train_dictionary(TRAINING[:250])
+    second = train_dictionary(TRAINING[250:])
+    assert first.dict_id != second.dict_id
+    copy = CompressionDictionary.from_bytes(first.to_bytes())
+    assert copy.data == first.data and copy.dict_id == first.dict_id
+    with pytest.raises(ValueError):
+        CompressionDictionary.from_bytes(b"JGD\x09" + first.data)
+    with pytest.raises(ValueError):
+        train_dictionary(['{"a": 1}'])
+
+
+def test_unknown_dictionary_is_reported():
+    """Test that frames referencing an unregistered dictionary fail clearly"""
+    dictionary = CompressionDictionary(b'{"unregistered": "dictionary"}')
+    frame = bytearray(
+        pack_frame(b'{"unregistered": "dictionary"}', "zlib", dictionary=dictionary)
+    )
+    frame[12] ^= 0xFF
+    assert get_dictionary(int.from_bytes(frame[12:16], "little")) is None
+    with pytest.raises(FrameError, match="Unknown dictionary"):
+        unpack_frame(bytes(frame))
+    with pytest.raises(ValueError):
+        pack_frame(b"[]", "bz2", dictionary=dictionary)
+
+
+def test_streamed_frames_use_the_dictionary():
+    """Test that the incremental compressor and StreamParser share the dictionary"""
+    compressor = SmartCompressor(dictionary=train_dictionary(TRAINING))
+    fp = io.BytesIO()
+    with compressor.compressor(fp) as writer:
+        for message in MESSAGES:
+            writer.write(message + "\n")
+    assert fp.getvalue()[3] & 0x80
+    parsed = list(StreamParser(chunk_size=7).iter_parse(io.BytesIO(fp.getvalue())))
+    assert parsed == [json.loads(message) for message in MESSAGES]
+    with JSONParser(backend="json") as parser:
+        assert parser.parse(compressor.compress(MESSAGES[0])) == json.loads(MESSAGES[0])
@@ -0,0 +1,64 @@
+"""
+Tests for key interning and string deduplication
+"""
+
+import pytest
+
+from jsongeek import JSONParser
+from jsongeek.core.intern import InternTable
+from jsongeek.core.tape import build_tape
+
+RECORDS = b'[{"status": "active", "name": "x"}, {"status": "active", "name": "y"}]'
+
+
+def test_intern_table_bounded():
+    """Test that a full table stops growing but keeps reusing entries"""
+    table = InternTable(max_size=1, max_length=3)
+    a = table.intern("".join(["a", "b"]))
+    assert table.intern("".join(["a", "b"])) is a
+    table.intern("cd")
+    table.intern("toolong")
+    stats = table.get_stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 1
+    assert stats["saved_bytes"] > 0
+
+
+def test_tape_shares_keys():
+    """Test that records converted from a tape share key strings"""
+    first, second = build_tape(RECORDS).to_python(
+        0, InternTable(), InternTable(max_length=8)
+    )
+    assert [k1 is k2 for k1, k2 in zip(first, second)] == [True, True]
+    assert first["status"] is second["status"]
+
+
+@pytest.mark.parametrize("scope", ["parse", "parser"])
+def test_parser_intern_scope(scope):
+    """Test that per-parser tables also share keys across documents"""
+    with JSONParser(backend="json", intern_scope=scope, dedup_strings=16) as parser:
+        parser.parse(RECORDS)
+        parser.parse(RECORDS)
+        stats = parser.get_performance_metrics()["interning"]
+    if scope == "parser":
+        assert stats["keys"]["hits"] == 6
+        assert stats["strings"]["hits"] == 5
+    else:
+        assert stats["strings"]["hits"] == 2
+
+
+def test_parse_metrics_report_savings():
+    """Test that interning savings show up in the parse metrics"""
+    with JSONParser(backend="json", dedup_strings=16) as parser:
+        metrics = parser.parse_with_metrics(RECORDS)["metrics"]
+    assert metrics["deduplicated_strings"] == 1
+    assert metrics["intern_saved_bytes"] > 0
+    with JSONParser(backend="json") as parser:
+        metrics = parser.parse_with_metrics(RECORDS)["metrics"]
+    assert metrics["interned_keys"] is metrics["intern_saved_bytes"] is None
+
+
+def test_invalid_intern_scope():
+    """Test that unknown scopes are rejected"""
+    with pytest.raises(ValueError):
+        JSONParser(intern_scope="process")
@@ -0,0 +1,147 @@
+"""
+Tests for lazy documents
+"""
+
+import json
+import mmap
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser, LazyDocument
+from jsongeek.core.tape import build_tape
+
+DOCUMENT = (
+    '{"id": 7, "user": {"name": "Ann", "tags": ["a", "b"]}, '
+    '"items": [1, 2.5, null], "id": 8}'
+)
+
+
+@pytest.fixture
+def parser():
+    with JSONParser(backend="json") as parser:
+        yield parser
+
+
+def lazy(data):
+    """Build a tape-backed document like a native backend would"""
+    if isinstance(data, str):
+        data = data.encode()
+    return LazyDocument(build_tape(memoryview(data)))
+
+
+def test_lazy_access():
+    """Test indexing, get, len and iteration on lazy containers"""
+    doc = lazy(DOCUMENT)
+    assert isinstance(doc, LazyDocument)
+    assert doc["id"] == 8
+    assert doc["user"]["tags"][-1] == "b"
+    assert doc.get("missing", 0) == 0
+    assert len(doc) == 3
+    assert list(doc) == ["id", "user", "items"]
+    assert list(doc["items"]) == [1, 2.5, None]
+    assert doc["items"][:2] == [1, 2.5]
+
+
+def test_lazy_values_cached():
+    """Test that repeated access returns the same decoded object"""
+    doc = lazy(DOCUMENT)
+    assert doc["user"] is doc["user"]
+    assert doc["user"]["name"] is doc["user"]["name"]
+
+
+def test_lazy_materialize():
+    """Test building the full plain result"""
+    doc = lazy(DOCUMENT)
+    assert doc.materialize() == json.loads(DOCUMENT)
+    assert doc["user"].materialize() == json.loads(DOCUMENT)["user"]
+    assert dict(doc["user"]) == {"name": "Ann", "tags": doc["user"]["tags"]}
+
+
+def test_lazy_keeps_input_buffer():
+    """Test that the document references the input instead of copying it"""
+    data = bytearray(b'{"a": "x"}')
+    doc = lazy(data)
+    assert doc.tape.buf.obj is data
+    assert doc["a"] == "x"
+
+
+def test_stdlib_backend_parses_eagerly(parser):
+    """Test that backends without a native tape skip the Python tape"""
+    doc = parser.parse_lazy(DOCUMENT)
+    assert isinstance(doc, LazyDocument)
+    assert doc.tape is None
+    assert doc["id"] == 8
+    assert doc["user"]["tags"][-1] == "b"
+    assert doc.get("missing", 0) == 0
+    assert list(doc) == ["id", "user", "items"]
+    assert doc.materialize() == json.loads(DOCUMENT)
+
+
+def test_eager_fallback_releases_mmap(parser, tmp_path):
+    """Test that an mmap input can be closed once an eager parse returns or fails"""
+    path = tmp_path / "doc.json"
+    path.write_text(DOCUMENT)
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"a": [1')
+    with open(path, "rb") as f, open(broken, "rb") as g:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        doc = parser.parse_lazy(mapped)
+        assert parser.extract(mapped, ["/id"]) == {"/id": [8]}
+        mapped.close()
+        assert doc["user"]["tags"][-1] == "b"
+        mapped = mmap.mmap(g.fileno(), 0, access=mmap.ACCESS_READ)
+        with pytest.raises(JSONParseError) as error:
+            parser.parse_lazy(mapped)
+        # The traceback keeps the failed call's frames alive
+        assert error.traceback
+        mapped.close()
+
+
+def test_default_parser_is_lazy_without_calibration(monkeypatch):
+    """Test that a native tape backend is the default and input is decompressed once"""
+    from jsongeek import dumpb
+    from jsongeek.core.backends import (
+        ParserBackend,
+        register_backend,
+        set_selector,
+        unregister_backend,
+    )
+    from jsongeek.utils.compression import SmartCompressor
+
+    class NativeTapeBackend(ParserBackend):
+        native_tape = True
+        full_parse = False
+
+        def parse_tape(self, buf):
+            return build_tape(buf)
+
+    with JSONParser() as default:
+        # Eager unless a native tape backend such as wasm is installed
+        assert (default.parse_lazy(DOCUMENT).tape is None) == (
+            not default._tape_backends
+        )
+
+    calls = []
+    decompress = SmartCompressor.decompress_bytes
+    monkeypatch.setattr(
+        SmartCompressor,
+        "decompress_bytes",
+        lambda self, *args: calls.append(1) or decompress(self, *args),
+    )
+    register_backend("native-tape", NativeTapeBackend)
+    set_selector(None)
+    try:
+        with JSONParser() as parser:
+            doc = parser.parse_lazy(DOCUMENT)
+            assert doc.tape is not None
+            assert doc.materialize() == json.loads(DOCUMENT)
+            packed = dumpb([json.loads(DOCUMENT)] * 200)
+            calls.clear()
+            assert parser.extract(packed, ["$[3].user.name"]) == {
+                "$[3].user.name": ["Ann"]
+            }
+            assert len(calls) == 1
+            assert parser.parse(DOCUMENT)["id"] == 8
+            assert parser._last_backend != "native-tape"
+    finally:
+        unregister_backend("native-tape")
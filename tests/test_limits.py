@@ -0,0 +1,121 @@
+"""
+Tests for parse resource limits
+"""
+
+import json
+import zlib
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+from jsongeek.core.limits import ParseLimits, check_limits
+
+
+def error_of(data, **limits) -> JSONParseError:
+    """Parse with the json backend and return the raised error"""
+    with JSONParser(backend="json", **limits) as parser:
+        with pytest.raises(JSONParseError) as info:
+            parser.parse(data)
+    return info.value
+
+
+def test_depth_position():
+    """Test that the opening bracket past the limit is reported"""
+    error = error_of('{"a": {"b": {"c": 1}}}', max_depth=2)
+    assert "Nesting too deep" in str(error)
+    assert error.position == 12
+    with JSONParser(backend="json", max_depth=3) as parser:
+        assert parser.parse('{"a": {"b": {"c": 1}}}')["a"]["b"]["c"] == 1
+        # Brackets inside strings do not count
+        assert parser.parse('["[[[[", {"k": "{{{{"}]')[0] == "[[[["
+
+
+def test_string_and_number_length():
+    """Test limits on token lengths"""
+    doc = '{"short": "abc", "long": "abcdefgh"}'
+    error = error_of(doc, max_string_length=5)
+    assert "String too long" in str(error)
+    assert error.position == doc.index('"abcdefgh"')
+    doc = "[1, -12.5e10, 123456789]"
+    error = error_of(doc, max_number_length=8)
+    assert "Number too long" in str(error)
+    assert error.position == doc.index("123456789")
+
+
+def test_escaped_quotes():
+    """Test that escaped quotes do not end strings early"""
+    doc = r'["a\"[[[[", "b\\", "cccccccc"]'
+    with JSONParser(backend="json", max_depth=1, max_string_length=8) as parser:
+        assert parser.parse(doc)[1] == "b\\"
+    assert error_of(doc, max_string_length=7).position == doc.index('"cccccccc"')
+
+
+@pytest.mark.parametrize(
+    "doc,depth",
+    [
+        (b'[[[{"a": []}]]]', 5),
+        (b'[["]]]]]", {"k]": [[]]}]]', 5),
+        (b'["\\"]]]", [["\\\\"], {}]]', 3),
+        (b"[" * 40 + b"]" * 40, 40),
+        (b'[["a", "b"], [{"c": ["d", ""]}]]', 4),
+        (b'["[", "]", [["x"]]]', 3),
+    ],
+)
+def test_depth_precheck_with_many_containers(doc, depth):
+    """Test that the cheap depth bound sees through brackets inside strings"""
+    # Wrapped with enough siblings to defeat the container count bound
+    doc = b"[" + b", ".join([doc] + [b"[]"] * 40) + b"]"
+    check_limits(doc, ParseLimits(max_depth=depth + 1))
+    with pytest.raises(JSONParseError):
+        check_limits(doc, ParseLimits(max_depth=depth))
+    # Views that do not cover a bytes object take the same passes
+    view = memoryview(b" " + doc)[1:]
+    check_limits(view, ParseLimits(max_depth=depth + 1))
+    with pytest.raises(JSONParseError):
+        check_limits(view, ParseLimits(max_depth=depth))
+
+
+def test_element_count():
+    """Test that values and keys are counted and the first extra one reported"""
+    doc = '{"a": [true, null, 1], "b": "x"}'
+    with JSONParser(backend="json", max_elements=8) as parser:
+        assert parser.parse(doc)["b"] == "x"
+    error = error_of(doc, max_elements=7)
+    assert "Too many elements" in str(error)
+    assert error.position == doc.index('"x"')
+
+
+def test_max_size():
+    """Test the size limit, including on decompressed payloads"""
+    assert error_of(b"[" + b"1, " * 100 + b"1]", max_size=64).position == 64
+    bomb = zlib.compress(b"[" + b"0, " * 100000 + b"0]")
+    assert len(bomb) < 1024
+    assert "larger than 1024 bytes" in str(error_of(bomb, max_size=1024))
+
+
+def test_max_size_rejects_truncated_zlib():
+    """Test that a bounded inflate still requires the whole zlib stream"""
+    payload = zlib.compress(json.dumps({"rows": list(range(1000))}).encode())
+    with JSONParser(backend="json", max_size=100000) as parser:
+        assert parser.parse(payload)["rows"][-1] == 999
+        for broken in (payload[:-3], payload[: len(payload) // 2], payload + b"xx"):
+            with pytest.raises(JSONParseError) as error:
+                parser.parse(broken)
+            assert "Invalid compressed data" in str(error.value)
+
+
+def test_batch_errors_are_per_document():
+    """Test that a document over a limit does not fail the batch"""
+    with JSONParser(backend="json", max_depth=1) as parser:
+        results = parser.parse_batch([b"[1]", b"[[1]]"])
+    assert results[0] == [1]
+    assert isinstance(results[1], JSONParseError)
+
+
+def test_scan_on_memory_views():
+    """Test views that do not cover a bytes object, such as slices and mmaps"""
+    data = memoryview(b'xx[[["' + b"s" * 20 + b'"]]]')[2:]
+    check_limits(data, ParseLimits(max_depth=3))
+    with pytest.raises(JSONParseError):
+        check_limits(data, ParseLimits(max_depth=3, max_string_length=10))
+    check_limits(data, ParseLimits(max_depth=None))
@@ -0,0 +1,122 @@
+"""
+Tests for parse instrumentation
+"""
+
+import zlib
+
+import pytest
+
+from jsongeek import JSONParser
+from jsongeek.core.metrics import (
+    LATENCY_BUCKETS_NS,
+    Instrumentation,
+    MetricsCollector,
+    get_metrics,
+    reset_metrics,
+)
+
+DOC = '{"a": [1, 2, 3], "b": "text"}'
+
+
+def test_disabled_by_default():
+    """Test that parses are not timed unless instrumentation is enabled"""
+    with JSONParser(backend="json") as parser:
+        parser.parse(DOC)
+        assert parser.metrics_snapshot()["counters"] == {}
+
+
+def test_phase_timings():
+    """Test that every parse records counters and phase histograms"""
+    with JSONParser(backend="json", instrument=True) as parser:
+        for _ in range(3):
+            assert parser.parse(DOC)["b"] == "text"
+        snapshot = parser.metrics_snapshot()
+    assert snapshot["counters"] == {"parses": 3, "bytes": 3 * len(DOC), "errors": 0}
+    phases = snapshot["phases"]
+    assert set(phases) == {"encode", "decompress", "convert", "total"}
+    total = phases["total"]
+    assert total["count"] == 3
+    assert sum(total["buckets"]) == 3
+    assert len(total["buckets"]) == len(snapshot["buckets_ns"]) + 1
+    assert total["total_ns"] >= phases["convert"]["total_ns"]
+    assert total["max_ns"] >= total["mean_ns"] > 0
+
+
+def test_sampling_rate():
+    """Test that sampling times a fixed fraction of parses"""
+    with JSONParser(backend="json", instrument=True, sample_rate=0.25) as parser:
+        for _ in range(8):
+            parser.parse(DOC.encode())
+        assert parser.metrics_snapshot()["counters"]["parses"] == 2
+    with pytest.raises(ValueError):
+        JSONParser(instrument=True, sample_rate=2)
+
+
+def test_errors_and_reset():
+    """Test that failed parses are counted and reset clears the parser metrics"""
+    with JSONParser(backend="json", instrument=True) as parser:
+        with pytest.raises(Exception):
+            parser.parse("{")
+        assert parser.metrics_snapshot()["counters"]["errors"] == 1
+        parser.reset_metrics()
+        assert parser.metrics_snapshot() == {
+            "counters": {},
+            "phases": {},
+            "buckets_ns": list(LATENCY_BUCKETS_NS),
+        }
+
+
+def test_batch_errors_are_recorded():
+    """Test that a failing batch counts as an error and leaves no sample open"""
+    with JSONParser(backend="json", instrument=True) as parser:
+        assert parser.parse_batch([DOC, b"[1]"])[1] == [1]
+        with pytest.raises(TypeError):
+            parser.parse_batch([DOC, 42])
+        assert not parser._instrumentation.active
+        backend = parser._get_backend("json")
+        backend.parse_batch = lambda bufs: 1 / 0
+        with pytest.raises(ZeroDivisionError):
+            parser.parse_batch([DOC])
+        assert parser.metrics_snapshot()["counters"]["errors"] == 2
+        assert parser.metrics_snapshot()["counters"]["parses"] == 3
+
+
+def test_process_metrics():
+    """Test that all parsers feed the process-wide collector"""
+    reset_metrics()
+    for _ in range(2):
+        with JSONParser(backend="json", instrument=True) as parser:
+            parser.parse(DOC)
+    assert get_metrics()["counters"]["parses"] == 2
+    reset_metrics()
+    assert get_metrics()["counters"] == {}
+
+
+def test_parse_with_metrics():
+    """Test per-call phases, without psutil and regardless of sampling"""
+    with JSONParser(backend="json", instrument=True, sample_rate=0.0) as parser:
+        metrics = parser.parse_with_metrics(zlib.compress(DOC.encode()))["metrics"]
+    assert metrics["parse_time"] > 0
+    assert metrics["memory_used"] == 0
+    assert {"decompress", "convert", "total"} <= set(metrics["phases"])
+
+
+def test_allocation_tracing():
+    """Test tracemalloc-based allocation accounting"""
+    with JSONParser(backend="json", trace_allocations=True) as parser:
+        metrics = parser.parse_with_metrics("[" + ", ".join(['"x" '] * 2000) + "]")[
+            "metrics"
+        ]
+        assert metrics["memory_used"] > 0
+        assert parser.metrics_snapshot()["counters"]["allocated_bytes"] > 0
+
+
+def test_collector_buckets():
+    """Test that samples land in the bucket of their upper bound"""
+    collector = MetricsCollector()
+    collector.record({"total": 1000}, {})
+    collector.record({"total": 10**12}, {})
+    buckets = collector.snapshot()["phases"]["total"]["buckets"]
+    assert buckets[0] == 1 and buckets[-1] == 1
+    instrumentation = Instrumentation(enabled=False)
+    assert not instrumentation.enabled and not instrumentation.active
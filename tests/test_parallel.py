@@ -0,0 +1,45 @@
+"""
+Tests for multi-core batch parsing
+"""
+
+import json
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+
+DOCS = [json.dumps({"id": i, "tags": ["a", "b"]}).encode() for i in range(100)]
+
+
+@pytest.fixture
+def parser():
+    with JSONParser(backend="json") as parser:
+        yield parser
+
+
+def test_parse_many_ordered(parser):
+    """Test that results come back in input order"""
+    results = list(parser.parse_many(DOCS, workers=2, batch_size=7))
+    assert results == [json.loads(doc) for doc in DOCS]
+
+
+def test_parse_many_unordered(parser):
+    """Test that unordered results carry their input index"""
+    results = dict(
+        parser.parse_many(iter(DOCS), workers=2, batch_size=7, ordered=False)
+    )
+    assert sorted(results) == list(range(len(DOCS)))
+    assert all(results[i]["id"] == i for i in results)
+
+
+def test_parse_many_reports_failing_document(parser):
+    """Test that a malformed document raises with its index"""
+    docs = DOCS[:10] + [b'{"broken": ]'] + DOCS[10:]
+    with pytest.raises(JSONParseError, match="Document 10"):
+        list(parser.parse_many(docs, workers=2, batch_size=4))
+
+
+def test_process_parallel_round_trips_chunks(parser):
+    """Test that chunks are serialized as JSON, not Python reprs"""
+    chunks = [{"flag": True, "value": None}, {"flag": False, "value": 1.5}]
+    assert parser.process_parallel(chunks, workers=2) == chunks
@@ -1,8 +1,11 @@
 """
 Tests for the JSON parser
 """
+
 import pytest
-from jsongeek import JSONParser, loads, JSONParseError
+
+from jsongeek import JSONParseError, JSONParser, loads
+
 
 def test_basic_parsing():
     """Test basic JSON parsing"""
@@ -11,6 +14,7 @@ def test_basic_parsing():
     assert result["key"] == "value"
     assert result["numbers"] == [1, 2, 3]
 
+
 def test_parser_options():
     """Test parser configuration options"""
     parser = JSONParser(use_simd=False, validate_utf8=True, max_depth=16)
@@ -18,11 +22,13 @@ def test_parser_options():
     result = parser.parse(data)
     assert result["nested"]["level"] == 1
 
+
 def test_invalid_json():
     """Test handling of invalid JSON"""
     with pytest.raises(JSONParseError):
         loads('{"unclosed": "string}')
 
+
 def test_utf8_validation():
     """Test UTF-8 validation"""
     parser = JSONParser(validate_utf8=True)
@@ -30,8 +36,40 @@ def test_utf8_validation():
     result = parser.parse(data)
     assert result["unicode"] == "Hello, 世界"
 
+
 def test_max_depth():
     """Test maximum nesting depth"""
     parser = JSONParser(max_depth=2)
     with pytest.raises(JSONParseError):
         parser.parse('{"a": {"b": {"c": 1}}}')
+
+
+def test_bytes_like_inputs():
+    """Test parsing bytes, bytearray and memoryview without decoding"""
+    data = b'{"key": "value"}'
+    for buf in (data, bytearray(data), memoryview(data)):
+        assert loads(buf)["key"] == "value"
+
+
+def test_parse_file(tmp_path):
+    """Test parsing a memory-mapped file"""
+    path = tmp_path / "data.json"
+    path.write_bytes(b'{"items": [1, 2, 3]}')
+    parser = JSONParser()
+    assert parser.parse_file(str(path))["items"] == [1, 2, 3]
+
+
+def test_loads_reuses_pooled_parsers():
+    """Test that loads() keeps one parser per option set and evicts the oldest"""
+    from jsongeek.core import parser as parser_module
+
+    loads("[1]", max_depth=7)
+    parse = parser_module._loads_pool.parsers[(("max_depth", 7),)]
+    assert loads(b'{"a": [1]}', max_depth=7) == {"a": [1]}
+    assert parser_module._loads_pool.parsers[(("max_depth", 7),)] is parse
+    with pytest.raises(JSONParseError):
+        loads("[[[[[[[[1]]]]]]]]", max_depth=7)
+    for depth in range(parser_module.LOADS_POOL_SIZE):
+        loads("[1]", max_depth=100 + depth)
+    assert len(parser_module._loads_pool.parsers) == parser_module.LOADS_POOL_SIZE
+    assert (("max_depth", 7),) not in parser_module._loads_pool.parsers
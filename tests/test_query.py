@@ -0,0 +1,86 @@
+"""
+Tests for JSON Pointer and JSONPath extraction
+"""
+
+import json
+
+import pytest
+
+from jsongeek import JSONParser, query
+from jsongeek.core.query import compile_path, evaluate_objects, extract_from_tape
+from jsongeek.core.tape import build_tape
+
+DOCUMENT = b"""{
+  "data": {"items": [{"id": 1, "n": "a"}, {"id": 2}, {"id": 3, "sub": {"id": 4}}]},
+  "a/b": {"m~n": true},
+  "tail": [10, 20, 30, 40]
+}"""
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("", None),
+        ("/data/items/0/id", [1]),
+        ("/data/items/*/id", [1, 2, 3]),
+        ("/a~1b/m~0n", [True]),
+        ("/data/items/01", []),
+        ("/missing", []),
+        ("$.data.items[*].id", [1, 2, 3]),
+        ("$.data.items[-1].sub.id", [4]),
+        ("$['tail'][1:3]", [20, 30]),
+        ("$.tail[::2]", [10, 30]),
+        ("$..id", [1, 2, 3, 4]),
+        ("$..items[0].n", ["a"]),
+    ],
+)
+def test_query(path, expected):
+    """Test pointer and JSONPath evaluation against raw bytes"""
+    result = query(DOCUMENT, path, backend="json")
+    if expected is None:
+        assert len(result) == 1 and result[0]["tail"] == [10, 20, 30, 40]
+    else:
+        assert result == expected
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "",
+        "/data/items/*/id",
+        "/data/items/01",
+        "$..id",
+        "$.tail[1:3]",
+        "$..items[0].n",
+        "$..*",
+        "$.data.*",
+        "$.*[-1]",
+        "/tail/9",
+        "$.tail.x",
+    ],
+)
+def test_evaluate_objects_matches_tape(path):
+    """Test that paths select the same values in parsed objects as on the tape"""
+    expected = extract_from_tape(build_tape(DOCUMENT), [path])[path]
+    assert evaluate_objects(json.loads(DOCUMENT), compile_path(path)) == expected
+
+
+def test_extract_many_paths():
+    """Test answering several paths from one scan"""
+    with JSONParser(backend="json") as parser:
+        result = parser.extract(DOCUMENT, ["/tail/0", "$..sub", "/nope"])
+    assert result == {"/tail/0": [10], "$..sub": [{"id": 4}], "/nope": []}
+
+
+def test_compiled_paths_are_cached():
+    """Test that compiling the same expression twice reuses the result"""
+    assert compile_path("$.data.items[*]") is compile_path("$.data.items[*]")
+
+
+@pytest.mark.parametrize(
+    "path", ["data", "$.a[", "$.a[::0]", "$.a[::-1]", "$..a[3:0:-2]", "$x"]
+)
+def test_invalid_paths(path):
+    """Test that malformed expressions are rejected"""
+    with pytest.raises(ValueError):
+        compile_path(path)
@@ -0,0 +1,115 @@
+"""
+Tests for schema-driven record classes
+"""
+
+import json
+import pickle
+
+import pytest
+
+from jsongeek import JSONParser
+from jsongeek.core.records import (
+    Record,
+    build_records,
+    convert_records,
+    record_class,
+    schema_fields,
+)
+from jsongeek.core.tape import build_tape
+from jsongeek.core.validator import JsonValidator
+
+DOCUMENT = b"""{"data": [
+  {"id": 1, "name": "a", "tags": ["x"]},
+  {"id": 2, "class": true},
+  {"id": 3, "extra": 1},
+  7
+]}"""
+SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": "string"},
+            "tags": {"type": "array"},
+            "class": {"type": "boolean"},
+        },
+        "required": ["id"],
+    },
+}
+
+
+@pytest.fixture
+def parser():
+    with JSONParser(backend="json") as parser:
+        yield parser
+
+
+def test_records_from_schema(parser):
+    """Test building records for matching objects and plain values otherwise"""
+    first, second, third, fourth = parser.parse_records(
+        DOCUMENT, JsonValidator(SCHEMA), path="/data"
+    )
+    assert isinstance(first, Record)
+    assert first.id == 1 and first["name"] == "a" and first.tags == ["x"]
+    assert second["class"] is True and "name" not in second
+    assert second.to_dict() == {"id": 2, "class": True}
+    assert third == {"id": 3, "extra": 1} and not isinstance(third, Record)
+    assert fourth == 7
+
+
+def test_records_inferred(parser):
+    """Test inferring the shape from the record keys"""
+    records = parser.parse_records(b'[{"a": 1}, {"b": 2}]')
+    assert [r.to_dict() for r in records] == [{"a": 1}, {"b": 2}]
+    assert records[0].get("b", 0) == 0
+    assert type(records[0]) is type(records[1])
+
+
+def test_record_class_reused_and_compact():
+    """Test that equal shapes share a class and records have no __dict__"""
+    cls = record_class(("a", "if"))
+    assert record_class(("a", "if")) is cls
+    record = cls(1, 2)
+    assert not hasattr(record, "__dict__")
+    assert record["if"] == 2
+    assert pickle.loads(pickle.dumps(record)) == {"a": 1, "if": 2}
+
+
+def test_record_schema_must_describe_objects(parser):
+    """Test that non-object schemas are rejected"""
+    with pytest.raises(ValueError):
+        parser.parse_records(b"[]", {"type": "string"})
+
+
+def test_required_fields_must_be_properties(parser):
+    """Test that both record paths reject and apply required fields alike"""
+    schema = {"type": "object", "properties": {"x": {}}, "required": ["x", "y"]}
+    with pytest.raises(ValueError, match="y"):
+        schema_fields(schema)
+    with pytest.raises(ValueError, match="y"):
+        parser.parse_records(b'[{"x": 1}]', schema)
+    doc = b'[{"x": 1}, {"y": 2}, {"x": 3, "y": 4}, {"z": 5}]'
+    schema["properties"]["y"] = {}
+    schema["required"] = ["x"]
+    fields, required = schema_fields(schema)
+    from_tape = build_records(build_tape(doc), [0], fields, required)
+    from_objects = convert_records(json.loads(doc), fields, required)
+    for records in (from_tape, from_objects):
+        assert [isinstance(r, Record) for r in records] == [True, False, True, False]
+        assert records == [{"x": 1}, {"y": 2}, {"x": 3, "y": 4}, {"z": 5}]
+
+
+def test_records_from_parsed_objects():
+    """Test that the stdlib path handles paths, misfits and required fields"""
+    doc = b'{"a": [{"x": 1}, {"x": 2, "y": [{"x": 3}]}, 5, {"z": 0}], "b": [{"x": 4}]}'
+    with JSONParser(backend="json") as parser:
+        records = parser.parse_records(doc, path="$..[*]")
+        assert [type(r).__name__ for r in records[:2]] == ["Record", "Record"]
+        assert records[1].y == [{"x": 3}]
+        strict = parser.parse_records(
+            doc,
+            path="/a",
+            schema={"type": "object", "properties": {"x": {}}, "required": ["x"]},
+        )
+    assert strict[2:] == [5, {"z": 0}]
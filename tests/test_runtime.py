@@ -0,0 +1,375 @@
+"""
+Tests for the shared WebAssembly runtime
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from jsongeek import JSONParseError, JSONParser, query
+from jsongeek.core import backends
+from jsongeek.core.backends import WasmBackend
+from jsongeek.core.limits import ParseLimits
+from jsongeek.core.runtime import (
+    FALLBACK_MODULE,
+    WASM_DIR,
+    InstancePool,
+    ModuleRegistry,
+    WasmArena,
+    get_registry,
+)
+from jsongeek.core.tape import (
+    ERROR_MESSAGES,
+    TAPE_FULL,
+    TAPE_RECORD_SIZE,
+    build_tape,
+    tape_dtype,
+)
+
+
+class FakeMemory:
+    """Linear memory stand-in backed by a bytearray"""
+
+    def __init__(self, size):
+        self.buffer = bytearray(size)
+
+
+class FakeExports:
+    """Bump allocator over a fake linear memory that grows but never shrinks"""
+
+    def __init__(self, size=1 << 20):
+        self.memory = FakeMemory(size)
+        self.next_ptr = 16
+
+    def malloc(self, size):
+        ptr, self.next_ptr = self.next_ptr, self.next_ptr + size
+        if self.next_ptr > len(self.memory.buffer):
+            self.memory.buffer.extend(bytes(self.next_ptr - len(self.memory.buffer)))
+        return ptr
+
+    def free(self, ptr):
+        # Like the stub runtime of the AssemblyScript modules
+        pass
+
+
+class FakeParserExports(FakeExports):
+    """Parser exports that build tapes in Python, inside the fake memory"""
+
+    def __init__(self):
+        super().__init__()
+        self.error = (0, 0)
+        # (code, position) every build_tape call fails with, if set
+        self.forced_error = None
+        self.capacities = []
+        self.inputs = []
+        self.batches = []
+        # Whether parse_batch traps instead of returning
+        self.trap = False
+
+    def set_limits(self, depth, string_length, number_length, elements):
+        self.limits = (depth, string_length, number_length, elements)
+
+    def set_utf8_validation(self, enabled):
+        self.validate_utf8 = enabled
+
+    def tape_error_code(self):
+        return self.error[0]
+
+    def tape_error_position(self):
+        return self.error[1]
+
+    def _build(self, doc, tape_ptr, capacity, first):
+        """Write the tape of ``doc`` at entry ``first``; return its length or -1"""
+        if self.forced_error is not None:
+            self.error = self.forced_error
+            return -1
+        try:
+            entries = build_tape(doc).entries
+        except JSONParseError as e:
+            codes = {message: code for code, message in ERROR_MESSAGES.items()}
+            self.error = (codes[str(e).rsplit(" at position", 1)[0]], e.position)
+            return -1
+        if first + len(entries) > capacity:
+            self.error = (TAPE_FULL, 0)
+            return -1
+        entries["jump"] += first
+        start = tape_ptr + first * TAPE_RECORD_SIZE
+        self.memory.buffer[start : start + entries.nbytes] = entries.tobytes()
+        return len(entries)
+
+    def build_tape(self, ptr, length, tape_ptr, capacity):
+        self.capacities.append(capacity)
+        doc = bytes(self.memory.buffer[ptr : ptr + length])
+        self.inputs.append(doc)
+        return self._build(doc, tape_ptr, capacity, 0)
+
+    def parse_batch(self, data_ptr, offsets_ptr, count, out_ptr, tape_ptr, capacity):
+        """Mirror parseBatch in wasm/assembly/batch.ts"""
+        if self.trap:
+            raise RuntimeError("unreachable")
+        memory = self.memory.buffer
+        offsets = np.frombuffer(memory, np.uint32, count + 1, offsets_ptr).tolist()
+        records = np.frombuffer(memory, np.int32, count * 3, out_ptr).reshape(count, 3)
+        failures = used = 0
+        for i in range(count):
+            doc = bytes(memory[data_ptr + offsets[i] : data_ptr + offsets[i + 1]])
+            written = self._build(doc, tape_ptr, capacity, used)
+            if written < 0:
+                if self.error[0] == TAPE_FULL:
+                    return -1
+                records[i] = (*self.error, 0)
+                failures += 1
+                continue
+            records[i] = (0, 0, used)
+            used += written
+        self.batches.append(
+            {"offsets": offsets, "records": records.tolist(), "capacity": capacity}
+        )
+        return failures
+
+
+class FakeInstance:
+    """Instance stand-in with fresh parser exports"""
+
+    def __init__(self):
+        self.exports = FakeParserExports()
+
+
+class FakePool(InstancePool):
+    """Instance pool that instantiates FakeInstance instead of a wasm module"""
+
+    def _instantiate(self):
+        return FakeInstance()
+
+
+@pytest.fixture
+def wasm_backend(monkeypatch):
+    """WasmBackend running on FakeParserExports instead of a wasm instance"""
+
+    class Registry:
+        pool = FakePool(None, FALLBACK_MODULE)
+
+        def module_name(self, use_simd):
+            return FALLBACK_MODULE
+
+        def get_pool(self, name):
+            return self.pool
+
+    monkeypatch.setattr(backends, "get_registry", Registry)
+    backend = WasmBackend()
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Skip without wasmer or built modules; keep compiled artifacts in tmp_path"""
+    pytest.importorskip("wasmer")
+    if not os.path.exists(os.path.join(WASM_DIR, FALLBACK_MODULE)):
+        pytest.skip("wasm modules are not built")
+    monkeypatch.setenv("JSONGEEK_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_registry(), "cache_dir", str(tmp_path))
+    return str(tmp_path)
+
+
+def test_module_compiled_once(cache_dir):
+    """Test that a module is compiled only on first use"""
+    registry = ModuleRegistry(cache_dir=cache_dir)
+    name = registry.module_name(False)
+    first = registry.get_module(name)
+    second = registry.get_module(name)
+    assert first is second
+    stats = registry.get_stats()
+    assert stats["module_misses"] == 1
+    assert stats["module_hits"] == 1
+
+
+def test_pool_reuses_instances(cache_dir):
+    """Test that released instances are handed out again"""
+    registry = ModuleRegistry(cache_dir=cache_dir)
+    pool = registry.get_pool(registry.module_name(False))
+    instance = pool.acquire()
+    pool.release(instance)
+    assert pool.acquire() is instance
+    stats = pool.get_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_pool_is_bounded(cache_dir):
+    """Test that the pool keeps at most max_size idle instances"""
+    registry = ModuleRegistry(pool_size=1, cache_dir=cache_dir)
+    pool = registry.get_pool(registry.module_name(False))
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    stats = pool.get_stats()
+    assert stats["idle"] == 1
+    assert stats["discarded"] == 1
+
+
+def test_query_steady_state_does_not_compile(cache_dir):
+    """Test that repeated query() calls never reach the compiler"""
+    query('{"warm": true}', "/warm", backend="wasm-scalar")
+    stats = get_registry().get_stats()
+    assert stats["compiled_modules"], "no wasm module was loaded"
+    before = stats["module_misses"]
+    for _ in range(10):
+        query('{"key": "value"}', "/key", backend="wasm-scalar")
+    assert get_registry().get_stats()["module_misses"] == before
+
+
+def test_parser_returns_instance_on_close(cache_dir):
+    """Test that a closed parser gives its instance back to the pool"""
+    with JSONParser(use_simd=False, backend="wasm-scalar") as parser:
+        parser.parse_tape('{"a": 1}')
+        instance = parser._backends["wasm-scalar"]._instance
+    assert not parser._backends
+    with JSONParser(use_simd=False, backend="wasm-scalar") as parser:
+        parser.parse_tape('{"a": 1}')
+        assert parser._backends["wasm-scalar"]._instance is instance
+
+
+def test_arena_grows_geometrically():
+    """Test that the arena doubles until the input fits and reuses its region"""
+    exports = FakeExports()
+    arena = WasmArena(exports, initial_size=16)
+    ptr = arena.write(b'{"a": 1}')
+    assert arena.write(b"[1, 2]") == ptr
+    ptr = arena.write(b"x" * 100)
+    assert bytes(exports.memory.buffer[ptr : ptr + 100]) == b"x" * 100
+    assert arena.write(b"y" * 50) == ptr
+    stats = arena.get_stats()
+    assert stats["current_size"] == 128
+    assert stats["growth_count"] == 2
+    assert stats["high_water_mark"] == 100
+    assert exports.next_ptr == 16 + 16 + 128
+
+
+def test_arena_expires_only_when_grown_and_idle():
+    """Test that only a block above the initial size expires, after the timeout"""
+    arena = WasmArena(FakeExports(), initial_size=16, idle_timeout=0.0)
+    arena.reserve(10)
+    assert not arena.expired
+    arena.reserve(1000)
+    assert arena.expired
+    arena.idle_timeout = 60.0
+    assert not arena.expired
+
+
+def test_pool_renews_instances_with_expired_arenas():
+    """Test that an idle grown arena is freed by replacing its instance"""
+    pool = FakePool(None, FALLBACK_MODULE)
+    instance = pool.acquire()
+    arena = pool.arena(instance)
+    arena.initial_size, arena.idle_timeout = 16, 0.0
+    arena.reserve(1000)
+    pool.release(instance)
+    fresh = pool.acquire()
+    assert fresh is not instance
+    renewed = pool.arena(fresh)
+    assert renewed.get_stats() == {
+        "high_water_mark": 1000,
+        "growth_count": 1,
+        "shrink_count": 1,
+        "current_size": 0,
+    }
+    assert (renewed.initial_size, renewed.idle_timeout) == (16, 0.0)
+    assert pool.get_stats()["renewed"] == 1
+    # A block still at the initial size is handed out again
+    renewed.reserve(10)
+    pool.release(fresh)
+    assert pool.acquire() is fresh
+
+
+def test_backend_renews_its_instance_after_idle(wasm_backend):
+    """Test that a backend holding a grown idle arena moves to a fresh instance"""
+    wasm_backend.configure(
+        {"arena_size": 1024, "arena_idle_timeout": 0.0, "limits": ParseLimits(5)}
+    )
+    old = wasm_backend._instance
+    assert wasm_backend.parse_tape(b"[" + b"1," * 200 + b"1]").to_python() == [1] * 201
+    assert wasm_backend.parse_tape(b"[2]").to_python() == [2]
+    assert wasm_backend._instance is not old
+    exports = wasm_backend._instance.exports
+    assert exports.limits == (5, -1, -1, -1)
+    assert exports.validate_utf8 == 1
+    stats = wasm_backend.get_stats()["arena"]
+    assert stats["current_size"] == 1024
+    assert stats["shrink_count"] == 1
+    assert stats["growth_count"] == 3
+
+
+def test_wasm_tape_is_built_in_the_arena(wasm_backend):
+    """Test that the input is copied into the arena and the tape read in place"""
+    exports = wasm_backend._instance.exports
+    doc = b'{"a": [1, "x", null], "b": {}}'
+    tape = wasm_backend.parse_tape(doc)
+    assert exports.inputs == [doc]
+    assert exports.capacities == [len(doc) // 4 + 16]
+    assert np.shares_memory(
+        tape.entries, np.frombuffer(exports.memory.buffer, dtype=np.uint8)
+    )
+    assert tape.entries.tolist() == build_tape(doc).entries.tolist()
+    assert tape.to_python() == {"a": [1, "x", None], "b": {}}
+
+
+def test_wasm_tape_capacity_doubles_until_it_fits(wasm_backend):
+    """Test that a full tape is retried with twice the capacity"""
+    exports = wasm_backend._instance.exports
+    doc = b"[" + b",".join([b"1"] * 500) + b"]"
+    tape = wasm_backend.parse_tape(doc)
+    first = len(doc) // 4 + 16
+    assert exports.capacities == [first, first * 2]
+    assert exports.inputs == [doc, doc]
+    assert len(tape) == 501
+    assert tape.to_python() == [1] * 500
+
+
+@pytest.mark.parametrize("code", [8, 10, 11, 12, 13, 42])
+def test_wasm_tape_errors_carry_message_and_position(wasm_backend, code):
+    """Test that wasm error codes become JSONParseError with their message"""
+    wasm_backend._instance.exports.forced_error = (code, 7)
+    with pytest.raises(JSONParseError) as info:
+        wasm_backend.parse_tape(b'{"key": [1, 2, 3]}')
+    message = ERROR_MESSAGES.get(code, f"Error code {code}")
+    assert str(info.value) == f"{message} at position 7"
+    assert info.value.position == 7
+
+
+def test_wasm_batch_packs_documents_and_reports_errors(wasm_backend):
+    """Test the packed offsets and per-document records of a mixed batch"""
+    exports = wasm_backend._instance.exports
+    docs = [b'{"a": 1}', b'{"a": ]', b"[true]", b"", b'"x"']
+    results = wasm_backend.parse_batch(docs)
+    (batch,) = exports.batches
+    assert batch["offsets"] == [0, 8, 15, 21, 21, 24]
+    # Error code and position relative to the document, or the root entry
+    assert batch["records"] == [[0, 0, 0], [2, 6, 0], [0, 0, 3], [1, 0, 0], [0, 0, 5]]
+    assert results[0] == {"a": 1}
+    assert str(results[1]) == f"{ERROR_MESSAGES[2]} at position 6"
+    assert results[2] == [True]
+    assert str(results[3]) == f"{ERROR_MESSAGES[1]} at position 0"
+    assert results[4] == "x"
+
+
+def test_wasm_batch_tape_grows_until_it_fits(wasm_backend):
+    """Test that a batch whose shared tape runs out is retried with twice the room"""
+    exports = wasm_backend._instance.exports
+    docs = [b"[" + b",".join([b"1"] * 100) + b"]"] * 3
+    assert wasm_backend.parse_batch(docs) == [[1] * 100] * 3
+    (batch,) = exports.batches
+    assert batch["capacity"] == 2 * (sum(map(len, docs)) // 4 + 16 * len(docs))
+    assert [root for _, _, root in batch["records"]] == [0, 101, 202]
+
+
+def test_wasm_batch_falls_back_per_document_when_it_traps(wasm_backend):
+    """Test that a trapping batch call is replaced by one tape per document"""
+    exports = wasm_backend._instance.exports
+    exports.trap = True
+    results = wasm_backend.parse_batch([b"[1]", b"[1,", b'{"b": null}'])
+    assert exports.inputs == [b"[1]", b"[1,", b'{"b": null}']
+    assert results[0] == [1]
+    assert str(results[1]) == f"{ERROR_MESSAGES[1]} at position 3"
+    assert results[2] == {"b": None}
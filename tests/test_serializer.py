@@ -0,0 +1,85 @@
+"""
+Tests for the shared serializer
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from jsongeek import JSONParser, dumpb, dumps, loads
+
+
+def test_dumps_matches_stdlib():
+    """Test that output matches json.dumps and is a str"""
+    for obj in ("xé", 1, 2.5, True, None, [1, {"a": [None]}], {"b": 1, "a": 2}):
+        assert dumps(obj) == json.dumps(obj)
+    assert dumps({"b": 1, "a": 2}, sort_keys=True) == '{"a": 2, "b": 1}'
+
+
+def test_numpy_values():
+    """Test that NumPy arrays and scalars are encoded natively"""
+    obj = {
+        "arr": np.arange(3, dtype=np.int32),
+        "f": np.float32(0.5),
+        "m": np.ones((2, 2)),
+    }
+    assert json.loads(dumps(obj)) == {
+        "arr": [0, 1, 2],
+        "f": 0.5,
+        "m": [[1.0, 1.0], [1.0, 1.0]],
+    }
+    assert dumps(np.int64(7)) == "7"
+
+
+def test_numpy_subclasses():
+    """Test that masked arrays from parse_columns serialize masked items as None"""
+    import io
+
+    from jsongeek import dump
+
+    with JSONParser(backend="json") as parser:
+        columns = parser.parse_columns(b'[{"a": 1}, {"b": 2}]')
+    assert json.loads(dumps(columns)) == {"a": [1, None], "b": [None, 2]}
+    assert dumps(np.ma.masked_array([1.5, 2.5], mask=[True, False])) == "[null, 2.5]"
+    fp = io.BytesIO()
+    dump(columns, fp)
+    assert json.loads(fp.getvalue()) == {"a": [1, None], "b": [None, 2]}
+
+
+def test_parsed_wrappers():
+    """Test that records and lazy documents serialize like their plain values"""
+    with JSONParser(backend="json") as parser:
+        doc = parser.parse_lazy(b'{"a": [1, 2]}')
+        records = parser.parse_records(b'[{"x": 1}]')
+    assert dumps(doc) == '{"a": [1, 2]}'
+    assert dumps(records) == '[{"x": 1}]'
+
+
+def test_dumpb_compresses_only_when_useful():
+    """Test that small payloads stay plain and large ones round-trip"""
+    assert dumpb([1, 2]) == b"[1, 2]"
+    big = {"rows": [{"name": "value"}] * 500}
+    data = dumpb(big)
+    assert len(data) < len(dumps(big))
+    assert loads(data) == big
+    assert dumpb(big, enable_compression=False) == dumps(big).encode()
+
+
+def test_dumps_enable_compression_is_deprecated():
+    """Test that the old compression flag still works but warns"""
+    big = {"rows": [{"name": "value"}] * 500}
+    with pytest.warns(DeprecationWarning, match="dumpb"):
+        assert dumps(big, enable_compression=True) == dumpb(big)
+    with pytest.warns(DeprecationWarning):
+        assert dumps(big, enable_compression=False) == dumps(big)
+
+
+def test_unsupported_types():
+    """Test that unknown objects and cycles are rejected"""
+    with pytest.raises(TypeError):
+        dumps({"s": {1, 2}})
+    cycle = []
+    cycle.append(cycle)
+    with pytest.raises(ValueError):
+        dumps(cycle)
@@ -0,0 +1,70 @@
+"""
+Tests for the structural tape
+"""
+
+import json
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+from jsongeek.core import tape
+from jsongeek.core.tape import build_tape
+
+DOCUMENT = (
+    '{"a": [1, 2.5, "x\\n", {"b": null, "c\\u00e9": true}], '
+    '"d": {}, "e": [], "f": false}'
+)
+
+
+def test_tape_round_trip():
+    """Test that converting a tape matches the stdlib json module"""
+    for text in (DOCUMENT, "[]", '"s"', "-0", "1e5", " [[[]], {}] "):
+        assert build_tape(text.encode()).to_python() == json.loads(text)
+
+
+def test_tape_layout():
+    """Test entry types, spans and subtree jumps"""
+    t = build_tape(b'{"k": [1, "v"], "n": null}')
+    assert [t.kind(i) for i in range(len(t))] == [
+        tape.OBJECT,
+        tape.KEY,
+        tape.ARRAY,
+        tape.INTEGER,
+        tape.STRING,
+        tape.KEY,
+        tape.NULL,
+    ]
+    assert t.jump(0) == len(t)
+    assert t.jump(2) == 5
+    assert t.span(2) == (6, 14)
+    assert list(t.children(0)) == [1, 5]
+    assert t.decode(1) == "k"
+
+
+def test_tape_subtree_conversion():
+    """Test converting only part of a document"""
+    t = build_tape(DOCUMENT.encode())
+    assert t.to_python(2) == json.loads(DOCUMENT)["a"]
+
+
+@pytest.mark.parametrize(
+    "text,position",
+    [("", 0), ("[1,]", 3), ('{"a" 1}', 5), ("[1 2]", 3), ("[1]x", 3), ("{1: 2}", 1)],
+)
+def test_tape_errors(text, position):
+    """Test that malformed documents report the failing byte"""
+    with pytest.raises(JSONParseError) as info:
+        build_tape(text.encode())
+    assert info.value.position == position
+
+
+def test_tape_depth_limit():
+    """Test that nesting beyond max_depth is rejected"""
+    with pytest.raises(JSONParseError):
+        build_tape(b"[" * 5 + b"]" * 5, max_depth=4)
+
+
+def test_parser_parse_tape():
+    """Test building a tape through the parser"""
+    with JSONParser(backend="json") as parser:
+        assert parser.parse_tape(DOCUMENT).to_python() == json.loads(DOCUMENT)
@@ -0,0 +1,171 @@
+"""
+Tests for the columnar pre-transform of record arrays
+"""
+
+import json
+import time
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser, loads
+from jsongeek.utils.compression import (
+    CODEC_NONE,
+    FrameError,
+    SmartCompressor,
+    StreamDecompressor,
+    _pack_header,
+    unpack_frame,
+)
+from jsongeek.utils.transform import decode_columns, encode_columns
+
+LOGS = [
+    {
+        "ts": 1700000000000 + i * 7,
+        "id": i,
+        "level": ["INFO", "WARN"][i % 2],
+        "ms": i / 3,
+        "ok": i % 3 == 0,
+    }
+    for i in range(2000)
+]
+
+
+def test_round_trip_is_exact():
+    """Test that values, types and key order survive the transform"""
+    records = [
+        {"a": 1, "b": True, "c": None},
+        {"b": False, "a": 2.0, "extra": {"nested": [1, "x"]}},
+        {},
+        {"a": -0.0, "c": "é\n", "b": 1},
+        {"a": 10**30, "b": 0},
+    ]
+    back = decode_columns(encode_columns(records))
+    assert back == records
+    assert [list(record) for record in back] == [list(record) for record in records]
+    assert [type(record.get("b")) for record in back] == [
+        type(record.get("b")) for record in records
+    ]
+    assert decode_columns(encode_columns([{}, {}])) == [{}, {}]
+
+
+def test_monotonic_integers_are_delta_encoded():
+    """Test that sorted integer columns are stored as deltas"""
+    layout = json.loads(encode_columns(LOGS))
+    keys = layout["keys"]
+    assert sorted(keys[i] for i in layout["delta"]) == ["id", "ts"]
+    assert layout["ids"] is None
+    assert set(layout["columns"][keys.index("ts")][1:]) == {7}
+    assert decode_columns(encode_columns(LOGS)) == LOGS
+
+
+def test_non_records_are_not_transformed():
+    """Test that anything but an array of objects is left to plain JSON"""
+    assert encode_columns({"a": 1}) is None
+    assert encode_columns([{"a": 1}, 2]) is None
+    assert encode_columns([{"a": 1}, {1: "x"}]) is None
+    compressor = SmartCompressor(transform=True)
+    doc = {"rows": [1, 2, 3] * 500}
+    assert compressor.decompress_json(compressor.compress_json(doc)) == doc
+    assert not compressor.get_stats()["transformed"]
+    int_keys = [{1: "x"}, {1: "y"}] * 500
+    assert (
+        compressor.decompress_json(compressor.compress_json(int_keys))
+        == [{"1": "x"}, {"1": "y"}] * 500
+    )
+    assert not compressor.get_stats()["transformed"]
+
+
+def test_compress_json_with_transform():
+    """Test that columnar frames are smaller and decode through every reader"""
+    compressor = SmartCompressor(transform=True)
+    packed = compressor.compress_json(LOGS)
+    assert compressor.get_stats()["transformed"]
+    assert len(packed) < len(SmartCompressor().compress_json(LOGS))
+    assert compressor.decompress_json(packed) == LOGS
+    assert json.loads(SmartCompressor().decompress(packed)) == LOGS
+    assert loads(packed) == LOGS
+    with pytest.raises(FrameError):
+        list(StreamDecompressor().decompress(packed))
+    with pytest.raises(ValueError):
+        decode_columns(b'{"v": 99}')
+
+
+def _columnar_frame(layout):
+    """Pack a hand-written layout into an uncompressed columnar frame"""
+    payload = json.dumps(layout).encode("utf-8")
+    return _pack_header(CODEC_NONE, len(payload), transformed=True) + payload
+
+
+def test_layout_expansion_is_bounded():
+    """Test that a tiny frame cannot expand past max_size or its own columns"""
+    bomb = _columnar_frame(
+        {
+            "v": 1,
+            "rows": 3000000,
+            "keys": [],
+            "shapes": [[]],
+            "ids": None,
+            "delta": [],
+            "columns": [],
+        }
+    )
+    start = time.perf_counter()
+    with pytest.raises(JSONParseError):
+        JSONParser(backend="json", max_size=10_000).parse(bomb)
+    with pytest.raises(FrameError):
+        unpack_frame(bomb, max_size=10_000)
+    assert time.perf_counter() - start < 0.5
+    good = {
+        "v": 1,
+        "rows": 2,
+        "keys": ["a"],
+        "shapes": [[0]],
+        "ids": None,
+        "delta": [],
+        "columns": [[1, 2]],
+    }
+    assert unpack_frame(_columnar_frame(good)) == b'[{"a":1},{"a":2}]'
+    for bad in (
+        dict(good, rows=3),
+        dict(good, ids=[0]),
+        dict(good, ids=[0, 1]),
+        dict(good, columns=[[1, 2, 3]]),
+        dict(good, rows=-1),
+    ):
+        with pytest.raises(FrameError):
+            unpack_frame(_columnar_frame(bad))
+
+
+def test_delta_columns_must_be_integers():
+    """Test that string or list delta columns are rejected before accumulating"""
+    rows = 20000
+    for value in ("x" * 10, [0] * 10):
+        bomb = _columnar_frame(
+            {
+                "v": 1,
+                "rows": rows,
+                "keys": ["a"],
+                "shapes": [[0]],
+                "ids": None,
+                "delta": [0],
+                "columns": [[value] * rows],
+            }
+        )
+        start = time.perf_counter()
+        with pytest.raises(JSONParseError):
+            JSONParser(backend="json", max_size=200_000).parse(bomb)
+        with pytest.raises(FrameError):
+            unpack_frame(bomb)
+        assert time.perf_counter() - start < 0.5
+    wide = {
+        "v": 1,
+        "rows": 3,
+        "keys": ["a"],
+        "shapes": [[0]],
+        "ids": None,
+        "delta": [0],
+        "columns": [[10**50, 10**50, 10**50]],
+    }
+    with pytest.raises(ValueError):
+        decode_columns(json.dumps(wide).encode("utf-8"), max_size=100)
+    assert json.loads(unpack_frame(_columnar_frame(wide)))[2] == {"a": 3 * 10**50}
@@ -0,0 +1,71 @@
+"""
+Tests for UTF-8 validation on the bytes path
+"""
+
+import io
+
+import pytest
+
+from jsongeek import JSONParseError, JSONParser
+from jsongeek.core.stream import StreamParser
+from jsongeek.core.utf8 import check_utf8, is_ascii
+
+INVALID = [
+    b'["\xff"]',  # never valid
+    b'["\xc0\xaf"]',  # overlong
+    b'["\xed\xa0\x80"]',  # surrogate
+    b'["\xf4\x90\x80\x80"]',  # past U+10FFFF
+    b'["\xe2\x82"]',  # truncated
+]
+
+
+def test_ascii_detection():
+    """Test bulk ASCII detection on bytes and views"""
+    assert is_ascii(b'{"a": 1}')
+    assert is_ascii(memoryview(b'xx{"a": 1}')[2:])
+    assert not is_ascii(memoryview("é".encode()))
+    check_utf8('["héllo", "世界", "🎉"]'.encode())
+
+
+@pytest.mark.parametrize("data", INVALID)
+def test_invalid_sequences_are_rejected(data):
+    """Test that malformed UTF-8 fails at its byte position"""
+    with pytest.raises(JSONParseError) as info:
+        check_utf8(data)
+    assert info.value.position == 2
+    with JSONParser(backend="json") as parser:
+        with pytest.raises(JSONParseError):
+            parser.parse(data)
+        with pytest.raises(JSONParseError):
+            parser.parse_lazy(b"[1, " + data + b"]")
+
+
+def test_unchecked_fast_path():
+    """Test that validate_utf8=False passes malformed bytes through"""
+    with JSONParser(backend="json", validate_utf8=False) as parser:
+        assert parser.parse(b'["a\xffb"]') == ["a\udcffb"]
+        assert parser.parse_lazy(b'{"k": "\xc0"}')["k"] == "\udcc0"
+        assert parser.parse('["é"]') == ["é"]
+
+
+def test_unchecked_results_are_cached_separately():
+    """Test that a lenient parser cannot fill a strict parser's cache"""
+    from jsongeek.core.cache import ParseCache
+
+    cache = ParseCache()
+    with JSONParser(backend="json", validate_utf8=False, cache=cache) as parser:
+        parser.parse(b'["\xff"]')
+    with JSONParser(backend="json", cache=cache) as parser:
+        with pytest.raises(JSONParseError):
+            parser.parse(b'["\xff"]')
+
+
+def test_stream_split_characters():
+    """Test that multi-byte characters split across chunks decode"""
+    data = '{"a": "é"} {"b": "世界"}'.encode()
+    for size in range(1, 8):
+        parser = StreamParser(chunk_size=size)
+        assert list(parser.iter_parse(io.BytesIO(data))) == [{"a": "é"}, {"b": "世界"}]
+    with pytest.raises(JSONParseError) as info:
+        list(StreamParser(chunk_size=3).iter_parse(io.BytesIO(b'{"a": "\xff"}')))
+    assert info.value.position == 7
@@ -0,0 +1,217 @@
+"""
+Tests for streaming JSON and NDJSON output
+"""
+
+import hashlib
+import io
+import json
+import tracemalloc
+import zlib
+
+import numpy as np
+import pytest
+
+from jsongeek import NDJSONWriter, dump, dumps, loads
+
+
+class RecordingFile(io.BytesIO):
+    """BytesIO that remembers the size of every write"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(len(data))
+        return super().write(data)
+
+
+class DigestFile(io.RawIOBase):
+    """Write-only file that keeps a digest and the size of every write"""
+
+    def __init__(self):
+        super().__init__()
+        self.digest = hashlib.sha256()
+        self.writes = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.digest.update(data)
+        self.writes.append(len(data))
+        return len(data)
+
+
+def test_dump_matches_dumps():
+    """Test that streamed output equals the in-memory serializer"""
+    for obj in (
+        [1, {"a": [None, "é"]}],
+        {"b": {"c": [1.5]}, "a": 2},
+        "x",
+        (1, (2,)),
+        {1: {"k": []}},
+    ):
+        fp = io.BytesIO()
+        assert dump(obj, fp) == len(fp.getvalue())
+        assert fp.getvalue().decode() == json.dumps(obj)
+    fp = io.BytesIO()
+    dump({"b": {"y": [1], "x": 2}, "a": 1}, fp, sort_keys=True)
+    assert (
+        fp.getvalue()
+        == dumps({"b": {"y": [1], "x": 2}, "a": 1}, sort_keys=True).encode()
+    )
+
+
+def test_generators_as_arrays():
+    """Test that iterators are consumed and written as arrays"""
+    fp = io.BytesIO()
+    dump({"rows": ({"id": i} for i in range(3)), "ids": iter([[1], [2]])}, fp)
+    assert json.loads(fp.getvalue()) == {
+        "rows": [{"id": 0}, {"id": 1}, {"id": 2}],
+        "ids": [[1], [2]],
+    }
+
+
+def test_numpy_arrays_are_chunked():
+    """Test that large NumPy arrays stream in pieces"""
+    fp = io.BytesIO()
+    dump({"a": np.arange(10000), "m": np.ones((2, 2))}, fp)
+    assert json.loads(fp.getvalue()) == {
+        "a": list(range(10000)),
+        "m": [[1.0, 1.0], [1.0, 1.0]],
+    }
+
+
+def test_large_flat_containers_are_chunked():
+    """Test that long flat lists and dicts do not become one encoded piece"""
+    numbers = list(range(500_000))
+    sizes = []
+    fp = io.RawIOBase()
+    fp.write = lambda data: sizes.append(len(data))
+    tracemalloc.start()
+    dump(numbers, fp, buffer_size=65536)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1_000_000
+    assert max(sizes) < 65536 + 50000
+    assert sum(sizes) == len(dumps(numbers))
+    mapping = {f"k{i}": i for i in range(10000, 0, -1)}
+    for sort_keys in (False, True):
+        fp = io.BytesIO()
+        dump({"m": mapping, "l": tuple(range(9000)) + ([1],)}, fp, sort_keys=sort_keys)
+        expected = {"m": mapping, "l": list(range(9000)) + [[1]]}
+        assert fp.getvalue() == dumps(expected, sort_keys=sort_keys).encode()
+
+
+def test_nested_records_are_encoded_in_runs(monkeypatch):
+    """Test that records take one encoder call per run unless they hold iterators"""
+    from jsongeek.core.serializer import Serializer
+    from jsongeek.core.writer import RUN_FRACTION
+
+    calls = []
+    encode = Serializer.encode
+    monkeypatch.setattr(
+        Serializer, "encode", lambda self, obj: calls.append(1) or encode(self, obj)
+    )
+    rows = [{"id": i, "user": {"tags": ["a", i]}} for i in range(12000)]
+    fp = io.BytesIO()
+    dump(rows, fp, buffer_size=65536)
+    assert fp.getvalue().decode() == json.dumps(rows)
+    assert len(calls) <= 2 * RUN_FRACTION * len(fp.getvalue()) // 65536 + 2
+    rows[5]["user"]["tags"] = iter(["x"])
+    rows[4097]["big"] = list(range(20000))
+    fp = io.BytesIO()
+    dump(rows, fp, buffer_size=65536)
+    rows[5]["user"]["tags"] = ["x"]
+    assert fp.getvalue().decode() == json.dumps(rows)
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        [[[0] * 1000 for _ in range(300)]],
+        [{"rows": [{"v": [1.5] * 1000} for _ in range(300)]}],
+        [[[[["x" * 50] * 100] * 100]]],
+    ],
+)
+def test_nested_pieces_are_bounded_by_buffer(obj):
+    """Test that a small outer container does not encode its nested bulk at once"""
+    expected = hashlib.sha256(dumps(obj).encode()).digest()
+    fp = DigestFile()
+    tracemalloc.start()
+    dump(obj, fp, buffer_size=65536)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert fp.digest.digest() == expected
+    assert peak < 8 * 65536
+    assert max(fp.writes) <= 65536
+
+
+def test_buffer_counts_encoded_bytes():
+    """Test that multi-byte text is flushed by encoded size, not characters"""
+    from jsongeek.core.writer import _Sink
+
+    fp = RecordingFile()
+    sink = _Sink(fp, buffer_size=4096)
+    for _ in range(1000):
+        sink.write("\u00e9\u4e2d\U0001f600" * 10)
+    sink.finish()
+    assert fp.writes[:-1] == [4096] * (len(fp.writes) - 1)
+    assert fp.getvalue().decode() == "\u00e9\u4e2d\U0001f600" * 10000
+
+
+def test_writes_are_bounded_by_buffer():
+    """Test that output is flushed in blocks close to the buffer size"""
+    fp = RecordingFile()
+    dump(({"id": i, "tags": ["a", "b"]} for i in range(5000)), fp, buffer_size=4096)
+    assert len(fp.writes) > 10
+    assert max(fp.writes) < 4096 + 100
+    assert len(json.loads(fp.getvalue())) == 5000
+
+
+def test_compressed_dump():
+    """Test that compressed output is a zlib stream that loads() reads"""
+    obj = [{"name": "value", "n": i} for i in range(2000)]
+    fp = io.BytesIO()
+    dump(iter(obj), fp, compress=True, buffer_size=1024)
+    assert loads(fp.getvalue()) == obj
+    assert len(fp.getvalue()) < len(dumps(obj))
+
+
+def test_cycles_and_unsupported_types():
+    """Test that cycles and unknown objects are rejected"""
+    cyclic = {"a": [1]}
+    cyclic["a"].append(cyclic)
+    with pytest.raises(ValueError):
+        dump(cyclic, io.BytesIO())
+    with pytest.raises(TypeError):
+        dump({"a": [object()]}, io.BytesIO())
+    with pytest.raises(TypeError, match="keys must be str"):
+        dump({(1, 2): [{}]}, io.BytesIO())
+    with pytest.raises(ValueError):
+        dump([], io.BytesIO(), buffer_size=0)
+
+
+def test_ndjson_writer():
+    """Test one document per line and writer statistics"""
+    fp = io.BytesIO()
+    with NDJSONWriter(fp) as writer:
+        writer.write({"a": 1})
+        writer.write_many(([i] for i in range(3)))
+    assert fp.getvalue() == b'{"a": 1}\n[0]\n[1]\n[2]\n'
+    stats = writer.get_stats()
+    assert stats["documents"] == 4
+    assert stats["bytes_out"] == len(fp.getvalue())
+    assert not fp.closed
+    with pytest.raises(ValueError):
+        writer.write({})
+
+
+def test_ndjson_writer_compressed():
+    """Test that compressed NDJSON decompresses to the same lines"""
+    fp = io.BytesIO()
+    with NDJSONWriter(fp, compress=True, buffer_size=256) as writer:
+        writer.write_many({"n": i} for i in range(500))
+    lines = zlib.decompress(fp.getvalue()).splitlines()
+    assert [json.loads(line) for line in lines] == [{"n": i} for i in range(500)]